@@ -1,16 +1,143 @@
-import logging, requests, json
+import atexit, logging, queue, threading, time
+import requests
+
+DISCORD_MAX_LEN = 2000  # Discord rejects message content longer than this
+BATCH_WINDOW = 0.5  # seconds to keep collecting after the first queued alert
+MAX_QUEUE = 1000
+MAX_RETRIES = 5
+
+_STOP = object()
+
+
+def coalesce(messages, limit=DISCORD_MAX_LEN):
+    """Join messages with newlines into as few chunks <= limit chars as possible."""
+    chunks, current = [], ""
+    for msg in messages:
+        # A single oversize alert is split on its own
+        pieces = [msg[i : i + limit] for i in range(0, len(msg), limit)] or [""]
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) <= limit:
+                current += "\n" + piece
+            else:
+                if current:
+                    chunks.append(current)
+                current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 class Alerts:
-    def __init__(self, webhook_url:str=""):
+    """
+    Discord webhook alerts, sent from a background thread so callers never
+    wait on the network. Alerts queued within BATCH_WINDOW of each other go
+    out as one message where they fit; 429s are retried after retry_after.
+    """
+
+    def __init__(self, webhook_url: str = "", session=None, batch_window=BATCH_WINDOW):
         self.webhook_url = webhook_url
+        self.batch_window = batch_window
+        self.session = session or requests.Session()
+        self._queue = queue.Queue(maxsize=MAX_QUEUE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.sent = 0  # webhook posts that succeeded
 
-    def send(self, msg:str):
+    def send(self, msg: str):
         logging.info(f"ALERT: {msg}")
         if not self.webhook_url:
             return
+        self._start()
+        try:
+            self._queue.put_nowait(msg)
+        except queue.Full:
+            logging.error("Discord alert queue full — dropping alert")
+
+    def flush(self, timeout=None):
+        """Block until every queued alert has been posted (or given up on)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=5.0):
+        """Deliver what's queued, then stop the sender thread."""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # -------------------------------------------------
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="discord-alerts", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Collect the rest of the burst (e.g. every signal from one scan)
+            deadline = time.monotonic() + self.batch_window
+            while batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is _STOP
+            messages = batch[:-1] if stop else batch
+            for chunk in coalesce(messages):
+                self._post(chunk)
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _post(self, content):
+        for attempt in range(MAX_RETRIES):
+            try:
+                resp = self.session.post(
+                    self.webhook_url, json={"content": content}, timeout=10
+                )
+            except requests.RequestException as e:
+                logging.error(f"Discord alert error: {e}")
+                time.sleep(min(2**attempt, 30))
+                continue
+
+            if resp.status_code == 429:
+                time.sleep(self._retry_after(resp))
+                continue
+            if resp.status_code >= 500:
+                time.sleep(min(2**attempt, 30))
+                continue
+            if resp.status_code >= 400:
+                logging.error(f"Discord alert rejected ({resp.status_code}): {resp.text[:200]}")
+                return
+            self.sent += 1
+            return
+        logging.error("Discord alert dropped after retries")
+
+    @staticmethod
+    def _retry_after(resp):
+        """Seconds to wait from a 429: JSON retry_after, else the Retry-After header."""
+        try:
+            return float(resp.json().get("retry_after"))
+        except Exception:
+            pass
         try:
-            payload = {"content": msg}
-            headers = {"Content-Type": "application/json"}
-            requests.post(self.webhook_url, data=json.dumps(payload), headers=headers, timeout=10)
-        except Exception as e:
-            logging.error(f"Discord alert error: {e}")
+            return float(resp.headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            return 1.0
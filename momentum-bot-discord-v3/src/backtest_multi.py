@@ -1,13 +1,16 @@
 # === src/backtest_multi.py (FINAL CRYPTO-ONLY EXECUTION) ===
-import os, time, logging, argparse, csv, datetime as dt
+import os, time, logging, argparse, csv, datetime as dt, heapq, sys, traceback
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 import math
 import numpy as np
 from src.utils import setup_logging, load_env
 from src.config import load_all
 from src.feed import Feed
-from src.indicators import add_indicators, last_row
+from src.barstore import frame_to_records, records_to_frame
+from src.indicators import add_indicators, columns_for, last_row
+from src.feature_cache import cached_indicators, default_cache
 
 # Stock strategy imports
 from src.strategy_stock import (
@@ -15,18 +18,21 @@ from src.strategy_stock import (
     breakout_volexp,
     mean_revert_pullback,
     momentum_continuation,
+    mean_revert_pullback_vec,
 )
 
 # Crypto strategy imports
 from src.strategy_crypto import (
     crypto_pullback_mr,
+    crypto_pullback_mr_vec,
     crypto_momentum_trend,
 )
 
 from src.risk import position_size, calc_exits
+from src.regime import regime_series, regime_at
 
 
-@dataclass
+@dataclass(slots=True)
 class ActiveTrade:
     entry_price: float
     units: float
@@ -34,11 +40,152 @@ class ActiveTrade:
     stop_loss: float
     take_profit: float
     trail_stop: float
-    entry_time: dt.datetime
+    entry_time: int  # epoch ns
     entry_bar: int
     symbol: str
     reasons: str
     entry_equity: float
+    best_price: float = None  # best price seen so far (for the trailing stop)
+
+    def __post_init__(self):
+        if self.best_price is None:
+            self.best_price = self.entry_price
+
+
+# -------------------- Closed Trade Store --------------------
+
+# Column order of logs/backtest_results.csv
+TRADE_COLUMNS = [
+    "time",
+    "symbol",
+    "side",
+    "entry",
+    "exit",
+    "pnl",
+    "equity",
+    "units",
+    "entry_time",
+    "entry_equity",
+    "duration_min",
+    "return_pct",
+    "reasons",
+]
+
+EXIT_REASONS = ("SL_HIT", "TRAIL_HIT", "TP_HIT", "END_DATA")
+_EXIT_CODES = {reason: code for code, reason in enumerate(EXIT_REASONS)}
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("time", "i8"),  # exit time, epoch ns
+        ("entry_time", "i8"),
+        ("symbol", "i4"),  # index into TradeLog.symbols
+        ("side", "i1"),
+        ("entry", "f8"),
+        ("exit", "f8"),
+        ("pnl", "f8"),
+        ("equity", "f8"),
+        ("units", "i8"),  # position_size() floors to whole units
+        ("entry_equity", "f8"),
+        ("reasons", "i4"),  # index into TradeLog.reasons (entry votes)
+        ("exit_reason", "i1"),  # index into EXIT_REASONS
+    ]
+)
+
+
+class TradeLog:
+    """
+    Closed trades as rows of one growable NumPy structured array (TRADE_DTYPE)
+    instead of a dict per trade. Symbols and entry reasons are interned, so a
+    row is 74 bytes. `log["pnl"]` gives a column; to_frame() builds the
+    backtest_results.csv frame only when it is needed.
+    """
+
+    def __init__(self, capacity=256):
+        self._data = np.zeros(capacity, dtype=TRADE_DTYPE)
+        self._n = 0
+        self.symbols, self.reasons = [], []
+        self._symbol_codes, self._reason_codes = {}, {}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, column):
+        return self._data[column][: self._n]
+
+    def __getstate__(self):
+        # Ship only the filled rows to/from worker processes
+        state = self.__dict__.copy()
+        state["_data"] = self._data[: self._n].copy()
+        return state
+
+    @staticmethod
+    def _intern(table, codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(table)
+            table.append(value)
+        return code
+
+    def append(self, trade: ActiveTrade, exit_time, exit_price, pnl, equity, reason):
+        """Record a closed trade (exit_time in epoch ns)."""
+        if self._n == len(self._data):
+            grown = np.zeros(max(2 * len(self._data), 16), dtype=TRADE_DTYPE)
+            grown[: self._n] = self._data
+            self._data = grown
+        self._data[self._n] = (
+            exit_time,
+            trade.entry_time,
+            self._intern(self.symbols, self._symbol_codes, trade.symbol),
+            trade.side,
+            trade.entry_price,
+            exit_price,
+            pnl,
+            equity,
+            trade.units,
+            trade.entry_equity,
+            self._intern(self.reasons, self._reason_codes, trade.reasons),
+            _EXIT_CODES[reason],
+        )
+        self._n += 1
+
+    @classmethod
+    def concat(cls, logs):
+        """One TradeLog holding every row of `logs`, in order."""
+        out = cls(capacity=max(sum(len(log) for log in logs), 16))
+        for log in logs:
+            rows = log._data[: log._n].copy()
+            sym = [out._intern(out.symbols, out._symbol_codes, s) for s in log.symbols]
+            rsn = [out._intern(out.reasons, out._reason_codes, r) for r in log.reasons]
+            if len(rows):
+                rows["symbol"] = np.asarray(sym, dtype="i4")[rows["symbol"]]
+                rows["reasons"] = np.asarray(rsn, dtype="i4")[rows["reasons"]]
+            out._data[out._n : out._n + len(rows)] = rows
+            out._n += len(rows)
+        return out
+
+    def to_frame(self):
+        """Closed-trade rows for logs/backtest_results.csv (LOGGING ADVANCED METRICS)."""
+        d = self._data[: self._n]
+        entry_reasons = np.array(self.reasons, dtype=object)[d["reasons"]]
+        exit_labels = np.array([f" | EXIT_{r}" for r in EXIT_REASONS], dtype=object)
+        return pd.DataFrame(
+            {
+                "time": pd.to_datetime(d["time"], unit="ns"),
+                "symbol": np.array(self.symbols, dtype=object)[d["symbol"]],
+                "side": np.where(d["side"] > 0, "BUY", "SELL").astype(object),
+                "entry": d["entry"],
+                "exit": d["exit"],
+                "pnl": d["pnl"],
+                "equity": d["equity"],
+                "units": d["units"],
+                "entry_time": pd.to_datetime(d["entry_time"], unit="ns"),
+                "entry_equity": d["entry_equity"],
+                "duration_min": (d["time"] - d["entry_time"]) / 1e9 / 60,
+                "return_pct": d["pnl"] / d["entry_equity"],
+                "reasons": entry_reasons + exit_labels[d["exit_reason"]],
+            },
+            columns=TRADE_COLUMNS,
+        )
 
 
 # -------------------- Trade Management Functions --------------------
@@ -64,6 +211,83 @@ def check_trade_exit(
     return False, 0, None
 
 
+# Bars examined per array search; doubles while the trade stays open
+EXIT_SEARCH_WINDOW = 256
+
+
+def find_intrabar_exit(trade: ActiveTrade, open_, high, low, start, end):
+    """
+    First bar in [start, end) whose High/Low range touches the stop loss, the
+    take profit or the trailing stop (trade.trail_stop below the best price
+    seen on earlier bars). Returns (bar, fill_price, reason), or None if the
+    trade survives to `end`; trade.best_price then covers the searched bars,
+    so a later search can resume from `end`.
+
+    Bars are searched in growing windows with running max/min and argmax over
+    the hit mask, so a long hold costs a handful of NumPy calls. When one bar
+    touches both sides, the stop is assumed to have filled first; gaps through
+    a level fill at the bar's Open.
+    """
+    side = trade.side
+    best = trade.best_price
+    window = EXIT_SEARCH_WINDOW
+    while start < end:
+        stop_at = min(start + window, end)
+        o, h, l = open_[start:stop_at], high[start:stop_at], low[start:stop_at]
+
+        if side > 0:
+            peak = np.maximum.accumulate(np.r_[best, h[:-1]])
+            stops = np.maximum(trade.stop_loss, peak - trade.trail_stop)
+            hit_sl = l <= stops
+            hit_tp = h >= trade.take_profit
+        else:
+            trough = np.minimum.accumulate(np.r_[best, l[:-1]])
+            stops = np.minimum(trade.stop_loss, trough + trade.trail_stop)
+            hit_sl = h >= stops
+            hit_tp = l <= trade.take_profit
+
+        hit = hit_sl | hit_tp
+        k = int(np.argmax(hit))
+        if hit[k]:
+            if hit_sl[k]:
+                fill = min(o[k], stops[k]) if side > 0 else max(o[k], stops[k])
+                reason = "SL_HIT" if stops[k] == trade.stop_loss else "TRAIL_HIT"
+            else:
+                tp = trade.take_profit
+                fill = max(o[k], tp) if side > 0 else min(o[k], tp)
+                reason = "TP_HIT"
+            return start + k, float(fill), reason
+
+        best = max(best, h.max()) if side > 0 else min(best, l.min())
+        start = stop_at
+        window *= 2
+    trade.best_price = best
+    return None
+
+
+def find_close_exit(trade: ActiveTrade, close, start, end):
+    """
+    check_trade_exit() over [start, end) at once: the first bar whose Close
+    is through the stop loss or the take profit, as (bar, close, reason),
+    or None. Searched in growing windows like find_intrabar_exit().
+    """
+    window = EXIT_SEARCH_WINDOW
+    while start < end:
+        stop_at = min(start + window, end)
+        c = close[start:stop_at]
+        if trade.side > 0:
+            hit_sl, hit_tp = c <= trade.stop_loss, c >= trade.take_profit
+        else:
+            hit_sl, hit_tp = c >= trade.stop_loss, c <= trade.take_profit
+        hit = hit_sl | hit_tp
+        k = int(np.argmax(hit))
+        if hit[k]:
+            return start + k, float(c[k]), "SL_HIT" if hit_sl[k] else "TP_HIT"
+        start = stop_at
+        window *= 2
+    return None
+
+
 # -------------------- Backtesting Logic --------------------
 
 
@@ -71,6 +295,56 @@ def parse_args():
     ap = argparse.ArgumentParser()
     ap.add_argument("--tf", default="5m", help="Low Timeframe (LTF) for entry")
     ap.add_argument("--years", type=int, default=5)
+    ap.add_argument(
+        "--scalar-signals",
+        action="store_true",
+        help="Evaluate strategies row by row instead of as whole-column arrays",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Backtest symbols in a pool of N processes (1 = sequential)",
+    )
+    ap.add_argument(
+        "--exits",
+        choices=["intrabar", "close"],
+        default="intrabar",
+        help="intrabar: first High/Low touch of stop/target/trail; close: Close only",
+    )
+    ap.add_argument(
+        "--stocks",
+        action="store_true",
+        help="Also backtest the stock universe (regime from daily SPY/VIX)",
+    )
+    ap.add_argument(
+        "--portfolio",
+        action="store_true",
+        help="One shared equity pool across all symbols, bars merged by timestamp",
+    )
+    ap.add_argument(
+        "--max-positions",
+        type=int,
+        default=0,
+        help="Portfolio mode: most positions open at once (0 = one per symbol)",
+    )
+    ap.add_argument(
+        "--chunk-bars",
+        type=int,
+        default=0,
+        help=f"Backtest each symbol in slices of N bars (0 = whole series; e.g. {CHUNK_BARS})",
+    )
+    ap.add_argument(
+        "--from-cache",
+        action="store_true",
+        help="Read bars straight from the local bar cache instead of fetching them",
+    )
+    ap.add_argument(
+        "--dtype",
+        choices=["float64", "float32"],
+        default=None,
+        help="Store indicator columns as this dtype (float32 halves feature memory)",
+    )
     return ap.parse_args()
 
 
@@ -84,14 +358,97 @@ def backtest_symbol(
     rules_cfg,
     strategy_trigger,
     mode,
+    df=None,
+    vectorized=True,
+    exit_mode="intrabar",
+    regime_daily=None,
+    chunk_bars=0,
+    store=None,
+    dtype=None,
+    cache=True,
 ):
-    """Run backtest for one symbol."""
+    """
+    Run backtest for one symbol. Pass `df` to reuse already-fetched bars (a
+    frame or BarStore records), or `store` to read them from the bar cache.
+    `regime_daily` (from regime_series) gives stock mode its regime per bar.
+    `chunk_bars` > 0 runs it through backtest_chunked. `dtype` is the
+    indicator columns' dtype (see add_indicators). `cache=False` skips the
+    feature cache (see prepare_features).
+    """
+
+    # Use single bars fetch (LTF), paginated back to the start of the window
+    if df is None:
+        if store is not None:
+            df = store.read(symbol, tf)
+        else:
+            df = feed.bars(symbol, tf, since=start_date)
+    if df is None:
+        return TradeLog(), 0, 0
+
+    if chunk_bars:
+        return backtest_chunked(
+            df,
+            symbol,
+            start_date,
+            end_date,
+            global_cfg,
+            rules_cfg,
+            strategy_trigger,
+            mode,
+            chunk_bars=chunk_bars,
+            vectorized=vectorized,
+            exit_mode=exit_mode,
+            regime_daily=regime_daily,
+            dtype=dtype,
+        )
+
+    if isinstance(df, np.ndarray):
+        df = records_to_frame(df)
+    feats = prepare_features(df, start_date, end_date, mode, dtype, cache=cache)
+    if feats is None:
+        return TradeLog(), 0, 0
+
+    # Regime for every bar in one lookup, instead of classify() per bar
+    regime = None
+    if mode == "stock" and regime_daily is not None and not feats.empty:
+        regime = regime_at(regime_daily, feats["time"])
+
+    return simulate(
+        feats,
+        symbol,
+        global_cfg,
+        rules_cfg,
+        strategy_trigger,
+        mode,
+        vectorized,
+        exit_mode=exit_mode,
+        regime=regime,
+    )
+
+
+# Indicators simulate() itself reads: trend direction and ATR-based exits
+SIM_COLUMNS = ("EMA_S", "EMA_L", "ATR")
+
+
+def feature_columns(mode):
+    """Indicator columns a `mode` backtest reads: its strategies' plus SIM_COLUMNS."""
+    if mode == "crypto":
+        fns = (crypto_pullback_mr, crypto_pullback_mr_vec)
+    else:
+        fns = (mean_revert_pullback, mean_revert_pullback_vec)
+    return columns_for(*fns, extra=SIM_COLUMNS)
 
-    # Use single bars fetch (LTF)
-    df = feed.bars(symbol, tf)
 
+def prepare_features(df, start_date, end_date, mode=None, dtype=None, cache=True):
+    """
+    Bars inside [start_date, end_date] with indicators, or None if too few.
+    With `mode`, only the columns that mode's backtest reads are computed.
+    Frames come from the feature cache when these bars were seen before;
+    `cache=False` computes them directly and keeps nothing around, for
+    callers that see each symbol's bars once (pool workers, portfolio runs).
+    """
     if df.empty or len(df) < 60:
-        return [], 0, 0
+        return None
 
     # --- Data Filtering ---
     if "time" not in df.columns:
@@ -102,154 +459,645 @@ def backtest_symbol(
         drop=True
     )
     if df.empty:
-        return [], 0, 0
+        return None
 
     # Simplified add_indicators call (single DF)
-    feats = add_indicators(df)
+    columns = feature_columns(mode) if mode else None
+    if not cache:
+        return add_indicators(df, columns=columns, dtype=dtype)
+    return cached_indicators(df, columns=columns, dtype=dtype)
+
+
+def _open_trade(r_price, r_atr, r_time, i, side, reasons, equity, symbol, global_cfg, mode):
+    # Calculate Exits (Uses the correct risk multipliers based on mode)
+    stop, tp, trail_stop = calc_exits(
+        r_price,
+        r_atr,
+        global_cfg["risk"][mode]["stop_atr_mult"],
+        global_cfg["risk"][mode]["tp_atr_mult"],
+        global_cfg["risk"][mode]["trail_atr_mult"],
+        side,
+    )
 
-    trades_log = []
-    equity = 100000
-    max_equity, min_equity = equity, equity
-    active_trade: ActiveTrade = None
+    # Calculate Units (Volatility-adjusted size)
+    units = position_size(
+        equity,
+        r_atr,
+        global_cfg["risk"][mode]["stop_atr_mult"],
+        global_cfg["risk"]["risk_per_trade_pct"],
+        r_price,
+    )
+
+    return ActiveTrade(
+        entry_price=r_price,
+        units=units,
+        side=side,
+        stop_loss=stop,
+        take_profit=tp,
+        trail_stop=trail_stop,
+        entry_time=r_time,
+        entry_bar=i,
+        symbol=symbol,
+        reasons=reasons,
+        entry_equity=equity,
+    )
+
+
+def entry_signals(feats, rules_cfg, mode, regime=None):
+    """
+    Whole-series weighted votes and reasons, matching the per-bar voting loop.
+    Returns (weighted_votes, [VoteArray, ...]).
+    """
+    ema_s = feats["EMA_S"].to_numpy()
+    trend_dir = np.where(ema_s > feats["EMA_L"].to_numpy(), 1, -1)
+
+    # Strategy Routing Logic - ONLY MEAN REVERSION FOR NOW
+    votes_list = []
+    if mode == "crypto":
+        votes_list = [
+            crypto_pullback_mr_vec(feats, rules_cfg["mean_revert_pullback"], trend_dir)
+        ]
+    elif mode == "stock":
+        votes_list = [
+            mean_revert_pullback_vec(feats, rules_cfg["mean_revert_pullback"], regime)
+        ]
+
+    weighted_votes = np.zeros(len(feats))
+    for v in votes_list:
+        weighted_votes += v.score * v.confidence
+    return weighted_votes, votes_list
+
+
+def simulate(
+    feats,
+    symbol,
+    global_cfg,
+    rules_cfg,
+    strategy_trigger,
+    mode,
+    vectorized=True,
+    initial_equity=100000,
+    warmup=50,
+    exit_mode="intrabar",
+    regime=None,
+    active_trade: ActiveTrade = None,
+    extremes=None,
+    final=True,
+):
+    """
+    Bar-by-bar trade simulation over a feature frame.
+
+    With `vectorized`, entry votes are computed once for the whole series and
+    the loop jumps straight from one candidate bar to the next while flat; the
+    scalar path builds a row per bar and is kept as the reference behaviour.
+    `warmup` bars are skipped before trading (0 for pre-warmed slices).
+    `exit_mode` "intrabar" jumps to the first High/Low touch of the stop,
+    target or trailing stop; "close" checks each bar's Close against the
+    stop and target only. `regime` is a per-row array used by stock mode.
+    Returns (TradeLog, max_equity, min_equity).
+
+    For one slice of a longer series, `active_trade` resumes a trade carried
+    over from the previous slice, `extremes` carries (max_equity,
+    min_equity) along, and final=False trades through the last bar and
+    leaves a trade open instead of closing it (END_DATA); the open trade (or
+    None) is then returned as a fourth value.
+    """
+    trades_log = TradeLog()
+    equity = initial_equity
+    max_equity, min_equity = extremes or (equity, equity)
+
+    n = len(feats)
+    last = n - 1 if final else n  # bars from here on are not traded
+    if n <= warmup + 1:
+        result = (trades_log, max_equity, min_equity)
+        return result if final else result + (active_trade,)
+
+    close = feats["Close"].to_numpy()
+    atr = feats["ATR"].to_numpy()
+    times = feats["time"].to_numpy().astype("datetime64[ns]").view("int64")
+    if exit_mode == "intrabar":
+        open_ = feats["Open"].to_numpy()
+        high = feats["High"].to_numpy()
+        low = feats["Low"].to_numpy()
+
+    if vectorized:
+        weighted, votes_list = entry_signals(feats, rules_cfg, mode, regime)
+        candidates = np.flatnonzero(np.abs(weighted) >= strategy_trigger)
 
     # --- Backtest Loop ---
-    for i in range(50, len(feats) - 1):
-        r = feats.iloc[i]
+    i = warmup
+    while i < last:
+        price = close[i]
 
         # -------------------- 1. Check for Trade Exit --------------------
-        if active_trade:
+        if active_trade and exit_mode == "intrabar":
+            hit = find_intrabar_exit(active_trade, open_, high, low, i, last)
+            j = hit[0] if hit else last
+
+            # Equity curve metrics over the bars the trade stayed open
+            if j > i:
+                held = (
+                    (close[i:j] - active_trade.entry_price)
+                    * active_trade.side
+                    * active_trade.units
+                )
+                max_equity = max(max_equity, equity + held.max())
+                min_equity = min(min_equity, equity + held.min())
+            if hit is None:
+                break
+
+            _, price, reason = hit
+            pnl = (price - active_trade.entry_price) * active_trade.side * active_trade.units
+            equity += pnl
+            trades_log.append(active_trade, times[j], price, pnl, equity, reason)
+            active_trade = None
+            i = j
+            price = close[i]
+
+        elif active_trade:
             is_closed, pnl, reason = check_trade_exit(
-                active_trade, r, i, r["Close"], equity
+                active_trade, None, i, price, equity
             )
 
             if is_closed:
-                # LOGGING ADVANCED METRICS ON EXIT
-                duration = r["time"] - active_trade.entry_time
-                return_pct = pnl / active_trade.entry_equity
-
                 equity += pnl
-                trades_log.append(
-                    {
-                        "time": r["time"],
-                        "symbol": symbol,
-                        "side": "BUY" if active_trade.side > 0 else "SELL",
-                        "entry": active_trade.entry_price,
-                        "exit": r["Close"],
-                        "pnl": pnl,
-                        "equity": equity,
-                        "units": active_trade.units,
-                        "entry_time": active_trade.entry_time,
-                        "entry_equity": active_trade.entry_equity,
-                        "duration_min": duration.total_seconds() / 60,
-                        "return_pct": return_pct,
-                        "reasons": active_trade.reasons + f" | EXIT_{reason}",
-                    }
-                )
+                trades_log.append(active_trade, times[i], price, pnl, equity, reason)
                 active_trade = None
 
             # Update equity curve metrics even if trade is still open
             if active_trade:
                 current_pnl = (
-                    (r["Close"] - active_trade.entry_price)
+                    (price - active_trade.entry_price)
                     * active_trade.side
                     * active_trade.units
                 )
                 current_equity = equity + current_pnl
                 max_equity = max(max_equity, current_equity)
                 min_equity = min(min_equity, current_equity)
+                i += 1
                 continue
 
         # -------------------- 2. Check for New Entry --------------------
-
-        weighted_votes, reasons = 0.0, []
-        trend_dir = 1 if r["EMA_S"] > r["EMA_L"] else -1
-
-        # Strategy Routing Logic - ONLY MEAN REVERSION FOR NOW
-        votes_list = []
-        if mode == "crypto":
-            v1 = crypto_pullback_mr(r, rules_cfg["mean_revert_pullback"], trend_dir)
-            votes_list = [v1]
-        # Stock mode is bypassed at the main function level
-
-        # Weighted Vote Summation
-        for v in votes_list:
-            weighted_votes += v.score * v.confidence
-            if v.score != 0:
-                reasons.append(v.reason)
+        if vectorized:
+            # Flat: skip directly to the next bar whose vote clears the trigger
+            k = np.searchsorted(candidates, i)
+            if k == len(candidates) or candidates[k] >= last:
+                break
+            i = candidates[k]
+            weighted_votes = weighted[i]
+            reasons = [v.reason[i] for v in votes_list if v.score[i] != 0]
+        else:
+            r = feats.iloc[i]
+            weighted_votes, reasons = 0.0, []
+            trend_dir = 1 if r["EMA_S"] > r["EMA_L"] else -1
+
+            # Strategy Routing Logic - ONLY MEAN REVERSION FOR NOW
+            votes_list = []
+            if mode == "crypto":
+                v1 = crypto_pullback_mr(r, rules_cfg["mean_revert_pullback"], trend_dir)
+                votes_list = [v1]
+            elif mode == "stock":
+                day_regime = regime[i] if regime is not None else 0
+                v1 = mean_revert_pullback(r, rules_cfg["mean_revert_pullback"], day_regime)
+                votes_list = [v1]
+
+            # Weighted Vote Summation
+            for v in votes_list:
+                weighted_votes += v.score * v.confidence
+                if v.score != 0:
+                    reasons.append(v.reason)
 
         # Only take a trade if the absolute weighted score exceeds the trigger
         if abs(weighted_votes) >= strategy_trigger:
             side = 1 if weighted_votes > 0 else -1
-            price, atr = r["Close"], r["ATR"]
-
-            # Calculate Exits (Uses the correct risk multipliers based on mode)
-            stop, tp, trail_stop = calc_exits(
-                price,
-                atr,
-                global_cfg["risk"][mode]["stop_atr_mult"],
-                global_cfg["risk"][mode]["tp_atr_mult"],
-                global_cfg["risk"][mode]["trail_atr_mult"],
+            active_trade = _open_trade(
+                close[i],
+                atr[i],
+                times[i],
+                i,
                 side,
-            )
-
-            # Calculate Units (Volatility-adjusted size)
-            units = position_size(
+                ",".join(reasons),
                 equity,
-                atr,
-                global_cfg["risk"][mode]["stop_atr_mult"],
-                global_cfg["risk"]["risk_per_trade_pct"],
-                price,
-            )
-
-            # Open the trade
-            active_trade = ActiveTrade(
-                entry_price=price,
-                units=units,
-                side=side,
-                stop_loss=stop,
-                take_profit=tp,
-                trail_stop=trail_stop,
-                entry_time=r["time"],
-                entry_bar=i,
-                symbol=symbol,
-                reasons=",".join(reasons),
-                entry_equity=equity,
+                symbol,
+                global_cfg,
+                mode,
             )
+        i += 1
 
     # -------------------- 3. Handle Open Trade at End of Data --------------------
-    if active_trade:
-        # LOGGING ADVANCED METRICS ON END OF DATA
-        last_price = feats.iloc[len(feats) - 1]["Close"]
+    if active_trade and final:
+        last_price = close[n - 1]
         pnl = (
             (last_price - active_trade.entry_price)
             * active_trade.side
             * active_trade.units
         )
-        duration = feats.iloc[len(feats) - 1]["time"] - active_trade.entry_time
-        return_pct = pnl / active_trade.entry_equity
         equity += pnl
-
         trades_log.append(
-            {
-                "time": feats.iloc[len(feats) - 1]["time"],
-                "symbol": symbol,
-                "side": "BUY" if active_trade.side > 0 else "SELL",
-                "entry": active_trade.entry_price,
-                "exit": last_price,
-                "pnl": pnl,
-                "equity": equity,
-                "units": active_trade.units,
-                "entry_time": active_trade.entry_time,
-                "entry_equity": active_trade.entry_equity,
-                "duration_min": duration.total_seconds() / 60,
-                "return_pct": return_pct,
-                "reasons": active_trade.reasons + " | EXIT_END_DATA",
-            }
+            active_trade, times[n - 1], last_price, pnl, equity, "END_DATA"
+        )
+        active_trade = None
+
+    result = (trades_log, max_equity, min_equity)
+    return result if final else result + (active_trade,)
+
+
+# -------------------- Chunked Backtest --------------------
+
+CHUNK_BARS = 100_000  # bars per slice in chunked mode
+# Bars re-read ahead of each slice so EMA_L/ADX/MACD (recursive) converge to
+# the same values as over the full series; ~20x the longest EMA period
+CHUNK_OVERLAP = 1000
+
+
+def _epoch_ms(when):
+    return pd.Timestamp(when).value // 1_000_000
+
+
+def backtest_chunked(
+    bars,
+    symbol,
+    start_date,
+    end_date,
+    global_cfg,
+    rules_cfg,
+    strategy_trigger,
+    mode,
+    chunk_bars=CHUNK_BARS,
+    overlap=CHUNK_OVERLAP,
+    vectorized=True,
+    exit_mode="intrabar",
+    regime_daily=None,
+    initial_equity=100000,
+    dtype=None,
+):
+    """
+    backtest_symbol over fixed-size slices, so peak memory follows
+    `chunk_bars` rather than the length of the history.
+
+    `bars` is a Feed frame or BarStore records (a memmap is only read a
+    slice at a time). Each slice gets indicators over itself plus `overlap`
+    bars before it, is simulated from its own first bar, and hands equity,
+    the equity extremes and any open trade to the next. VWAP, the only
+    cumulative indicator, is continued across slices. `chunk_bars` is kept
+    at 2x `overlap` or more. Returns (TradeLog, max_equity, min_equity).
+    """
+    rec = bars if isinstance(bars, np.ndarray) else frame_to_records(bars)
+    if len(rec) < 60:
+        return TradeLog(), 0, 0
+    times = rec["time"]
+    lo = int(np.searchsorted(times, _epoch_ms(start_date)))
+    hi = int(np.searchsorted(times, _epoch_ms(end_date), side="right"))
+    if lo >= hi:
+        return TradeLog(), 0, 0
+    chunk_bars = max(chunk_bars, 2 * overlap)
+
+    logs, trade, extremes = [], None, None
+    equity = initial_equity
+    cum_pv = cum_v = 0.0  # VWAP sums over rec[lo:a]
+    s = lo
+    while s < hi:
+        e = min(s + chunk_bars, hi)
+        if hi - e < 2:
+            e = hi  # never leave a 1-bar tail slice
+        a = lo if s == lo else s - overlap
+
+        frame = records_to_frame(rec[a:e])
+        feats = add_indicators(frame, columns=feature_columns(mode), dtype=dtype)
+
+        pv = (frame["Volume"] * (frame["High"] + frame["Low"] + frame["Close"]) / 3).to_numpy()
+        vol = frame["Volume"].to_numpy()
+        cpv = np.cumsum(np.r_[cum_pv, pv])[1:]
+        cv = np.cumsum(np.r_[cum_v, vol])[1:]
+        if "VWAP" in feats:
+            feats["VWAP"] = (cpv / cv)[feats.index.to_numpy()].astype(feats["VWAP"].dtype)
+        nxt = max(e - overlap, lo) - a  # where the next slice's bars begin
+        if nxt > 0:
+            cum_pv, cum_v = cpv[nxt - 1], cv[nxt - 1]
+
+        if s == lo:
+            warmup = 50
+        else:
+            t_ns = feats["time"].to_numpy().astype("datetime64[ns]").view("int64")
+            warmup = int(np.searchsorted(t_ns, int(times[s]) * 1_000_000))
+
+        regime = None
+        if mode == "stock" and regime_daily is not None and not feats.empty:
+            regime = regime_at(regime_daily, feats["time"])
+
+        final = e == hi
+        out = simulate(
+            feats,
+            symbol,
+            global_cfg,
+            rules_cfg,
+            strategy_trigger,
+            mode,
+            vectorized,
+            initial_equity=equity,
+            warmup=warmup,
+            exit_mode=exit_mode,
+            regime=regime,
+            active_trade=trade,
+            extremes=extremes,
+            final=final,
         )
+        log, max_eq, min_eq = out[:3]
+        trade = None if final else out[3]
+        if len(log):
+            equity = float(log["equity"][-1])
+        extremes = (max_eq, min_eq)
+        logs.append(log)
+        s = e
+
+    trades = TradeLog.concat(logs)
+    return trades, extremes[0], extremes[1]
+
+
+# -------------------- Portfolio Backtest --------------------
+
+
+@dataclass(slots=True)
+class SymbolStream:
+    """
+    One symbol's bars as bare arrays plus its cursor state in a portfolio run.
+    Entry votes are kept only for candidate bars (|vote| >= trigger).
+    """
+
+    symbol: str
+    mode: str
+    time: np.ndarray  # epoch ns
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    atr: np.ndarray
+    candidates: np.ndarray  # bar indices
+    votes: np.ndarray  # weighted vote at each candidate
+    reasons: list  # joined entry reasons at each candidate
+    warmup: int = 50
+    trade: ActiveTrade = None
+    exit_at: int = None  # bar the open trade closes on
+    exit_price: float = None
+    exit_reason: str = None
+    marked: int = 0  # first bar of the open trade not yet marked to market
+    open_pnl: float = 0.0  # open trade's P&L at the last marked bar
+
+
+def build_stream(feats, symbol, mode, rules_cfg, strategy_trigger, regime=None, warmup=50):
+    """
+    SymbolStream from a feature frame. Only the columns the simulation reads
+    are copied out, so the frame (and its indicator block) can be freed.
+    """
+    weighted, votes_list = entry_signals(feats, rules_cfg, mode, regime)
+    candidates = np.flatnonzero(np.abs(weighted) >= strategy_trigger)
+    reasons = [
+        sys.intern(",".join(v.reason[i] for v in votes_list if v.score[i] != 0))
+        for i in candidates
+    ]
+    col = lambda name: feats[name].to_numpy(dtype=float, copy=True)
+    return SymbolStream(
+        symbol=symbol,
+        mode=mode,
+        time=feats["time"].to_numpy().astype("datetime64[ns]").view("int64").copy(),
+        open=col("Open"),
+        high=col("High"),
+        low=col("Low"),
+        close=col("Close"),
+        atr=col("ATR"),
+        candidates=candidates,
+        votes=weighted[candidates],
+        reasons=reasons,
+        warmup=warmup,
+    )
+
+
+def _next_candidate(stream, i):
+    """Index into stream.candidates of the first entry bar >= i, or None."""
+    c = int(np.searchsorted(stream.candidates, i))
+    if c == len(stream.candidates) or stream.candidates[c] >= len(stream.close) - 1:
+        return None
+    return c
+
+
+def _exit_of(stream, exit_mode):
+    """Find where stream.trade (just opened) closes: its exit bar, price and reason."""
+    s, n = stream, len(stream.close)
+    start = s.trade.entry_bar + 1
+    if exit_mode == "intrabar":
+        hit = find_intrabar_exit(s.trade, s.open, s.high, s.low, start, n - 1)
+    else:
+        hit = find_close_exit(s.trade, s.close, start, n - 1)
+    if hit is None:
+        hit = (n - 1, float(s.close[n - 1]), "END_DATA")
+    s.exit_at, s.exit_price, s.exit_reason = hit
+
+
+def _mark_to_market(streams, open_ks, until):
+    """
+    Summed P&L of the open positions at every bar time before `until` that
+    hasn't been marked yet, each position valued at its latest close by then.
+    Returns that curve (None if there were no such bars) and advances every
+    stream's mark.
+    """
+    segments = []
+    for k in open_ks:
+        s = streams[k]
+        hi = int(np.searchsorted(s.time, until, side="left"))
+        if hi > s.marked:
+            t = s.trade
+            pnl = (s.close[s.marked : hi] - t.entry_price) * t.side * t.units
+            segments.append((s, s.time[s.marked : hi], pnl, hi))
+    if not segments:
+        return None
+
+    moving = {id(s) for s, _, _, _ in segments}
+    curve = sum(streams[k].open_pnl for k in open_ks if id(streams[k]) not in moving)
+    if len(segments) == 1:
+        curve = segments[0][2] + curve
+    else:
+        # As-of join of every position's P&L onto the union of their bar times
+        grid = np.unique(np.concatenate([times for _, times, _, _ in segments]))
+        for s, times, pnl, _ in segments:
+            idx = np.searchsorted(times, grid, side="right") - 1
+            curve = curve + np.where(idx >= 0, pnl[np.maximum(idx, 0)], s.open_pnl)
+    for s, _, pnl, hi in segments:
+        s.open_pnl, s.marked = float(pnl[-1]), hi
+    return curve
+
+
+def portfolio_simulate(
+    streams, global_cfg, exit_mode="intrabar", initial_equity=100000, max_positions=0
+):
+    """
+    Backtest several symbols against one shared equity pool.
+
+    Events are consumed in timestamp order through a heap of per-symbol
+    cursors (a k-way merge), so positions in different symbols overlap and
+    each entry is sized from the pool's realized equity at that moment. A
+    flat symbol's cursor jumps straight to its next candidate bar; an open
+    trade's exit bar is found when it opens (find_intrabar_exit() or
+    find_close_exit()) and its cursor jumps there. Between events the open
+    positions are marked to market with array maths, not bar by bar. Per
+    symbol the trade rules are those of simulate() (one position per symbol;
+    with a single stream the result is identical). `max_positions` caps how
+    many are open at once (0 = no cap). Returns (TradeLog, max_equity, min_equity).
+    """
+    trades_log = TradeLog()
+    equity = initial_equity
+    max_equity, min_equity = equity, equity
+    open_ks = {}  # stream index -> None, in the order trades opened
+
+    heap = []
+    for k, s in enumerate(streams):
+        if len(s.close) <= s.warmup + 1:
+            continue
+        c = _next_candidate(s, s.warmup)
+        if c is not None:
+            i = int(s.candidates[c])
+            heap.append((int(s.time[i]), k, i))
+    heapq.heapify(heap)
+
+    while heap:
+        when, k, i = heapq.heappop(heap)
+        s = streams[k]
+        n = len(s.close)
+
+        # Open positions over the bars before this event
+        if open_ks:
+            curve = _mark_to_market(streams, open_ks, when)
+            if curve is not None:
+                max_equity = max(max_equity, equity + curve.max())
+                min_equity = min(min_equity, equity + curve.min())
+
+        # -------------------- 1. Exit the open trade (its cursor sits on the exit bar) --------------------
+        trade = s.trade
+        if trade is not None:
+            pnl = (s.exit_price - trade.entry_price) * trade.side * trade.units
+            equity += pnl
+            trades_log.append(trade, s.time[i], s.exit_price, pnl, equity, s.exit_reason)
+            s.trade, s.exit_at, s.open_pnl = None, None, 0.0
+            del open_ks[k]
+            if i == n - 1:
+                continue
+
+        # -------------------- 2. Entry (or skip to the next candidate) --------------------
+        c = _next_candidate(s, i)
+        if c is not None and s.candidates[c] == i and max_positions and len(open_ks) >= max_positions:
+            c = _next_candidate(s, i + 1)  # pool is full: this signal is passed over
+        if c is None:
+            continue
+        j = int(s.candidates[c])
+        if j > i:
+            heapq.heappush(heap, (int(s.time[j]), k, j))
+            continue
+
+        side = 1 if s.votes[c] > 0 else -1
+        s.trade = _open_trade(
+            s.close[i], s.atr[i], s.time[i], i, side, s.reasons[c], equity, s.symbol, global_cfg, s.mode
+        )
+        _exit_of(s, exit_mode)
+        s.marked = i + 1
+        open_ks[k] = None
+        heapq.heappush(heap, (int(s.time[s.exit_at]), k, s.exit_at))
 
     return trades_log, max_equity, min_equity
 
 
+def run_portfolio(frames, symbols, crypto, start_date, end_date, global_cfg, rules_cfg, trigger, exit_mode, regime_daily=None, max_positions=0, dtype=None):
+    """
+    Build a stream per symbol (popping its bars from `frames` as it goes, so
+    raw bars and indicator frames never pile up) and run portfolio_simulate.
+    """
+    streams = []
+    for symbol in symbols:
+        mode = "crypto" if symbol in crypto else "stock"
+        bars = frames.pop(symbol, None)
+        if isinstance(bars, np.ndarray):
+            bars = records_to_frame(bars)
+        feats = prepare_features(
+            bars if bars is not None else pd.DataFrame(), start_date, end_date, mode, dtype,
+            cache=False,
+        )
+        if feats is None:
+            logging.warning(f"No data for {symbol}")
+            continue
+        regime = None
+        if mode == "stock" and regime_daily is not None:
+            regime = regime_at(regime_daily, feats["time"])
+        streams.append(build_stream(feats, symbol, mode, rules_cfg, trigger, regime))
+        del feats
+    logging.info(f"📚 Portfolio backtest over {len(streams)} symbols ({exit_mode} exits) ...")
+    return portfolio_simulate(
+        streams, global_cfg, exit_mode, max_positions=max_positions
+    )
+
+
+def _backtest_job(symbol, df, tf, start_date, end_date, global_cfg, rules_cfg, trigger, mode, vectorized, exit_mode="intrabar", regime_daily=None, chunk_bars=0, store=None, dtype=None, cache=True):
+    """
+    One symbol's backtest, safe to run in a worker process. Never raises:
+    returns (symbol, (trades, max_eq, min_eq), error_text_or_None).
+    """
+    try:
+        outcome = backtest_symbol(
+            None,
+            symbol,
+            tf,
+            start_date,
+            end_date,
+            global_cfg,
+            rules_cfg,
+            trigger,
+            mode,
+            df=df,
+            vectorized=vectorized,
+            exit_mode=exit_mode,
+            regime_daily=regime_daily,
+            chunk_bars=chunk_bars,
+            store=store,
+            dtype=dtype,
+            cache=cache,
+        )
+        return symbol, outcome, None
+    except Exception:
+        return symbol, (TradeLog(), 0, 0), traceback.format_exc()
+
+
+def run_backtests(jobs, workers=1):
+    """
+    Run {symbol: job_args} either inline or across a process pool, yielding
+    (symbol, outcome, error) as each symbol finishes. Pool workers skip the
+    feature cache: each would hold its own copy that no later run reads.
+    """
+    if workers <= 1:
+        for symbol, job in jobs.items():
+            yield _backtest_job(symbol, *job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_backtest_job, symbol, *job, cache=False): symbol
+            for symbol, job in jobs.items()
+        }
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception:
+                # e.g. the worker process died outright
+                yield futures[fut], (TradeLog(), 0, 0), traceback.format_exc()
+
+
+def load_regime(feed, global_cfg, start_date):
+    """Daily SPY/VIX regime series covering the backtest (plus EMA warm-up)."""
+    daily = feed.bars_many(["SPY", "VIX"], "1D", since=start_date - dt.timedelta(days=120))
+    spy, vix = daily.get("SPY"), daily.get("VIX")
+    if spy is None or vix is None or spy.empty or vix.empty:
+        logging.warning("SPY/VIX missing — stock backtests run with a neutral regime")
+        return None
+    cfg = global_cfg.get("regime", {})
+    return regime_series(spy, vix, cfg.get("bull_vix_lt", 18), cfg.get("bear_vix_gt", 22))
+
+
 def main():
     args = parse_args()
     setup_logging()
@@ -271,51 +1119,118 @@ def main():
     crypto = uni_cfg["universe"]["crypto"]
     results = []
 
-    all_equity_data = {"stock": [], "crypto": []}
-
-    # 🚨 CRITICAL FIX: ITERATE ONLY OVER CRYPTO
-    for symbol in crypto:
-        is_crypto = symbol in crypto
-        mode = "crypto" if is_crypto else "stock"
-        logging.info(f"Backtesting {symbol} ({mode}) ...")
-
-        # FIX APPLIED HERE: Strategy trigger is set to 1
-        trades, max_eq, min_eq = backtest_symbol(
-            feed,
-            symbol,
-            tf,
+    all_equity_data = {"stock": [], "crypto": [], "portfolio": []}
+
+    # --from-cache: each run reads its own bars from the on-disk cache (memory-mapped)
+    store = feed.store if args.from_cache else None
+    if args.from_cache and store is None:
+        logging.warning("Bar cache is disabled (BAR_CACHE_DIR) — fetching bars instead")
+
+    # Pull every symbol's history concurrently within the Binance rate budget
+    frames = {} if store else feed.bars_many(crypto, tf, since=start_date)
+
+    # 🚨 CRITICAL FIX: ITERATE ONLY OVER CRYPTO (stocks only on request)
+    symbols = list(crypto)
+    regime_daily = None
+    if args.stocks:
+        symbols += stocks
+        if not store:
+            frames.update(feed.bars_many(stocks, tf, since=start_date))
+        regime_daily = load_regime(feed, global_cfg, start_date)
+        if "stock" not in global_cfg["risk"]:
+            logging.warning("No risk.stock block in global.yml — using risk.crypto")
+            global_cfg["risk"]["stock"] = global_cfg["risk"]["crypto"]
+
+    if args.portfolio:
+        if store:
+            frames = {s: store.read(s, tf) for s in symbols}
+        trades, max_eq, min_eq = run_portfolio(
+            frames,
+            symbols,
+            crypto,
             start_date,
             end_date,
             global_cfg,
             rules_cfg,
             1,  # Hardcoded trigger of 1 for single-signal strategy
-            mode,
+            args.exits,
+            regime_daily,
+            args.max_positions,
+            args.dtype,
         )
-
-        if trades:
-            results.extend(trades)
-            df = pd.DataFrame(trades)
-
+        df = trades.to_frame()
+        if not df.empty:
+            results.append(df)
+        # One shared pool: its curve stands in for every group's
+        for mode in ("stock", "crypto", "portfolio"):
             all_equity_data[mode].append({"max_eq": max_eq, "min_eq": min_eq})
-
-            total_pnl = df["pnl"].sum()
-            winrate = (df["pnl"] > 0).mean() * 100
+        for symbol, sym_df in df.groupby("symbol", sort=False):
             logging.info(
-                f"{symbol} done | Trades={len(df)} | Win%={winrate:.1f} | PnL={total_pnl:.2f}"
+                f"{symbol} done | Trades={len(sym_df)} | Win%={(sym_df['pnl'] > 0).mean() * 100:.1f} "
+                f"| PnL={sym_df['pnl'].sum():.2f}"
             )
-        else:
-            logging.warning(f"No data or trades for {symbol}")
+    else:
+        jobs = {}
+        for symbol in symbols:
+            is_crypto = symbol in crypto
+            mode = "crypto" if is_crypto else "stock"
+            logging.info(f"Backtesting {symbol} ({mode}, {args.exits} exits) ...")
+
+            # FIX APPLIED HERE: Strategy trigger is set to 1
+            jobs[symbol] = (
+                frames.get(symbol, None if store else pd.DataFrame()),
+                tf,
+                start_date,
+                end_date,
+                global_cfg,
+                rules_cfg,
+                1,  # Hardcoded trigger of 1 for single-signal strategy
+                mode,
+                not args.scalar_signals,
+                args.exits,
+                regime_daily if mode == "stock" else None,
+                args.chunk_bars,
+                store,
+                args.dtype,
+            )
+
+        # Results stream back as symbols finish; merge in universe order afterwards
+        outcomes = {}
+        for symbol, outcome, err in run_backtests(jobs, args.workers):
+            if err:
+                logging.error(f"❌ Backtest failed for {symbol}:\n{err}")
+            outcomes[symbol] = outcome
+
+        for symbol in symbols:
+            mode = jobs[symbol][7]
+            trades, max_eq, min_eq = outcomes.get(symbol, (TradeLog(), 0, 0))
+
+            if trades:
+                df = trades.to_frame()
+                results.append(df)
+
+                all_equity_data[mode].append({"max_eq": max_eq, "min_eq": min_eq})
+
+                total_pnl = df["pnl"].sum()
+                winrate = (df["pnl"] > 0).mean() * 100
+                logging.info(
+                    f"{symbol} done | Trades={len(df)} | Win%={winrate:.1f} | PnL={total_pnl:.2f}"
+                )
+            else:
+                logging.warning(f"No data or trades for {symbol}")
 
     # save results
     os.makedirs("logs", exist_ok=True)
     out_file = "logs/backtest_results.csv"
-    pd.DataFrame(results).to_csv(out_file, index=False)
+    df = pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+    df.to_csv(out_file, index=False)
     logging.info(
-        f"✅ Backtest complete | {len(results)} total trades | saved to {out_file}"
+        f"✅ Backtest complete | {len(df)} total trades | saved to {out_file}"
     )
+    if args.workers <= 1 and not args.portfolio:
+        logging.info(f"🧮 Feature cache: {default_cache().stats()}")
 
     # summary by type
-    df = pd.DataFrame(results)
     initial_equity = 100000
 
     if not df.empty:
@@ -358,28 +1273,16 @@ def main():
             avg_holding_hrs = avg_holding_min / 60
             avg_holding_days = avg_holding_hrs / 24
 
-            if mode == "stock":
-                max_eq = (
-                    max([d["max_eq"] for d in all_equity_data["stock"]])
-                    if all_equity_data["stock"]
-                    else initial_equity
-                )
-                min_eq = (
-                    min([d["min_eq"] for d in all_equity_data["stock"]])
-                    if all_equity_data["stock"]
-                    else initial_equity
-                )
-            else:
-                max_eq = (
-                    max([d["max_eq"] for d in all_equity_data["crypto"]])
-                    if all_equity_data["crypto"]
-                    else initial_equity
-                )
-                min_eq = (
-                    min([d["min_eq"] for d in all_equity_data["crypto"]])
-                    if all_equity_data["crypto"]
-                    else initial_equity
-                )
+            max_eq = (
+                max([d["max_eq"] for d in all_equity_data[mode]])
+                if all_equity_data[mode]
+                else initial_equity
+            )
+            min_eq = (
+                min([d["min_eq"] for d in all_equity_data[mode]])
+                if all_equity_data[mode]
+                else initial_equity
+            )
 
             # Calmar Ratio
             max_drawdown_usd = max_eq - min_eq
@@ -405,6 +1308,8 @@ def main():
 
         summary("STOCK", stock_df, "stock")
         summary("CRYPTO", crypto_df, "crypto")
+        if args.portfolio:
+            summary("PORTFOLIO", df, "portfolio")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+# === src/barstore.py (On-Disk OHLCV Cache) ===
+import json
+import logging
+import os
+import numpy as np
+import pandas as pd
+
+# One fixed-width record per bar, so files can be appended to and memory-mapped
+BAR_DTYPE = np.dtype(
+    [
+        ("time", "<i8"),  # epoch ms (UTC)
+        ("Open", "<f8"),
+        ("High", "<f8"),
+        ("Low", "<f8"),
+        ("Close", "<f8"),
+        ("Volume", "<f8"),
+    ]
+)
+
+BAR_CACHE_DIR = os.path.join("data", "bars")
+
+
+def frame_to_records(df: pd.DataFrame) -> np.ndarray:
+    """Convert a Feed-style OHLCV frame into a sorted, de-duplicated record array."""
+    if df is None or df.empty:
+        return np.empty(0, dtype=BAR_DTYPE)
+    rec = np.empty(len(df), dtype=BAR_DTYPE)
+    times = pd.to_datetime(df["time"])
+    if getattr(times.dt, "tz", None) is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    rec["time"] = times.astype("datetime64[ms]").astype("int64").to_numpy()
+    for col in BAR_DTYPE.names[1:]:
+        rec[col] = df[col].to_numpy(dtype="float64")
+    rec.sort(order="time")
+    # Keep the LAST copy of a duplicated timestamp (the most recent fetch wins)
+    keep = np.append(rec["time"][1:] != rec["time"][:-1], True)
+    return rec[keep]
+
+
+def records_to_frame(rec: np.ndarray) -> pd.DataFrame:
+    """Inverse of frame_to_records; always returns an in-memory (non-mapped) frame."""
+    df = pd.DataFrame({col: np.array(rec[col]) for col in BAR_DTYPE.names[1:]})
+    df.insert(0, "time", pd.to_datetime(np.array(rec["time"]), unit="ms"))
+    return df
+
+
+class BarStore:
+    """
+    Append-only bar files keyed by (symbol, timeframe).
+
+    Each series lives in `<root>/<SYMBOL>_<tf>.bars` as raw BAR_DTYPE records,
+    plus a small JSON sidecar recording how far back the source was queried
+    (so a symbol listed after the requested start isn't refetched forever).
+    """
+
+    def __init__(self, root=BAR_CACHE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, symbol, tf):
+        return os.path.join(self.root, f"{symbol.replace('/', '')}_{tf}.bars")
+
+    def read(self, symbol, tf):
+        """Memory-map the cached series (read-only). Returns None when absent."""
+        path = self._path(symbol, tf)
+        if not os.path.exists(path) or os.path.getsize(path) < BAR_DTYPE.itemsize:
+            return None
+        n = os.path.getsize(path) // BAR_DTYPE.itemsize
+        return np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(n,))
+
+    def last_time(self, symbol, tf):
+        rec = self.read(symbol, tf)
+        return int(rec["time"][-1]) if rec is not None else None
+
+    def covered_from(self, symbol, tf):
+        """Earliest timestamp (ms) the source has been asked for, or None."""
+        try:
+            with open(self._path(symbol, tf) + ".json", "r", encoding="utf-8") as f:
+                return json.load(f).get("covered_from")
+        except (OSError, ValueError):
+            return None
+
+    def set_covered_from(self, symbol, tf, since_ms):
+        with open(self._path(symbol, tf) + ".json", "w", encoding="utf-8") as f:
+            json.dump({"covered_from": int(since_ms)}, f)
+
+    def write(self, symbol, tf, rec: np.ndarray):
+        """Replace the whole series (used for first loads and head backfills)."""
+        path = self._path(symbol, tf)
+        tmp = path + ".tmp"
+        rec.astype(BAR_DTYPE, copy=False).tofile(tmp)
+        os.replace(tmp, path)
+
+    def append(self, symbol, tf, rec: np.ndarray):
+        """
+        Append bars newer than the cached tail. A record with the same timestamp
+        as the last cached bar replaces it, since that candle was still forming.
+        """
+        path = self._path(symbol, tf)
+        last = self.last_time(symbol, tf)
+        if last is None:
+            self.write(symbol, tf, rec)
+            return len(rec)
+
+        rec = rec[rec["time"] >= last]
+        if not len(rec):
+            return 0
+        if rec["time"][0] == last:
+            size = os.path.getsize(path)
+            os.truncate(path, size - BAR_DTYPE.itemsize)
+        with open(path, "ab") as f:
+            rec.astype(BAR_DTYPE, copy=False).tofile(f)
+        return len(rec)
+
+    def merge(self, symbol, tf, rec: np.ndarray):
+        """Union fresh bars with the cached series and rewrite it."""
+        cached = self.read(symbol, tf)
+        if cached is not None:
+            combined = np.concatenate([np.array(cached), rec])
+            # Stable sort keeps fresh bars after cached ones so they win de-dup
+            combined = combined[np.argsort(combined["time"], kind="stable")]
+            keep = np.append(combined["time"][1:] != combined["time"][:-1], True)
+            rec = combined[keep]
+            del cached
+        self.write(symbol, tf, rec)
+        logging.info(f"🗄️ Cached {len(rec)} bars for {symbol} ({tf})")
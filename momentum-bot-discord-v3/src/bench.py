@@ -0,0 +1,285 @@
+# === src/bench.py (Offline Benchmarks for the Hot Paths) ===
+import argparse, datetime as dt, json, logging, os, platform, tempfile, time, tracemalloc
+from concurrent.futures import Future
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from src.utils import setup_logging
+from src.config import load_all, SCAN_DEFAULTS, with_defaults
+from src.indicators import add_indicators
+from src.backtest_multi import backtest_symbol, feature_columns, CHUNK_BARS
+from src.feature_cache import FeatureCache
+from src.live_indicators import IndicatorEngine
+from src import run
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 5_000_000]
+RESULTS_FILE = os.path.join("logs", "bench_results.json")
+HISTORY_FILE = os.path.join("logs", "bench_history.csv")
+
+TF_FREQ = {"5m": "5min", "15m": "15min", "1h": "1h", "1D": "1D"}
+
+
+def synthetic_bars(n, seed=0, tf="5m", start="2020-01-01", price=100.0, volume=1e6):
+    """
+    Seeded OHLCV random walk with fat-tailed returns, shaped like Feed.bars().
+    Same (n, seed) always gives the same frame.
+    """
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.standard_t(3, n) * 0.004))
+    open_ = np.r_[close[0], close[:-1]]
+    wick = np.abs(rng.normal(0, 0.003, n)) * close
+    return pd.DataFrame(
+        {
+            "time": pd.date_range(start, periods=n, freq=TF_FREQ.get(tf, "5min")),
+            "Open": open_,
+            "High": np.maximum(open_, close) + wick,
+            "Low": np.minimum(open_, close) - wick,
+            "Close": close,
+            "Volume": volume * rng.lognormal(0, 0.8, n),
+        }
+    )
+
+
+# -------------------- Offline stand-ins for run.py --------------------
+
+
+class StubFeed:
+    """
+    Serves synthetic bars with the Feed interface run.scan_cycle uses.
+    advance() reveals one more bar per series, like a new candle closing.
+    """
+
+    def __init__(self, visible=600, spare=400, seed=0):
+        self.visible = visible
+        self.history = visible + spare
+        self.seed = seed
+        self.cursor = 0
+        self._series = {}
+
+    def _frame(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._series:
+            seed = self.seed + len(self._series)
+            self._series[key] = synthetic_bars(self.history, seed, timeframe)
+        return self._series[key]
+
+    def advance(self, bars=1):
+        self.cursor += bars
+
+    def bars(self, symbol, timeframe="1h", limit=1000, since=None):
+        df = self._frame(symbol, timeframe)
+        end = min(len(df), self.visible + self.cursor)
+        return df.iloc[max(0, end - limit) : end].reset_index(drop=True)
+
+    def bars_many(self, symbols, timeframe="1h", limit=1000, since=None):
+        return {s: self.bars(s, timeframe, limit, since) for s in symbols}
+
+    def bars_as_completed(self, requests, since=None):
+        for req in requests:
+            yield req, self.bars(*req, since=since)
+
+
+class StubBroker:
+    """Accepts orders without sending them anywhere."""
+
+    def __init__(self, equity=100000.0):
+        self.equity = equity
+        self.orders = []
+
+    def account(self):
+        return SimpleNamespace(equity=self.equity)
+
+    def get_position_qty(self, symbol):
+        return 0.0
+
+    def has_exposure(self, symbol, side=None):
+        return False
+
+    def place_order(self, symbol, qty, side, type="limit", limit_price=None, time_in_force="day"):
+        self.orders.append((symbol, qty, side, type, limit_price))
+
+    def submit_order_async(self, *args, **kwargs):
+        fut = Future()
+        fut.set_result(self.place_order(*args, **kwargs))
+        return fut
+
+
+class StubAlerts:
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, msg: str):
+        self.sent += 1
+
+
+# -------------------- Measurement --------------------
+
+
+def measure(fn, repeat=1, memory=True):
+    """
+    Best wall time over `repeat` runs, plus peak traced allocation (MB) from
+    one extra run under tracemalloc so tracing overhead doesn't skew timing.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        try:
+            fn()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return best, peak_mb
+
+
+def bench_add_indicators(df, columns=None):
+    return lambda: add_indicators(df, columns=columns)
+
+
+def bench_feature_cache(df):
+    """Repeat lookup of an already-cached indicator frame (hash + LRU hit)."""
+    cache = FeatureCache()
+    cache.add_indicators(df)
+    return lambda: cache.add_indicators(df)
+
+
+def bench_backtest_symbol(df, global_cfg, rules_cfg, chunk_bars=0):
+    start, end = df["time"].iloc[0], df["time"].iloc[-1]
+    return lambda: backtest_symbol(
+        None, "BENCH", "5m", start, end, global_cfg, rules_cfg, 1, "crypto",
+        df=df.copy(), chunk_bars=chunk_bars,
+    )
+
+
+def scan_context(global_cfg, rules_cfg, uni_cfg, seed=0):
+    return run.ScanContext(
+        feed=StubFeed(seed=seed),
+        broker=StubBroker(),
+        alerts=StubAlerts(),
+        engine=IndicatorEngine(vwap_window=run.SCAN_LIMIT),
+        global_cfg=global_cfg,
+        rules_cfg=rules_cfg,
+        uni_cfg=uni_cfg,
+        tf="15m",
+        mode="paper",
+    )
+
+
+def bench_scan_cycle(ctx, warm):
+    """Cold: fresh indicator state each cycle. Warm: one new bar per cycle."""
+
+    def cycle():
+        if warm:
+            ctx.feed.advance()
+        else:
+            ctx.engine.reset()
+        run.scan_cycle(ctx)
+
+    return cycle
+
+
+def run_suite(sizes, repeat=1, memory=True, seed=42, scan_cycles=5):
+    global_cfg, rules_cfg, uni_cfg, _ = load_all()
+    global_cfg = with_defaults(global_cfg, SCAN_DEFAULTS)
+    results = []
+
+    def record(name, bars, fn, reps=repeat):
+        secs, peak = measure(fn, reps, memory)
+        row = {
+            "bench": name,
+            "bars": bars,
+            "seconds": round(secs, 6),
+            "peak_mb": None if peak is None else round(peak, 3),
+            "bars_per_sec": round(bars / secs, 1) if secs > 0 else None,
+        }
+        results.append(row)
+        logging.info(
+            f"⏱️ {name:<18} {bars:>9} bars | {secs:9.3f}s | "
+            f"{row['bars_per_sec'] or 0:>12,.0f} bars/s | peak {row['peak_mb']} MB"
+        )
+
+    for n in sizes:
+        df = synthetic_bars(n, seed)
+        record("add_indicators", n, bench_add_indicators(df))
+        record("features_crypto", n, bench_add_indicators(df, feature_columns("crypto")))
+        record("features_cached", n, bench_feature_cache(df))
+        record("backtest_symbol", n, bench_backtest_symbol(df, global_cfg, rules_cfg))
+        if n > CHUNK_BARS:
+            record(
+                "backtest_chunked",
+                n,
+                bench_backtest_symbol(df, global_cfg, rules_cfg, CHUNK_BARS),
+            )
+        del df
+
+    # Full-universe scan: every stock + crypto symbol plus SPY/VIX, offline.
+    # execute_signal appends to logs/trades.csv, so run it in a scratch dir.
+    universe = uni_cfg["universe"]["stocks"] + uni_cfg["universe"]["crypto"]
+    scan_bars = len(universe) * run.SCAN_LIMIT
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            ctx = scan_context(global_cfg, rules_cfg, uni_cfg, seed)
+            run.scan_cycle(ctx)  # build synthetic series outside the timing
+            record("scan_cycle_cold", scan_bars, bench_scan_cycle(ctx, False), scan_cycles)
+            record("scan_cycle_warm", scan_bars, bench_scan_cycle(ctx, True), scan_cycles)
+            ctx.journal.close()
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def environment():
+    return {
+        "timestamp": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def save(results, env, out_file=RESULTS_FILE, history_file=HISTORY_FILE):
+    """Write this run as JSON and append it to the CSV history for trend tracking."""
+    os.makedirs(os.path.dirname(out_file) or ".", exist_ok=True)
+    with open(out_file, "w", encoding="utf-8") as f:
+        json.dump({"env": env, "results": results}, f, indent=2)
+
+    rows = pd.DataFrame(results)
+    rows.insert(0, "timestamp", env["timestamp"])
+    rows.to_csv(
+        history_file, mode="a", index=False, header=not os.path.exists(history_file)
+    )
+
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="*", default=DEFAULT_SIZES)
+    ap.add_argument("--repeat", type=int, default=1, help="timed runs per bench (best kept)")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--scan-cycles", type=int, default=5)
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--out", default=RESULTS_FILE)
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    env = environment()
+    results = run_suite(
+        args.sizes, args.repeat, not args.no_memory, args.seed, args.scan_cycles
+    )
+    save(results, env, args.out)
+    logging.info(f"✅ Benchmarks complete | saved to {args.out}, {HISTORY_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,129 @@
-import logging
+import logging, threading, time
+from concurrent.futures import ThreadPoolExecutor
 import alpaca_trade_api as tradeapi
+from requests.adapters import HTTPAdapter
+from src.ratelimit import TokenBucket
+
+RECONCILE_SECS = 600  # full account/positions/orders refresh at most this often
+ORDER_WORKERS = 4  # concurrent order submissions (and pooled connections)
+ORDER_RATE_PER_SEC = 3.0  # Alpaca allows 200 requests/min per key
+
 
 class Broker:
-    def __init__(self, key, secret, base_url, mode='paper'):
+    """
+    Alpaca wrapper with a local cache of account, positions and open orders.
+    The cache is updated from every order we submit and reconciled with the
+    API every RECONCILE_SECS, so the scan can check exposure without a call.
+    """
+
+    def __init__(self, key, secret, base_url, mode='paper',
+                 reconcile_secs=RECONCILE_SECS, max_workers=ORDER_WORKERS,
+                 rate=ORDER_RATE_PER_SEC):
         self.api = tradeapi.REST(key, secret, base_url, api_version='v2')
         self.mode = mode
+        self.reconcile_secs = reconcile_secs
+        # Share one keep-alive pool across the order threads
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.api._session.mount('https://', adapter)
+        self.api._session.mount('http://', adapter)
+        self.bucket = TokenBucket(rate)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='orders')
+        self._lock = threading.Lock()
+        self._account = None
+        self._positions = {}     # symbol -> signed qty
+        self._open_orders = {}   # order id -> order
+        self._synced_at = None
+
+    # ---------------- cached state ----------------
+    def reconcile(self):
+        """Replace the cache with the broker's view of account, positions and open orders."""
+        self.bucket.acquire(3)
+        account = self.api.get_account()
+        positions = {p.symbol: float(p.qty) for p in self.api.list_positions()}
+        orders = {o.id: o for o in self.api.list_orders(status='open')}
+        with self._lock:
+            self._account, self._positions, self._open_orders = account, positions, orders
+            self._synced_at = time.monotonic()
+        return account
+
+    def _fresh(self):
+        return self._synced_at is not None and time.monotonic() - self._synced_at < self.reconcile_secs
 
     def account(self):
-        return self.api.get_account()
+        if not self._fresh():
+            return self.reconcile()
+        return self._account
 
     def get_position_qty(self, symbol):
         try:
-            pos = self.api.get_position(symbol)
-            return float(pos.qty)
-        except Exception:
-            return 0.0
+            if not self._fresh():
+                self.reconcile()
+        except Exception as e:
+            logging.error(f"Reconcile error: {e}")
+        return float(self._positions.get(symbol, 0.0))
 
+    def has_open_order(self, symbol):
+        with self._lock:
+            return any(o.symbol == symbol for o in self._open_orders.values())
+
+    def has_exposure(self, symbol, side=None):
+        """
+        An open order for `symbol`, or a position in it (on the same side as
+        `side` when given — an opposite signal may still reduce it).
+        """
+        if self.has_open_order(symbol):
+            return True
+        qty = self.get_position_qty(symbol)
+        if side is None:
+            return qty != 0
+        return qty > 0 if side == 'buy' else qty < 0
+
+    def on_order_update(self, order):
+        """Apply an order (submit response or trade update) to the cached positions."""
+        with self._lock:
+            prev = self._open_orders.pop(order.id, None)
+            if order.status in ('new', 'accepted', 'pending_new', 'partially_filled'):
+                self._open_orders[order.id] = order
+            filled = float(order.filled_qty or 0)
+            seen = float(prev.filled_qty or 0) if prev is not None else 0.0
+            if filled > seen:
+                delta = (filled - seen) * (1 if order.side == 'buy' else -1)
+                qty = self._positions.get(order.symbol, 0.0) + delta
+                if qty:
+                    self._positions[order.symbol] = qty
+                else:
+                    self._positions.pop(order.symbol, None)
+
+    # ---------------- orders ----------------
     def place_order(self, symbol, qty, side, type='limit', limit_price=None, time_in_force='day'):
         logging.info(f"ORDER {side} {qty} {symbol} @ {limit_price} ({type})")
-        return self.api.submit_order(symbol=symbol, qty=qty, side=side, type=type,
-                                     limit_price=limit_price, time_in_force=time_in_force)
+        self.bucket.acquire()
+        order = self.api.submit_order(symbol=symbol, qty=qty, side=side, type=type,
+                                      limit_price=limit_price, time_in_force=time_in_force)
+        self.on_order_update(order)
+        return order
+
+    def submit_order_async(self, symbol, qty, side, type='limit', limit_price=None, time_in_force='day'):
+        """place_order on the order pool; returns a Future so the scan keeps going."""
+        return self._pool.submit(self.place_order, symbol, qty, side, type, limit_price, time_in_force)
+
+    def submit_orders(self, orders):
+        """Submit [{symbol, qty, side, ...}] concurrently; results (order or exception) in input order."""
+        futures = [self.submit_order_async(**o) for o in orders]
+        results = []
+        for fut in futures:
+            try:
+                results.append(fut.result())
+            except Exception as e:
+                results.append(e)
+        return results
 
     def close_position(self, symbol):
         try:
+            self.bucket.acquire()
             self.api.close_position(symbol)
+            with self._lock:
+                self._positions.pop(symbol, None)
             logging.info(f"Closed position {symbol}")
         except Exception as e:
             logging.error(f"Close error {symbol}: {e}")
@@ -1,5 +1,13 @@
 import yaml
 import os
+import copy
+
+# Keys run.py reads that config/global.yml doesn't ship yet; filled only if missing
+SCAN_DEFAULTS = {
+    "strategy_trigger": 2,
+    "regime": {"bull_vix_lt": 18, "bear_vix_gt": 22},
+    "exec": {"order_type": "limit", "limit_slip_bps": 5},
+}
 
 def load_yaml(path):
     with open(path, "r", encoding="utf-8") as f:
@@ -12,3 +20,11 @@ def load_all():
     uni_cfg   = load_yaml(os.path.join(base, "universe.yml"))
     opt_cfg   = load_yaml(os.path.join(base, "optimizer.yml"))
     return global_cfg, rules_cfg, uni_cfg, opt_cfg
+
+def with_defaults(cfg, defaults):
+    """Copy of `cfg` with missing top-level keys from `defaults` (stock risk falls back to crypto's)."""
+    cfg = copy.deepcopy(cfg)
+    for key, value in defaults.items():
+        cfg.setdefault(key, copy.deepcopy(value))
+    cfg["risk"].setdefault("stock", copy.deepcopy(cfg["risk"]["crypto"]))
+    return cfg
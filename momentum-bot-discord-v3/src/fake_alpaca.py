@@ -0,0 +1,212 @@
+# === src/fake_alpaca.py (Local Alpaca Trading API Stand-in) ===
+import argparse, itertools, json, logging, re, threading, time, uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.utils import setup_logging
+
+RATE_PER_MIN = 200  # Alpaca's default per-key request budget
+
+
+class FakeAlpaca:
+    """
+    Just enough of the Alpaca v2 trading API for Broker: account, positions,
+    orders (filled immediately at the limit price) and close_position, with
+    optional per-request latency and a 429 once `rate_per_min` is exceeded.
+    Point Broker at `url` to test it or measure order throughput offline.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, equity=100000.0, latency=0.0,
+                 rate_per_min=RATE_PER_MIN, fill=True):
+        self.cash = float(equity)
+        self.latency = latency
+        self.rate_per_min = rate_per_min
+        self.fill = fill
+        self.positions = {}  # symbol -> {"qty", "price"}
+        self.orders = {}  # id -> order dict
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ---------------- state ----------------
+    def _throttle(self):
+        """True when this request is over the rolling one-minute budget."""
+        now = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if self.rate_per_min and len(self._recent) >= self.rate_per_min:
+                self.throttled += 1
+                return True
+            self._recent.append(now)
+            return False
+
+    def _position(self, symbol):
+        p = self.positions[symbol]
+        qty = p["qty"]
+        return {
+            "asset_id": symbol,
+            "symbol": symbol,
+            "qty": str(qty),
+            "side": "long" if qty > 0 else "short",
+            "avg_entry_price": str(p["price"]),
+            "current_price": str(p["price"]),
+            "market_value": str(qty * p["price"]),
+        }
+
+    def _account(self):
+        equity = self.cash + sum(p["qty"] * p["price"] for p in self.positions.values())
+        return {
+            "id": "fake-account",
+            "status": "ACTIVE",
+            "currency": "USD",
+            "cash": str(self.cash),
+            "equity": str(equity),
+            "buying_power": str(self.cash),
+        }
+
+    def _apply_fill(self, symbol, qty, side, price):
+        signed = qty if side == "buy" else -qty
+        self.cash -= signed * price
+        p = self.positions.setdefault(symbol, {"qty": 0.0, "price": price})
+        p["qty"] += signed
+        p["price"] = price
+        if p["qty"] == 0:
+            del self.positions[symbol]
+
+    def _submit(self, body):
+        symbol, side = body["symbol"], body["side"]
+        qty = float(body["qty"])
+        price = body.get("limit_price")
+        if price is None and symbol in self.positions:
+            price = self.positions[symbol]["price"]
+        price = float(price or 0.0)
+        order = {
+            "id": str(uuid.uuid4()),
+            "client_order_id": body.get("client_order_id") or f"fake-{next(self._seq)}",
+            "symbol": symbol,
+            "qty": str(qty),
+            "side": side,
+            "type": body.get("type", "market"),
+            "time_in_force": body.get("time_in_force", "day"),
+            "limit_price": body.get("limit_price"),
+            "status": "new",
+            "filled_qty": "0",
+            "filled_avg_price": None,
+            "submitted_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        if self.fill:
+            self._apply_fill(symbol, qty, side, price)
+            order.update(status="filled", filled_qty=str(qty), filled_avg_price=str(price))
+        self.orders[order["id"]] = order
+        return order
+
+    def handle(self, method, path, body):
+        """Route one request; returns (status, payload)."""
+        path = path.split("?")[0].rstrip("/")
+        with self._lock:
+            if method == "GET" and path == "/v2/account":
+                return 200, self._account()
+            if method == "GET" and path == "/v2/positions":
+                return 200, [self._position(s) for s in self.positions]
+            m = re.fullmatch(r"/v2/positions/([^/]+)", path)
+            if m and method == "GET":
+                if m.group(1) not in self.positions:
+                    return 404, {"code": 40410000, "message": "position does not exist"}
+                return 200, self._position(m.group(1))
+            if m and method == "DELETE":
+                symbol = m.group(1)
+                if symbol not in self.positions:
+                    return 404, {"code": 40410000, "message": "position does not exist"}
+                qty = self.positions[symbol]["qty"]
+                side = "sell" if qty > 0 else "buy"
+                return 200, self._submit({"symbol": symbol, "qty": abs(qty), "side": side})
+            if method == "GET" and path == "/v2/orders":
+                return 200, [o for o in self.orders.values() if o["status"] == "new"]
+            if method == "POST" and path == "/v2/orders":
+                return 200, self._submit(body or {})
+        return 404, {"code": 40400000, "message": f"{method} {path} not found"}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def _serve(self):
+                with fake._lock:
+                    fake.in_flight += 1
+                    fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = json.loads(self.rfile.read(length)) if length else None
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    if fake._throttle():
+                        status, payload = 429, {"code": 42910000, "message": "rate limit exceeded"}
+                    else:
+                        status, payload = fake.handle(self.command, self.path, body)
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_DELETE = _serve
+
+            def log_message(self, fmt, *args):
+                logging.debug(fmt % args)
+
+        return Handler
+
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Serve a fake Alpaca trading API locally")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--equity", type=float, default=100000.0)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    ap.add_argument("--rate", type=int, default=RATE_PER_MIN, help="requests/min before 429 (0 = off)")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    fake = FakeAlpaca(port=args.port, equity=args.equity, latency=args.latency, rate_per_min=args.rate)
+    logging.info(f"🧪 Fake Alpaca on {fake.url} — set APCA_API_BASE_URL to it")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+        logging.info(f"🧪 Served {fake.requests} requests ({fake.throttled} throttled)")
+
+
+if __name__ == "__main__":
+    main()
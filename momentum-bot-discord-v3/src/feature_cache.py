@@ -0,0 +1,189 @@
+# === src/feature_cache.py (Content-Addressed Indicator Frame Cache) ===
+import hashlib, logging, os, threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from src.indicators import add_indicators
+
+FEATURE_CACHE_MB = 512  # in-process budget for cached indicator frames
+
+BAR_COLUMNS = ("time", "Open", "High", "Low", "Close", "Volume")
+
+
+def _digest(h, df):
+    """Feed a bar frame's length, last timestamp and OHLCV bytes into hash `h`."""
+    times = pd.to_datetime(df["time"]).to_numpy().astype("datetime64[ns]").view("int64")
+    h.update(f"{len(df)}:{times[-1] if len(times) else ''}|".encode())
+    h.update(np.ascontiguousarray(times))
+    for col in BAR_COLUMNS[1:]:
+        h.update(np.ascontiguousarray(df[col].to_numpy(dtype="float64")))
+
+
+def feature_key(df, df_htf=None, **params):
+    """
+    Cache key for add_indicators(df, df_htf, **params): a hash of the bars
+    (length, last timestamp and content) and the indicator parameters, so
+    identical bars share an entry whichever symbol or run they came from.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _digest(h, df)
+    if df_htf is not None and not df_htf.empty:
+        h.update(b"htf")
+        _digest(h, df_htf)
+    h.update(repr(sorted((k, str(v)) for k, v in params.items())).encode())
+    return f"{len(df)}-{h.hexdigest()}"
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(index=True).sum())
+
+
+def _copy_on_write():
+    """True when pandas copy-on-write is on (always from pandas 3)."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+class FeatureCache:
+    """
+    LRU of add_indicators frames keyed by feature_key(), bounded by `max_mb`.
+    With `cache_dir`, frames are also written there (one .npz each) and a
+    memory miss is served from disk before recomputing, so reruns in other
+    processes get them too. Returned frames are copies, so callers can edit
+    them without touching the cached entry: shallow ones under pandas
+    copy-on-write, deep ones otherwise (a shallow copy shares its buffers).
+    """
+
+    def __init__(self, max_mb=FEATURE_CACHE_MB, cache_dir=None):
+        self.max_bytes = int(max_mb * 1e6)
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._frames = OrderedDict()  # key -> frame, oldest first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._frames),
+            "mb": round(self._bytes / 1e6, 3),
+        }
+
+    def add_indicators(self, df, df_htf=None, **params):
+        """add_indicators(df, df_htf, **params), computed once per distinct input."""
+        if df is None or df.empty:
+            return add_indicators(df, df_htf, **params)
+        key = feature_key(df, df_htf, **params)
+        frame = self.get(key)
+        if frame is None:
+            frame = add_indicators(df, df_htf, **params)
+            self.put(key, frame)
+        return frame.copy(deep=not _copy_on_write())
+
+    def get(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame
+        frame = self._read(key)
+        with self._lock:
+            if frame is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, frame)
+        return frame
+
+    def put(self, key, frame):
+        self._remember(key, frame)
+        if self.cache_dir:
+            try:
+                self._write(key, frame)
+            except OSError as e:
+                logging.warning(f"Feature cache write failed ({key}): {e}")
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    # -------------------------------------------------
+    def _remember(self, key, frame):
+        size = _frame_bytes(frame)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._bytes -= _frame_bytes(old)
+            self._frames[key] = frame
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self._bytes -= _frame_bytes(evicted)
+                self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _write(self, key, frame):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        cols = {col: frame[col].to_numpy() for col in frame.columns}
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                __index__=frame.index.to_numpy(),
+                __columns__=np.array(frame.columns, dtype=str),
+                **cols,
+            )
+        os.replace(tmp, path)
+
+    def _read(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with np.load(self._path(key), allow_pickle=False) as data:
+                columns = [str(c) for c in data["__columns__"]]
+                return pd.DataFrame(
+                    {col: data[col] for col in columns},
+                    index=data["__index__"],
+                    columns=columns,
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+_default = None
+
+
+def default_cache():
+    """
+    Process-wide FeatureCache. FEATURE_CACHE_MB (env) sizes the memory tier
+    (0 turns it off); FEATURE_CACHE_DIR enables the disk tier.
+    """
+    global _default
+    if _default is None:
+        _default = FeatureCache(
+            max_mb=float(os.getenv("FEATURE_CACHE_MB", FEATURE_CACHE_MB)),
+            cache_dir=os.getenv("FEATURE_CACHE_DIR") or None,
+        )
+    return _default
+
+
+def cached_indicators(df, df_htf=None, **params):
+    """add_indicators through default_cache()."""
+    return default_cache().add_indicators(df, df_htf, **params)
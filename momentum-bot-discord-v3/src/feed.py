@@ -1,9 +1,16 @@
 # === src/feed.py (Multi-Timeframe & Deep Data Support) ===
 import logging
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
 import ccxt
 import yfinance as yf
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.barstore import BarStore, BAR_CACHE_DIR, frame_to_records, records_to_frame
+from src.ratelimit import TokenBucket
+from src.yfeed import split_download
 
 # Added 5m mapping for Yahoo Finance, though its reliability is low
 TF_MAP = {
@@ -13,11 +20,132 @@ TF_MAP = {
     "1h": "1h",
     "4h": "4h",
     "1d": "1d",
+    "1D": "1d",  # run.py/config spell daily bars "1D"
 }
 
+TF_MS = {
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+OHLCV_COLS = ["time", "Open", "High", "Low", "Close", "Volume"]
+
+# BinanceUS serves at most 1000 candles per fetch_ohlcv call
+BINANCE_PAGE_LIMIT = 1000
+BINANCE_MAX_RETRIES = 5
+# Default depth for crypto 5m/15m when no limit/since is given (backtests)
+CRYPTO_DEEP_LIMIT = 50000
+# Bars fetched (and cached) per stock request, whatever its own limit
+STOCK_FETCH_LIMIT = 5000
+HISTORY_CHECKPOINT_DIR = os.path.join("data", "history")
+
+# Max in-flight requests per venue. yf.download keeps module-level state that
+# concurrent calls trample, so Yahoo requests are serialized.
+VENUE_CONCURRENCY = {"binance": 4, "yahoo": 1}
+YAHOO_RATE_PER_SEC = 2.0
+
+# Yahoo's spelling of symbols we name differently (index proxies)
+YAHOO_TICKERS = {"VIX": "^VIX"}
+
+
+def resample_bars(df: pd.DataFrame, tf: str) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into `tf` buckets aligned to the epoch (UTC midnight
+    for 1d, 00/04/08... for 4h, like the exchanges). Vectorized: bucket starts
+    come from one diff over the bucket ids, then reduceat per column.
+    A leading partial bucket is dropped; the trailing one is kept as the
+    forming candle, just like a live fetch.
+    """
+    tf_ms = TF_MS[TF_MAP.get(tf, tf.lower())]
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV_COLS)
+
+    t = pd.to_datetime(df["time"]).to_numpy().astype("datetime64[ms]").astype("int64")
+    bucket = t - t % tf_ms
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(t)] - 1
+
+    # History that begins mid-bucket would give that bar a wrong Open
+    if t[0] != bucket[0] and len(starts) > 1:
+        starts, ends = starts[1:], ends[1:]
+
+    out = pd.DataFrame(
+        {
+            "time": pd.to_datetime(bucket[starts], unit="ms"),
+            "Open": df["Open"].to_numpy()[starts],
+            "High": np.maximum.reduceat(df["High"].to_numpy(), starts),
+            "Low": np.minimum.reduceat(df["Low"].to_numpy(), starts),
+            "Close": df["Close"].to_numpy()[ends],
+            "Volume": np.add.reduceat(df["Volume"].to_numpy(dtype="float64"), starts),
+        }
+    )
+    return out
+
+
+def yahoo_window(tf, since=None):
+    """(interval, yf.download window kwargs) for a Feed timeframe."""
+    # 🚨 FIX: Yahoo can't reliably serve deep history for fast TFs.
+    # We map 5m/15m/1h requests to 1h interval, as 5m is unavailable.
+    if tf in ["5m", "15m", "30m", "1h"]:
+        interval = "1h"
+        period = "60d"  # Max period Yahoo provides for 1h interval is short
+    else:
+        interval = "1d"
+        period = "5y"  # Changed to 5y to match backtest years
+
+    # A `since` start (cache tail update) replaces the fixed period window
+    if since is not None:
+        return interval, {"start": pd.Timestamp(_to_ms(since), unit="ms").to_pydatetime()}
+    return interval, {"period": period}
+
+
+def _to_ms(since):
+    """Accepts ms ints, datetimes or Timestamps (naive = UTC) and returns epoch ms."""
+    if since is None:
+        return None
+    if isinstance(since, (int, float)):
+        return int(since)
+    ts = pd.Timestamp(since)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp() * 1000)
+
 
 class Feed:
-    def __init__(self, key=None, secret=None, base_url=None):
+    def __init__(
+        self,
+        key=None,
+        secret=None,
+        base_url=None,
+        max_workers=4,
+        checkpoint_dir=HISTORY_CHECKPOINT_DIR,
+        cache_dir=None,
+    ):
+        self.max_workers = max_workers
+        self.checkpoint_dir = checkpoint_dir
+        self.binance_bucket = None
+        self.yahoo_bucket = TokenBucket(YAHOO_RATE_PER_SEC)
+        self.venue_slots = {
+            venue: threading.BoundedSemaphore(n)
+            for venue, n in VENUE_CONCURRENCY.items()
+        }
+        self._pool = None
+        self._checkpoint_locks = {}  # (symbol, tf) -> Lock guarding its checkpoint file
+        self._checkpoint_guard = threading.Lock()
+        # Bar-cache reads served by a tail update (hits) vs a full fetch (misses)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._stats_lock = threading.Lock()
+
+        # Local bar cache is on by default; BAR_CACHE_DIR="" turns it off
+        if cache_dir is None:
+            cache_dir = os.getenv("BAR_CACHE_DIR", BAR_CACHE_DIR)
+        self.store = BarStore(cache_dir) if cache_dir else None
+
         # Initialize Binance US for crypto
         try:
             self.binance = ccxt.binanceus(
@@ -27,6 +155,9 @@ class Feed:
                 }
             )
             self.binance.load_markets()
+            # ccxt's own throttle is per-call and not thread-safe, so concurrent
+            # page fetches share one bucket sized from the exchange's rateLimit.
+            self.binance_bucket = TokenBucket(1000.0 / self.binance.rateLimit)
         except Exception as e:
             logging.warning(f"⚠️ Could not initialize BinanceUS: {e}")
             self.binance = None
@@ -34,39 +165,146 @@ class Feed:
     # ---------------------------------------------
     # === Primary Public Fetch Method (MTFA Ready) ===
     # ---------------------------------------------
-    def bars(self, symbol: str, timeframe: str = "1h", limit: int = 1000):
-        """Fetch bars for a symbol from the appropriate source (single TF)."""
+    def bars(self, symbol: str, timeframe: str = "1h", limit: int = None, since=None):
+        """
+        Fetch bars for a symbol from the appropriate source (single TF).
+        `since` (datetime or epoch ms) requests full history from that point on;
+        crypto history deeper than one page is paginated automatically.
+        Without a `limit`, crypto 5m/15m get CRYPTO_DEEP_LIMIT bars, others 1000.
+        """
         tf = TF_MAP.get(timeframe, "1h")
         is_crypto = symbol.endswith("USD")
 
-        # Crypto needs much deeper data for 5-year backtest on 5m chart
-        # We need ~525,600 bars for 5 years of 5m data. Binance max is usually 1000.
-        # We must override the limit for crypto fetches to a huge number for backtesting.
-        if is_crypto and timeframe in ["5m", "15m"]:
-            # NOTE: ccxt fetch_ohlcv must be called multiple times for deep history.
-            # However, for simulation, we set a high limit and trust the backtester logic
-            # handles the multiple fetches if necessary (which the current code does not).
-            # We set a large placeholder limit to signal the intent for deep data.
-            limit = 50000  # Placeholder for required 5-year data
-
-        if is_crypto:
-            return self._fetch_binance(symbol, tf, limit)
-        else:
+        # Crypto needs much deeper data for backtests on the 5m/15m charts
+        if limit is None:
+            limit = CRYPTO_DEEP_LIMIT if is_crypto and timeframe in ["5m", "15m"] else 1000
+
+        if not is_crypto:
             # Stock trading typically needs higher limits than 1000, too.
-            return self._fetch_yahoo(symbol, tf, 5000)  # Use a better limit for stocks
+            limit = STOCK_FETCH_LIMIT  # Use a better limit for stocks
+
+        if self.store is not None:
+            return self._cached_bars(symbol, tf, limit, since)
+        return self._fetch(symbol, tf, limit, since)
 
-    def bars_mtf(self, symbol: str, entry_tf: str, trend_tf: str, limit: int = 50000):
+    def bars_many(self, symbols, timeframe: str = "1h", limit: int = None, since=None):
+        """
+        Fetch several symbols concurrently. Crypto pages all draw from the same
+        Binance token bucket, so the pool never exceeds the exchange rate budget.
+        Returns {symbol: DataFrame}.
+        """
+        requests = [(s, timeframe, limit) for s in symbols]
+        frames = {
+            req[0]: df for req, df in self.bars_as_completed(requests, since=since)
+        }
+        return {s: frames[s] for s in symbols}
+
+    def bars_as_completed(self, requests, since=None):
+        """
+        Submit (symbol, timeframe, limit) requests to the shared fetch pool and
+        yield (request, DataFrame) in completion order, so callers can act on
+        each symbol as soon as its data lands. Stock requests sharing a Yahoo
+        interval go out together (one Yahoo request, each frame then trimmed
+        to its own limit), crypto ones one symbol per task.
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="feed"
+            )
+        futures, batches = {}, {}
+        for sym, tf, limit in requests:
+            if sym.endswith("USD"):
+                fut = self._pool.submit(self._bars_one, sym, tf, limit, since)
+                futures[fut] = [(sym, tf, limit)]
+            else:
+                interval, _ = yahoo_window(TF_MAP.get(tf, "1h"))
+                batches.setdefault(interval, []).append((sym, tf, limit))
+        for reqs in batches.values():
+            fut = self._pool.submit(self._bars_yahoo, reqs, since)
+            futures[fut] = reqs
+
+        for fut in as_completed(futures):
+            frames = fut.result()
+            for req in futures[fut]:
+                yield req, frames[req]
+
+    def _bars_one(self, symbol, timeframe, limit, since=None):
+        return {(symbol, timeframe, limit): self.bars(symbol, timeframe, limit, since)}
+
+    def bars_batch(self, symbols, timeframe: str = "1h", limit: int = None, since=None):
+        """
+        bars() for several stock symbols, fetched with one multi-ticker Yahoo
+        request per distinct fetch window and trimmed to `limit` bars (all
+        STOCK_FETCH_LIMIT of them when None). Returns {symbol: DataFrame}.
+        """
+        frames = self._bars_yahoo([(s, timeframe, limit) for s in symbols], since)
+        return {s: frames[(s, timeframe, limit)] for s in symbols}
+
+    def _bars_yahoo(self, requests, since=None):
+        """
+        (symbol, timeframe, limit) stock requests on one Yahoo interval. Each
+        symbol is fetched STOCK_FETCH_LIMIT deep, one multi-ticker request per
+        distinct fetch window (cached symbols usually end on the same bar, so
+        normally a single one), then every frame is trimmed to its request's
+        own limit. Returns {request: DataFrame}.
+        """
+        limit = STOCK_FETCH_LIMIT
+        out, groups = {}, {}
+        for req in requests:
+            symbol, tf = req[0], TF_MAP.get(req[1], "1h")
+            if self.store is None:
+                groups.setdefault(_to_ms(since), []).append((req, None))
+                continue
+            try:
+                plan = self._cache_plan(symbol, tf, limit, since)
+            except Exception as e:
+                logging.warning(f"❌ Bar cache failed for {symbol} ({tf}): {e}")
+                out[req] = self._fetch(symbol, tf, limit, since)
+                continue
+            groups.setdefault(_to_ms(plan[0]), []).append((req, plan))
+
+        for fetch_since, members in groups.items():
+            symbols = list(dict.fromkeys(req[0] for req, _ in members))
+            tf = TF_MAP.get(members[0][0][1], "1h")
+            with self.venue_slots["yahoo"]:
+                fresh = self._fetch_yahoo_many(symbols, tf, limit, fetch_since)
+            for req, plan in members:
+                symbol, tf = req[0], TF_MAP.get(req[1], "1h")
+                if plan is None:
+                    out[req] = fresh[symbol]
+                    continue
+                try:
+                    out[req] = self._cache_commit(symbol, tf, limit, since, plan, fresh[symbol])
+                except Exception as e:
+                    logging.warning(f"❌ Bar cache failed for {symbol} ({tf}): {e}")
+                    out[req] = self._fetch(symbol, tf, limit, since)
+        return {
+            req: df.tail(req[2]).reset_index(drop=True) if req[2] else df
+            for req, df in out.items()
+        }
+
+    def bars_mtf(
+        self, symbol: str, entry_tf: str, trend_tf: str, limit: int = 50000, resample=True
+    ):
         """
         Fetches data for both the entry timeframe (LTF) and the trend filter (HTF).
         Returns a dictionary of dataframes: {'LTF': df_ltf, 'HTF': df_htf}.
+        With `resample`, an HTF that is a whole multiple of the LTF is built
+        from the LTF bars locally, so both frames cover the same history.
         """
         is_crypto = symbol.endswith("USD")
 
         # 1. Fetch LTF (Entry) Data
         df_ltf = self.bars(symbol, entry_tf, limit)
 
-        # 2. Fetch HTF (Trend Filter) Data - We only fetch if different from LTF
-        if entry_tf != trend_tf:
+        ltf_ms = TF_MS.get(TF_MAP.get(entry_tf, entry_tf.lower()))
+        htf_ms = TF_MS.get(TF_MAP.get(trend_tf, trend_tf.lower()))
+        local = resample and ltf_ms and htf_ms and htf_ms > ltf_ms and htf_ms % ltf_ms == 0
+
+        # 2. HTF (Trend Filter) Data - resampled locally, or fetched if it can't be
+        if local:
+            df_htf = resample_bars(df_ltf, trend_tf)
+        elif entry_tf != trend_tf:
             # Use a smaller, realistic limit for the HTF data, as we just need the context
             htf_limit = min(limit // 5, 5000)
             df_htf = self.bars(symbol, trend_tf, htf_limit)
@@ -78,74 +316,243 @@ class Feed:
 
         return {"LTF": df_ltf, "HTF": df_htf}
 
+    # =======================
+    # === Local Bar Cache ===
+    # =======================
+    def _fetch(self, symbol, tf, limit, since=None):
+        """Network fetch, holding one of the venue's concurrency slots."""
+        if symbol.endswith("USD"):
+            with self.venue_slots["binance"]:
+                return self._fetch_binance(symbol, tf, limit, since)
+        with self.venue_slots["yahoo"]:
+            return self._fetch_yahoo(symbol, tf, limit, since)
+
+    def _cached_bars(self, symbol, tf, limit, since=None):
+        """
+        Serve bars from the on-disk store. Once a range has been loaded, only
+        bars newer than the last cached timestamp are requested from the source.
+        """
+        try:
+            plan = self._cache_plan(symbol, tf, limit, since)
+            fresh = self._fetch(symbol, tf, limit, since=plan[0])
+            return self._cache_commit(symbol, tf, limit, since, plan, fresh)
+        except Exception as e:
+            logging.warning(f"❌ Bar cache failed for {symbol} ({tf}): {e}")
+            return self._fetch(symbol, tf, limit, since)
+
+    def _cache_plan(self, symbol, tf, limit, since=None):
+        """
+        What a cached read has to fetch: (fetch_since, tail, need_from,
+        covered, last). `tail` means the cache already reaches back far
+        enough and only bars from its last one on are needed.
+        """
+        tf_ms = TF_MS.get(tf, TF_MS["1h"])
+        since_ms = _to_ms(since)
+        need_from = (
+            since_ms if since_ms is not None else int(time.time() * 1000) - limit * tf_ms
+        )
+        last = self.store.last_time(symbol, tf)
+        covered = self.store.covered_from(symbol, tf)
+
+        tail = last is not None and covered is not None and covered <= need_from
+        with self._stats_lock:
+            if tail:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+        if tail:
+            # Warm cache: fetch from the last cached bar (it may still be forming)
+            return last, True, need_from, covered, last
+        return since, False, need_from, covered, last
+
+    def _cache_commit(self, symbol, tf, limit, since, plan, fresh):
+        """Fold the bars fetched for `plan` into the store and serve the request."""
+        _, tail, need_from, covered, last = plan
+        if tail:
+            if fresh.empty:
+                logging.warning(f"⚠️ Tail update failed for {symbol}; serving cache")
+            else:
+                self.store.append(symbol, tf, frame_to_records(fresh))
+        else:
+            if fresh.empty:
+                if last is None:
+                    return fresh
+            else:
+                self.store.merge(symbol, tf, frame_to_records(fresh))
+                self.store.set_covered_from(
+                    symbol, tf, min(need_from, covered or need_from)
+                )
+
+        since_ms = _to_ms(since)
+        rec = self.store.read(symbol, tf)
+        if since_ms is not None:
+            rec = rec[np.searchsorted(rec["time"], since_ms) :]
+        else:
+            rec = rec[-limit:]
+        return records_to_frame(rec)
+
     # =======================
     # === Binance Fetch ===
     # =======================
-    def _fetch_binance(self, symbol, tf, limit):
-        """Fetch crypto data from BinanceUS."""
+    def _fetch_binance(self, symbol, tf, limit, since=None):
+        """Fetch crypto data from BinanceUS (paginated when deeper than one page)."""
         if not self.binance:
             logging.warning("⚠️ BinanceUS feed not initialized.")
             return pd.DataFrame()
 
         try:
-            # 🚨 FIX: Call fetch_ohlcv with the potentially large limit
-            data = self.binance.fetch_ohlcv(symbol, timeframe=tf, limit=limit)
-            df = pd.DataFrame(
-                data, columns=["time", "Open", "High", "Low", "Close", "Volume"]
-            )
+            since_ms = _to_ms(since)
+            if since_ms is None and limit <= BINANCE_PAGE_LIMIT:
+                data = self._binance_page(symbol, tf, None, limit)
+            else:
+                if since_ms is None:
+                    tf_ms = self.binance.parse_timeframe(tf) * 1000
+                    since_ms = self.binance.milliseconds() - limit * tf_ms
+                data = self._fetch_binance_history(symbol, tf, since_ms)
+
+            df = pd.DataFrame(data, columns=OHLCV_COLS)
             df["time"] = pd.to_datetime(df["time"], unit="ms")
-            logging.info(f"💰 Fetched {symbol} ({tf}) from Binance")
+            logging.info(f"💰 Fetched {symbol} ({tf}) from Binance [{len(df)} bars]")
             return df
         except Exception as e:
             logging.warning(f"❌ Binance fetch failed for {symbol}: {e}")
             return pd.DataFrame()
 
+    def _binance_page(self, symbol, tf, since_ms, limit):
+        """One rate-limited fetch_ohlcv call, retried on transient network errors."""
+        for attempt in range(BINANCE_MAX_RETRIES):
+            self.binance_bucket.acquire()
+            try:
+                return self.binance.fetch_ohlcv(
+                    symbol, timeframe=tf, since=since_ms, limit=limit
+                )
+            except (ccxt.NetworkError, ccxt.ExchangeNotAvailable) as e:
+                if attempt == BINANCE_MAX_RETRIES - 1:
+                    raise
+                backoff = 2**attempt
+                logging.warning(
+                    f"⚠️ Binance page failed for {symbol} ({e}); retrying in {backoff}s"
+                )
+                time.sleep(backoff)
+
+    def _fetch_binance_history(self, symbol, tf, since_ms):
+        """
+        Walk forward from `since_ms` with a `since` cursor until the present.
+        Pulls longer than one page append every page to a checkpoint file
+        first, so an interrupted pull resumes from the last saved timestamp
+        instead of starting over. A fetch holds its (symbol, tf) lock while
+        it uses the checkpoint, so concurrent pulls of one series don't race.
+        """
+        tf_ms = self.binance.parse_timeframe(tf) * 1000
+        now_ms = self.binance.milliseconds()
+        if (now_ms - since_ms) // tf_ms < BINANCE_PAGE_LIMIT:
+            # Fits in one page (e.g. a cache tail update): nothing to resume
+            return self._binance_pages(symbol, tf, since_ms, tf_ms, now_ms)
+
+        with self._checkpoint_lock(symbol, tf):
+            path = self._checkpoint_path(symbol, tf)
+            rows = self._load_checkpoint(path, since_ms, tf_ms)
+            cursor = rows[-1][0] + tf_ms if rows else since_ms
+            if rows:
+                logging.info(f"↩️ Resuming {symbol} ({tf}) from {len(rows)} saved bars")
+            rows += self._binance_pages(symbol, tf, cursor, tf_ms, now_ms, path)
+
+            # Fully fetched: the checkpoint has served its purpose
+            if os.path.exists(path):
+                os.remove(path)
+        return rows
+
+    def _binance_pages(self, symbol, tf, cursor, tf_ms, now_ms, path=None):
+        """Pages from `cursor` to `now_ms`, each appended to checkpoint `path` if given."""
+        rows = []
+        while cursor <= now_ms:
+            raw = self._binance_page(symbol, tf, cursor, BINANCE_PAGE_LIMIT)
+            page = [bar for bar in raw if bar[0] >= cursor]
+            if not page:
+                break
+            if path:
+                self._append_checkpoint(path, page)
+            rows.extend(page)
+            cursor = page[-1][0] + tf_ms
+            if len(raw) < BINANCE_PAGE_LIMIT:
+                break  # Short page: we've caught up with the live candle
+        return rows
+
     # =======================
-    # === Yahoo Fetch ===
+    # === Resume Checkpoints ===
     # =======================
-    def _fetch_yahoo(self, symbol, tf, limit):
-        """Fetch stock data from Yahoo Finance."""
+    def _checkpoint_lock(self, symbol, tf):
+        with self._checkpoint_guard:
+            return self._checkpoint_locks.setdefault((symbol, tf), threading.Lock())
+
+    def _checkpoint_path(self, symbol, tf):
+        safe = symbol.replace("/", "")
+        return os.path.join(self.checkpoint_dir, f"{safe}_{tf}.partial.csv")
+
+    def _load_checkpoint(self, path, since_ms, tf_ms):
+        """Return saved rows if the checkpoint still covers `since_ms`, else []."""
+        if not os.path.exists(path):
+            return []
         try:
-            # 🚨 FIX: Yahoo can't reliably serve deep history for fast TFs.
-            # We map 5m/15m/1h requests to 1h interval, as 5m is unavailable.
-            if tf in ["5m", "15m", "30m", "1h"]:
-                interval = "1h"
-                period = "60d"  # Max period Yahoo provides for 1h interval is short
-            else:
-                interval = "1d"
-                period = "5y"  # Changed to 5y to match backtest years
+            saved = pd.read_csv(path, header=None, names=OHLCV_COLS)
+        except Exception as e:
+            logging.warning(f"⚠️ Ignoring unreadable checkpoint {path}: {e}")
+            return []
+        if saved.empty or saved["time"].iloc[0] > since_ms + tf_ms:
+            # Saved run started later than what we need now, so it can't be resumed
+            os.remove(path)
+            return []
+        saved = saved[saved["time"] >= since_ms].drop_duplicates("time")
+        return [[int(row[0]), *row[1:]] for row in saved.itertuples(index=False)]
 
-            # --- Download data from Yahoo ---
+    def _append_checkpoint(self, path, page):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.DataFrame(page).to_csv(path, mode="a", header=False, index=False)
+
+    # =======================
+    # === Yahoo Fetch ===
+    # =======================
+    def _fetch_yahoo(self, symbol, tf, limit, since=None):
+        """Fetch stock data from Yahoo Finance (from `since` when given)."""
+        return self._fetch_yahoo_many([symbol], tf, limit, since)[symbol]
+
+    def _fetch_yahoo_many(self, symbols, tf, limit, since=None):
+        """
+        One multi-ticker yf.download for every symbol (same timeframe and
+        window), split into per-symbol frames. Returns {symbol: DataFrame}.
+        """
+        interval, window = yahoo_window(tf, since)
+        tickers = [YAHOO_TICKERS.get(s, s) for s in symbols]
+        label = symbols[0] if len(symbols) == 1 else f"{len(symbols)} symbols"
+        try:
+            # --- Download data from Yahoo (the whole batch in one request) ---
+            self.yahoo_bucket.acquire()
             data = yf.download(
-                symbol,
-                period=period,
+                tickers,
                 interval=interval,
                 progress=False,
+                group_by="ticker",
+                **window,
             )
+            split = split_download(data, tickers)
+        except Exception as e:
+            logging.warning(f"❌ Yahoo fetch failed for {label}: {e}")
+            return {s: pd.DataFrame() for s in symbols}
 
-            if data.empty:
+        out = {}
+        for symbol, ticker in zip(symbols, tickers):
+            df = split[ticker]
+            if df.empty:
                 logging.warning(f"⚠️ No Yahoo data found for {symbol}")
-                return pd.DataFrame()
-
-            # --- Data cleaning (mostly unchanged) ---
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = [col[0] for col in data.columns]
-
-            data = data.reset_index().rename(
-                columns={"Date": "time", "Datetime": "time"}
-            )
-
-            if pd.api.types.is_datetime64_any_dtype(data["time"]):
-                data["time"] = pd.to_datetime(data["time"]).dt.tz_localize(None)
-
-            cols = ["time", "Open", "High", "Low", "Close", "Volume"]
-            df = data[cols].copy()
-
-            logging.info(f"💰 Fetched {symbol} ({interval}) from Yahoo Finance")
+                out[symbol] = pd.DataFrame()
+                continue
+            if pd.api.types.is_datetime64_any_dtype(df["time"]):
+                df["time"] = pd.to_datetime(df["time"]).dt.tz_localize(None)
 
             # --- Return only the required columns and the limit ---
-            return df.tail(limit)
+            out[symbol] = df.tail(limit)
 
-        except Exception as e:
-            logging.warning(f"❌ Yahoo fetch failed for {symbol}: {e}")
-            return pd.DataFrame()
+        if any(not df.empty for df in out.values()):
+            logging.info(f"💰 Fetched {label} ({interval}) from Yahoo Finance")
+        return out
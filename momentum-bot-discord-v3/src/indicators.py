@@ -7,66 +7,231 @@ import numpy as np
 BB_WINDOW = 20
 BB_STD = 2
 
+# Output order of add_indicators (and every column it can produce from the LTF bars)
+FEATURE_COLUMNS = (
+    "EMA_S",
+    "EMA_L",
+    "RSI",
+    "BB_UPPER",
+    "BB_LOWER",
+    "PRICE_Z_SCORE",
+    "RSI_PREV",
+    "RSI_PREV2",
+    "MACD",
+    "MACD_SIG",
+    "ADX",
+    "ATR",
+    "VolMA20",
+    "ROC5",
+    "VWAP",
+)
+# Columns that depend on the tunable periods (rsi_period, ema_s, ema_l)
+PERIOD_COLUMNS = ("EMA_S", "EMA_L", "RSI", "RSI_PREV", "RSI_PREV2")
+# Higher-timeframe trend, only when add_indicators is given df_htf
+HTF_COLUMNS = ("HTF_EMA_S", "HTF_EMA_L")
 
-def add_indicators(
-    df_ltf: pd.DataFrame, df_htf: pd.DataFrame = None, rsi_period=14, ema_s=20, ema_l=50
-):
-    """
-    Calculates all required indicators for the Mean Reversion Scalper,
-    including Bollinger Bands, RSI Cross checks, and VWAP.
-    """
-    out = df_ltf.copy()
 
-    if out is None or out.empty or len(out) < 20:
-        return pd.DataFrame()
+def ema(close: pd.Series, window: int) -> pd.Series:
+    return ta.trend.ema_indicator(close, window=window, fillna=False)
 
-    # --- Trend & Mean Indicators ---
-    out["EMA_S"] = ta.trend.ema_indicator(out["Close"], window=ema_s, fillna=False)
-    out["EMA_L"] = ta.trend.ema_indicator(out["Close"], window=ema_l, fillna=False)
-    out["RSI"] = ta.momentum.rsi(out["Close"], window=rsi_period, fillna=False)
 
-    # --- Bollinger Bands (Volatility & Range) ---
-    bb = ta.volatility.BollingerBands(
-        out["Close"], window=BB_WINDOW, window_dev=BB_STD, fillna=False
-    )
-    out["BB_UPPER"] = bb.bollinger_hband()
-    out["BB_LOWER"] = bb.bollinger_lband()
+def rsi(close: pd.Series, window: int) -> pd.Series:
+    return ta.momentum.rsi(close, window=window, fillna=False)
 
-    # --- Price Extremity Check (Z-Score & RSI History) ---
-    out["PRICE_Z_SCORE"] = (
-        out["Close"] - out["Close"].rolling(BB_WINDOW).mean()
-    ) / out["Close"].rolling(BB_WINDOW).std(ddof=0)
-    out["RSI_PREV"] = out["RSI"].shift(1)  # Used for simple cross detection
-    out["RSI_PREV2"] = out["RSI"].shift(2)  # Used for divergence/pattern check
 
-    if len(out) < 14:
-        return pd.DataFrame()
+# --- Indicator graph ---
+# column -> (columns it is built from, fn(df, computed, params)). Names starting
+# with "_" are intermediate objects shared by several columns, never output.
 
-    # --- Momentum & Volatility ---
-    macd = ta.trend.MACD(out["Close"])
-    out["MACD"] = macd.macd()
-    out["MACD_SIG"] = macd.macd_signal()
 
-    out["ADX"] = ta.trend.adx(
-        out["High"], out["Low"], out["Close"], window=14, fillna=False
+def _bollinger(df, c, p):
+    return ta.volatility.BollingerBands(
+        df["Close"], window=BB_WINDOW, window_dev=BB_STD, fillna=False
     )
-    out["ATR"] = ta.volatility.average_true_range(
-        out["High"], out["Low"], out["Close"], window=14, fillna=False
+
+
+def _z_score(df, c, p):
+    return (df["Close"] - df["Close"].rolling(BB_WINDOW).mean()) / df["Close"].rolling(
+        BB_WINDOW
+    ).std(ddof=0)
+
+
+def _adx(df, c, p):
+    # ta's ADX smooths its own true range, so it doesn't need the ATR column
+    return ta.trend.adx(df["High"], df["Low"], df["Close"], window=14, fillna=False)
+
+
+def _atr(df, c, p):
+    return ta.volatility.average_true_range(
+        df["High"], df["Low"], df["Close"], window=14, fillna=False
     )
 
-    # --- Volume Check ---
-    out["VolMA20"] = out["Volume"].rolling(20).mean()
-    out["ROC5"] = out["Close"].pct_change(5) * 100.0
 
+def _vwap(df, c, p):
+    return (
+        df["Volume"] * (df["High"] + df["Low"] + df["Close"]) / 3
+    ).cumsum() / df["Volume"].cumsum()
+
+
+INDICATORS = {
+    # --- Trend & Mean Indicators ---
+    "EMA_S": ((), lambda df, c, p: ema(df["Close"], p["ema_s"])),
+    "EMA_L": ((), lambda df, c, p: ema(df["Close"], p["ema_l"])),
+    "RSI": ((), lambda df, c, p: rsi(df["Close"], p["rsi_period"])),
+    "RSI_PREV": (("RSI",), lambda df, c, p: c["RSI"].shift(1)),  # simple cross detection
+    "RSI_PREV2": (("RSI",), lambda df, c, p: c["RSI"].shift(2)),  # divergence/pattern check
+    # --- Bollinger Bands (Volatility & Range) ---
+    "_BB": ((), _bollinger),
+    "BB_UPPER": (("_BB",), lambda df, c, p: c["_BB"].bollinger_hband()),
+    "BB_LOWER": (("_BB",), lambda df, c, p: c["_BB"].bollinger_lband()),
+    # --- Price Extremity Check (Z-Score) ---
+    "PRICE_Z_SCORE": ((), _z_score),
+    # --- Momentum & Volatility ---
+    "_MACD": ((), lambda df, c, p: ta.trend.MACD(df["Close"])),
+    "MACD": (("_MACD",), lambda df, c, p: c["_MACD"].macd()),
+    "MACD_SIG": (("_MACD",), lambda df, c, p: c["_MACD"].macd_signal()),
+    "ADX": ((), _adx),
+    "ATR": ((), _atr),
+    # --- Volume Check ---
+    "VolMA20": ((), lambda df, c, p: df["Volume"].rolling(20).mean()),
+    "ROC5": ((), lambda df, c, p: df["Close"].pct_change(5) * 100.0),
     # --- Institutional Benchmark ---
-    out["VWAP"] = (
-        out["Volume"] * (out["High"] + out["Low"] + out["Close"]) / 3
-    ).cumsum() / out["Volume"].cumsum()
+    "VWAP": ((), _vwap),
+}
+
+
+def requires(*columns):
+    """
+    Declare the indicator columns a strategy function reads, e.g.
+    @requires("RSI", "ADX"). Read back with columns_for().
+    """
+
+    def mark(fn):
+        fn.columns = columns
+        return fn
+
+    return mark
+
+
+def columns_for(*fns, extra=()):
+    """Indicator columns the given @requires functions (plus `extra`) read, in output order."""
+    wanted = set(extra)
+    for fn in fns:
+        wanted.update(fn.columns)
+    order = FEATURE_COLUMNS + HTF_COLUMNS
+    return tuple(c for c in order if c in wanted)
+
+
+def resolve(columns):
+    """`columns` plus everything they are built from, dependencies first."""
+    order, seen = [], set()
+
+    def visit(col):
+        if col in seen:
+            return
+        if col not in INDICATORS:
+            raise ValueError(f"Unknown indicator column: {col}")
+        seen.add(col)
+        for dep in INDICATORS[col][0]:
+            visit(dep)
+        order.append(col)
+
+    for col in columns:
+        visit(col)
+    return order
+
+
+def compute_indicators(df: pd.DataFrame, columns=FEATURE_COLUMNS, rsi_period=14, ema_s=20, ema_l=50) -> dict:
+    """Series for each of `columns`, computing only those and their dependencies."""
+    params = {"rsi_period": rsi_period, "ema_s": ema_s, "ema_l": ema_l}
+    computed = {}
+    for col in resolve(columns):
+        computed[col] = INDICATORS[col][1](df, computed, params)
+    return {col: computed[col] for col in columns}
+
+
+def shared_indicators(df: pd.DataFrame, columns=FEATURE_COLUMNS) -> dict:
+    """
+    Indicators that don't depend on the tunable periods (rsi_period, ema_s,
+    ema_l). Computed once and reused by the optimizer across grid points.
+    """
+    return compute_indicators(df, [c for c in columns if c not in PERIOD_COLUMNS])
+
+
+def _frame(df, cols, columns, dtype):
+    """df plus `columns` from `cols`, rows with any NaN dropped."""
+    out = df.copy()
+    for col in columns:
+        series = cols[col]
+        out[col] = series if dtype is None else series.astype(dtype)
 
     # We now look for trades starting at index 50, so we drop NaNs.
     out.dropna(inplace=True)
     return out
 
 
+def assemble_indicators(df: pd.DataFrame, ema_s, ema_l, rsi_series, shared: dict, columns=FEATURE_COLUMNS, dtype=None):
+    """Build the add_indicators frame from precomputed indicator series."""
+    cols = dict(shared)
+    cols.update(EMA_S=ema_s, EMA_L=ema_l, RSI=rsi_series)
+    if rsi_series is not None:
+        cols["RSI_PREV"] = rsi_series.shift(1)
+        cols["RSI_PREV2"] = rsi_series.shift(2)
+    return _frame(df, cols, columns, dtype)
+
+
+def htf_indicators(df_ltf: pd.DataFrame, df_htf: pd.DataFrame, ema_s=20, ema_l=50) -> dict:
+    """
+    HTF EMAs aligned to the LTF bars: each bar sees the newest HTF bar that
+    had closed by its open time (no lookahead).
+    """
+    htf_times = pd.to_datetime(df_htf["time"]).to_numpy().astype("datetime64[ns]")
+    step = np.median(np.diff(htf_times)) if len(htf_times) > 1 else np.timedelta64(0, "ns")
+    times = pd.to_datetime(df_ltf["time"]).to_numpy().astype("datetime64[ns]")
+    idx = np.searchsorted(htf_times + step, times, side="right") - 1
+
+    cols = {}
+    for col, span in (("HTF_EMA_S", ema_s), ("HTF_EMA_L", ema_l)):
+        values = ema(df_htf["Close"], span).to_numpy(dtype="float64")
+        aligned = np.where(idx >= 0, values[np.clip(idx, 0, None)], np.nan)
+        cols[col] = pd.Series(aligned, index=df_ltf.index)
+    return cols
+
+
+def add_indicators(
+    df_ltf: pd.DataFrame,
+    df_htf: pd.DataFrame = None,
+    rsi_period=14,
+    ema_s=20,
+    ema_l=50,
+    columns=None,
+    dtype=None,
+):
+    """
+    Calculates all required indicators for the Mean Reversion Scalper,
+    including Bollinger Bands, RSI Cross checks, and VWAP.
+
+    `columns` (e.g. columns_for(strategy_fn)) computes only those and what
+    they depend on; rows are dropped only for NaNs in what was computed.
+    With `df_htf`, HTF_EMA_S/HTF_EMA_L are added too. `dtype` ("float32")
+    stores the indicator columns narrower; they are computed in float64.
+    """
+    if df_ltf is None or df_ltf.empty or len(df_ltf) < 20:
+        return pd.DataFrame()
+
+    columns = tuple(columns) if columns is not None else FEATURE_COLUMNS
+    if df_htf is not None and not df_htf.empty and columns == FEATURE_COLUMNS:
+        columns += HTF_COLUMNS
+    htf = [c for c in columns if c in HTF_COLUMNS]
+    ltf = [c for c in columns if c not in HTF_COLUMNS]
+
+    cols = compute_indicators(df_ltf, ltf, rsi_period, ema_s, ema_l)
+    if htf:
+        if df_htf is None or df_htf.empty:
+            raise ValueError(f"{', '.join(htf)} need df_htf")
+        cols.update(htf_indicators(df_ltf, df_htf, ema_s, ema_l))
+    return _frame(df_ltf, cols, columns, dtype)
+
+
 def last_row(df: pd.DataFrame):
     return df.iloc[-1].to_dict() if len(df) else {}
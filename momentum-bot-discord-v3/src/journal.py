@@ -0,0 +1,183 @@
+# === src/journal.py (Buffered Append-Only Trade Journal) ===
+import atexit, csv, glob, logging, os, threading, time
+import numpy as np
+import pandas as pd
+
+TRADE_COLUMNS = [
+    "time",
+    "symbol",
+    "type",
+    "side",
+    "shares",
+    "price",
+    "stop",
+    "tp",
+    "votes",
+    "reasons",
+]
+TRADE_LOG = os.path.join("logs", "trades.csv")
+FLUSH_INTERVAL = 5.0  # seconds a row may sit in memory before append() flushes
+SEGMENT_ROWS = 5000  # rows in the live CSV before it is rotated into a segment
+
+NUMERIC = {"shares": "float64", "price": "float64", "stop": "float64", "tp": "float64", "votes": "float64"}
+
+
+def segment_dir_for(path):
+    """logs/trades.csv -> logs/trades_segments/"""
+    return os.path.splitext(path)[0] + "_segments"
+
+
+def write_segment(segment_dir, df):
+    """Store a block of trades as one .npz of column arrays. Returns its path."""
+    os.makedirs(segment_dir, exist_ok=True)
+    existing = sorted(glob.glob(os.path.join(segment_dir, "*.npz")))
+    seq = int(os.path.basename(existing[-1])[:-4]) + 1 if existing else 1
+    path = os.path.join(segment_dir, f"{seq:06d}.npz")
+
+    cols = {"time": pd.to_datetime(df["time"]).to_numpy().astype("datetime64[s]")}
+    for col in TRADE_COLUMNS[1:]:
+        if col in NUMERIC:
+            cols[col] = df[col].to_numpy(dtype=NUMERIC[col])
+        else:
+            cols[col] = df[col].fillna("").astype(str).to_numpy().astype(str)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **cols)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def read_segment(path):
+    with np.load(path, allow_pickle=False) as data:
+        return pd.DataFrame({col: data[col] for col in TRADE_COLUMNS})
+
+
+class TradeJournal:
+    """
+    Append-only trade log for the live loop.
+
+    Rows are buffered in memory and written to the open CSV on flush() (once
+    per scan cycle, or by append() once FLUSH_INTERVAL has passed); close()
+    also fsyncs. When the CSV reaches SEGMENT_ROWS rows it is rotated into a
+    columnar segment under <name>_segments/ and started afresh, so appends
+    stay cheap and readers only parse text for the newest rows.
+    """
+
+    def __init__(self, path=TRADE_LOG, flush_interval=FLUSH_INTERVAL, segment_rows=SEGMENT_ROWS):
+        self.path = path
+        self.segment_dir = segment_dir_for(path)
+        self.flush_interval = flush_interval
+        self.segment_rows = segment_rows
+        self._buffer = []
+        self._file = None
+        self._writer = None
+        self._rows = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._registered = False
+
+    def append(self, row):
+        """Queue one trade (a list in TRADE_COLUMNS order, or a dict)."""
+        if isinstance(row, dict):
+            row = [row.get(col, "") for col in TRADE_COLUMNS]
+        with self._lock:
+            self._buffer.append(row)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self, sync=False):
+        """Write buffered rows to the CSV (and fsync with `sync`)."""
+        with self._lock:
+            if self._buffer:
+                if self._file is None:
+                    self._open()
+                self._writer.writerows(self._buffer)
+                self._rows += len(self._buffer)
+                self._buffer.clear()
+            if self._file is not None:
+                self._file.flush()
+                if sync:
+                    os.fsync(self._file.fileno())
+            self._last_flush = time.monotonic()
+            if self._rows >= self.segment_rows:
+                self._rotate()
+
+    def close(self):
+        self.flush(sync=True)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = self._writer = None
+
+    # -------------------------------------------------
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if fresh:
+            self._rows = 0
+        else:
+            with open(self.path, "r", newline="") as f:
+                self._rows = max(sum(1 for _ in f) - 1, 0)
+        self._file = open(self.path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if fresh:
+            self._writer.writerow(TRADE_COLUMNS)
+        if not self._registered:
+            atexit.register(self.close)
+            self._registered = True
+
+    def _rotate(self):
+        """Move the live CSV into a columnar segment (called with the lock held)."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = self._writer = None
+
+        segment = write_segment(self.segment_dir, pd.read_csv(self.path))
+        os.remove(self.path)
+        logging.info(f"🗄️ Rotated {self._rows} trades into {segment}")
+        self._rows = 0
+
+
+class JournalReader:
+    """
+    Reads a TradeJournal: rotated segments plus the live CSV tail. Segments
+    never change once written, so a reader keeps the ones it has loaded and
+    each read() only opens segments that appeared since the last call.
+    """
+
+    def __init__(self, path=TRADE_LOG):
+        self.path = path
+        self.segment_dir = segment_dir_for(path)
+        self._segments = {}
+
+    def refresh(self):
+        """Load segments not seen before. Returns how many were new."""
+        new = 0
+        for seg in sorted(glob.glob(os.path.join(self.segment_dir, "*.npz"))):
+            if seg not in self._segments:
+                self._segments[seg] = read_segment(seg)
+                new += 1
+        return new
+
+    def tail(self):
+        """Rows still in the live CSV."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        df = pd.read_csv(self.path)
+        df["time"] = pd.to_datetime(df["time"])
+        return df
+
+    def read(self):
+        """Every trade so far, oldest first."""
+        self.refresh()
+        frames = [self._segments[k] for k in sorted(self._segments)]
+        tail = self.tail()
+        if not tail.empty:
+            frames.append(tail)
+        if not frames:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,102 @@
+# === src/liquidity.py (Rolling Dollar-Volume Index for Rotation) ===
+from collections import deque
+import pandas as pd
+from src.feed import TF_MAP, TF_MS
+
+LIQ_WINDOW = 30  # bars averaged for the dollar-volume filter
+LIQ_LIMIT = 60  # bars requested when a symbol's index is refreshed
+LIQ_MIN_BARS = 5  # fewer closed bars than this and a symbol isn't ranked
+
+
+def tf_ms(timeframe):
+    return TF_MS[TF_MAP.get(timeframe, timeframe.lower())]
+
+
+class _DollarVolume:
+    """Rolling sum of Close*Volume over the last `window` closed bars."""
+
+    def __init__(self, window):
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.last_time = None  # open time (ms) of the newest closed bar
+        self.checked = None  # when (ms) bars were last fetched for it
+
+    def push(self, t, dollar_vol):
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(dollar_vol)
+        self.total += dollar_vol
+        self.last_time = t
+
+    def average(self):
+        return self.total / len(self.values) if self.values else 0.0
+
+
+class LiquidityIndex:
+    """
+    Per-symbol average dollar volume over the last LIQ_WINDOW closed bars.
+
+    A symbol only needs new bars once the candle after its newest closed bar
+    has closed too (due()), so a daily series is refetched once a day instead
+    of on every scan, and rankings come straight from memory. When that bar
+    doesn't come (weekends, market holidays) it is asked for again at most
+    once per bar interval.
+    """
+
+    def __init__(self, window=LIQ_WINDOW):
+        self.window = window
+        self.states = {}
+        self.timeframes = {}
+
+    def due(self, symbol, timeframe, now_ms):
+        """True if `symbol` has never been indexed or a newer bar may have closed."""
+        state = self.states.get(symbol)
+        if state is None or state.checked is None or self.timeframes.get(symbol) != timeframe:
+            return True
+        step = tf_ms(timeframe)
+        if state.last_time is not None and now_ms < state.last_time + 2 * step:
+            return False
+        # A bar is due but the last fetch didn't have it (market closed): don't ask every scan
+        return now_ms >= state.checked + step
+
+    def update(self, symbol, timeframe, df, now_ms):
+        """Fold in bars that closed since the last update. Returns bars added."""
+        if df is None or df.empty:
+            return 0
+        step = tf_ms(timeframe)
+        t = pd.to_datetime(df["time"]).to_numpy().astype("datetime64[ms]").astype("int64")
+        dollar_vol = (df["Close"] * df["Volume"]).to_numpy(dtype="float64")
+
+        # Still-forming candle holds partial volume: leave it out
+        keep = t + step <= now_ms
+        state = self.states.get(symbol)
+        if state is None or self.timeframes.get(symbol) != timeframe:
+            state = self.states[symbol] = _DollarVolume(self.window)
+            self.timeframes[symbol] = timeframe
+        if state.last_time is not None:
+            keep &= t > state.last_time
+        state.checked = now_ms
+
+        new_t, new_dv = t[keep][-self.window :], dollar_vol[keep][-self.window :]
+        for ts, dv in zip(new_t.tolist(), new_dv.tolist()):
+            state.push(ts, dv)
+        return len(new_t)
+
+    def average(self, symbol):
+        state = self.states.get(symbol)
+        return state.average() if state is not None else 0.0
+
+    def top(self, symbols, min_vol, keep_top=None):
+        """Symbols averaging >= min_vol, most liquid first, at most keep_top."""
+        ranked = sorted(
+            (
+                s
+                for s in symbols
+                if s in self.states
+                and len(self.states[s].values) >= LIQ_MIN_BARS
+                and self.average(s) >= min_vol
+            ),
+            key=self.average,
+            reverse=True,
+        )
+        return ranked[:keep_top] if keep_top is not None else ranked
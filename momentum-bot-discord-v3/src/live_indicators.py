@@ -0,0 +1,274 @@
+# === src/live_indicators.py (Incremental Indicators for the Live Loop) ===
+import copy
+import math
+from collections import deque
+import numpy as np
+import pandas as pd
+from src.indicators import BB_WINDOW, BB_STD
+
+# Fixed windows used by add_indicators (ta defaults)
+ATR_WINDOW = 14
+ADX_WINDOW = 14
+MACD_FAST, MACD_SLOW, MACD_SIGN = 12, 26, 9
+VOL_WINDOW = 20
+ROC_WINDOW = 5
+
+NAN = float("nan")
+
+
+class _Ewm:
+    """pandas ewm(adjust=False, min_periods=...) on a stream of values."""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    def push(self, x):
+        if x != x:  # NaN before the series starts: ewm skips it
+            return NAN
+        self.value = x if self.value is None else (1 - self.alpha) * self.value + self.alpha * x
+        self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class IndicatorState:
+    """
+    Indicator accumulators for one symbol, advanced one closed bar at a time.
+    Produces the same columns as add_indicators() for the newest bar, in O(1).
+    """
+
+    def __init__(self, rsi_period=14, ema_s=20, ema_l=50, vwap_window=None):
+        self.rsi_period = rsi_period
+        self.n = 0
+        self.last_time = None
+        self.prev = None  # previous bar (High, Low, Close)
+
+        # --- Trend & Mean Indicators ---
+        self.ema_s = _Ewm(2 / (ema_s + 1), ema_s)
+        self.ema_l = _Ewm(2 / (ema_l + 1), ema_l)
+        self.rsi_up = _Ewm(1 / rsi_period, rsi_period)
+        self.rsi_dn = _Ewm(1 / rsi_period, rsi_period)
+        self.rsi_hist = deque([NAN, NAN], maxlen=2)
+
+        # --- Momentum (MACD) ---
+        self.ema_fast = _Ewm(2 / (MACD_FAST + 1), MACD_FAST)
+        self.ema_slow = _Ewm(2 / (MACD_SLOW + 1), MACD_SLOW)
+        self.macd_sig = _Ewm(2 / (MACD_SIGN + 1), MACD_SIGN)
+
+        # --- Rolling windows (Bollinger, Z-score, VolMA20, ROC5) ---
+        self.closes = deque(maxlen=max(BB_WINDOW, ROC_WINDOW + 1))
+        self.volumes = deque(maxlen=VOL_WINDOW)
+
+        # --- ATR (Wilder, seeded with the plain mean of the first window) ---
+        self.atr = 0.0
+        self.atr_seed = 0.0
+
+        # --- ADX (Wilder sums of TR/+DM/-DM, then Wilder average of DX) ---
+        self.trs = self.dip = self.din = 0.0
+        self.adx = 0.0
+        self.dx_seed = 0.0
+
+        # --- VWAP (cumulative, or over the last `vwap_window` bars) ---
+        self.vwap_window = vwap_window
+        self.pv_sum = self.v_sum = 0.0
+        self.pv_hist = deque(maxlen=vwap_window) if vwap_window else None
+        self.v_hist = deque(maxlen=vwap_window) if vwap_window else None
+
+        self.row = {}
+
+    # -------------------------------------------------
+    def push(self, bar):
+        """Advance every accumulator by one bar (dict/Series with OHLCV + time)."""
+        t = bar["time"]
+        o, h, l, c, v = (
+            float(bar["Open"]),
+            float(bar["High"]),
+            float(bar["Low"]),
+            float(bar["Close"]),
+            float(bar["Volume"]),
+        )
+        k = self.n
+        w = ADX_WINDOW
+
+        ema_s = self.ema_s.push(c)
+        ema_l = self.ema_l.push(c)
+
+        # RSI: first diff is NaN, which ta maps to 0 gain / 0 loss
+        diff = c - self.prev[2] if self.prev else 0.0
+        up = self.rsi_up.push(diff if diff > 0 else 0.0)
+        dn = self.rsi_dn.push(-diff if diff < 0 else 0.0)
+        if dn != dn:
+            rsi = NAN
+        elif dn == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + up / dn))
+        rsi_prev2, rsi_prev = self.rsi_hist
+        self.rsi_hist.append(rsi)
+
+        # Bollinger Bands / Z-score / ROC5 from the close window
+        self.closes.append(c)
+        window = np.fromiter(self.closes, dtype=float)[-BB_WINDOW:]
+        if len(window) == BB_WINDOW:
+            mavg = window.mean()
+            mstd = window.std()
+            bb_upper = mavg + BB_STD * mstd
+            bb_lower = mavg - BB_STD * mstd
+            z = (c - mavg) / mstd
+        else:
+            bb_upper = bb_lower = z = NAN
+        roc5 = (
+            (c / self.closes[-ROC_WINDOW - 1] - 1) * 100.0
+            if len(self.closes) > ROC_WINDOW
+            else NAN
+        )
+
+        # MACD
+        fast = self.ema_fast.push(c)
+        slow = self.ema_slow.push(c)
+        macd = fast - slow
+        macd_sig = self.macd_sig.push(macd)
+
+        # ATR: TR of the first bar is just High-Low
+        if self.prev:
+            ph, pl, pc = self.prev
+            tr_atr = max(h - l, abs(h - pc), abs(l - pc))
+            tr_adx = max(h, pc) - min(l, pc)
+            diff_up, diff_down = h - ph, pl - l
+            pos = diff_up if (diff_up > diff_down and diff_up > 0) else 0.0
+            neg = diff_down if (diff_down > diff_up and diff_down > 0) else 0.0
+        else:
+            tr_atr = h - l
+            tr_adx = pos = neg = NAN
+        if k < ATR_WINDOW:
+            self.atr_seed += tr_atr
+            if k == ATR_WINDOW - 1:
+                self.atr = self.atr_seed / ATR_WINDOW
+        else:
+            self.atr = (self.atr * (ATR_WINDOW - 1) + tr_atr) / float(ATR_WINDOW)
+
+        # ADX: Wilder sums start from bars 1..w, DX averaged from bar w onwards
+        if 1 <= k <= w:
+            self.trs += tr_adx
+            self.dip += pos
+            self.din += neg
+        elif k > w:
+            self.trs = self.trs - (self.trs / float(w)) + tr_adx
+            self.dip = self.dip - (self.dip / float(w)) + pos
+            self.din = self.din - (self.din / float(w)) + neg
+        if k >= w:
+            dx = self._dx(self.dip, self.din, self.trs)
+            if k < 2 * w - 1:
+                self.dx_seed += dx
+            elif k == 2 * w - 1:
+                self.adx = (self.dx_seed + dx) / w
+            else:
+                self.adx = ((self.adx * (w - 1)) + dx) / float(w)
+
+        # Volume / VWAP
+        self.volumes.append(v)
+        vol_ma = (
+            sum(self.volumes) / VOL_WINDOW if len(self.volumes) == VOL_WINDOW else NAN
+        )
+        pv = v * (h + l + c) / 3
+        if self.pv_hist is not None:
+            if len(self.pv_hist) == self.vwap_window:
+                self.pv_sum -= self.pv_hist[0]
+                self.v_sum -= self.v_hist[0]
+            self.pv_hist.append(pv)
+            self.v_hist.append(v)
+        self.pv_sum += pv
+        self.v_sum += v
+        vwap = self.pv_sum / self.v_sum if self.v_sum else NAN
+
+        self.row = {
+            "time": t,
+            "Open": o,
+            "High": h,
+            "Low": l,
+            "Close": c,
+            "Volume": v,
+            "EMA_S": ema_s,
+            "EMA_L": ema_l,
+            "RSI": rsi,
+            "BB_UPPER": bb_upper,
+            "BB_LOWER": bb_lower,
+            "PRICE_Z_SCORE": z,
+            "RSI_PREV": rsi_prev,
+            "RSI_PREV2": rsi_prev2,
+            "MACD": macd,
+            "MACD_SIG": macd_sig,
+            "ADX": self.adx,
+            "ATR": self.atr if k >= ATR_WINDOW - 1 else 0.0,
+            "VolMA20": vol_ma,
+            "ROC5": roc5,
+            "VWAP": vwap,
+        }
+        self.prev = (h, l, c)
+        self.last_time = t
+        self.n += 1
+
+    @staticmethod
+    def _dx(dip, din, trs):
+        di_pos = 100 * (dip / trs) if trs != 0 else 0.0
+        di_neg = 100 * (din / trs) if trs != 0 else 0.0
+        total = di_pos + di_neg
+        return 100 * abs((di_pos - di_neg) / total) if total != 0 else 0.0
+
+    def ready(self):
+        """True once every column is warmed up (add_indicators would keep the row)."""
+        return bool(self.row) and not any(
+            isinstance(x, float) and math.isnan(x) for x in self.row.values()
+        )
+
+
+class IndicatorEngine:
+    """
+    Per-symbol incremental indicators. Closed bars are folded into the state
+    once; the newest (possibly still forming) bar is evaluated on a copy, so a
+    scan costs O(new bars) instead of O(history).
+    """
+
+    def __init__(self, rsi_period=14, ema_s=20, ema_l=50, vwap_window=None):
+        self.params = dict(
+            rsi_period=rsi_period, ema_s=ema_s, ema_l=ema_l, vwap_window=vwap_window
+        )
+        self.states = {}
+
+    def update(self, symbol, df: pd.DataFrame):
+        """
+        Feed the latest bars for `symbol` and return the newest row as a dict,
+        equivalent to last_row(add_indicators(df)). Returns {} until warmed up.
+        """
+        if df is None or df.empty:
+            return {}
+
+        times = pd.to_datetime(df["time"]).to_numpy()
+        state = self.states.get(symbol)
+        start = 0
+        if state is not None and state.last_time is not None:
+            last = np.datetime64(state.last_time)
+            start = int(np.searchsorted(times, last, side="right"))
+            # History no longer overlaps what we've folded in: start over
+            if start == 0 or start > len(times) - 1 or times[start - 1] != last:
+                state, start = None, 0
+        if state is None:
+            state = IndicatorState(**self.params)
+            self.states[symbol] = state
+
+        rows = df.iloc[start:].to_dict("records")
+        for bar in rows[:-1]:
+            state.push(bar)
+
+        # Newest bar may still be forming: evaluate it without committing
+        head = copy.deepcopy(state)
+        head.push(rows[-1])
+        return head.row if head.ready() else {}
+
+    def reset(self, symbol=None):
+        if symbol is None:
+            self.states.clear()
+        else:
+            self.states.pop(symbol, None)
@@ -0,0 +1,172 @@
+# === src/metrics.py (Scan-Cycle Metrics, Prometheus Text Format) ===
+import bisect, logging, os, threading, time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "momentum"
+METRICS_FILE = os.path.join("logs", "metrics.prom")
+
+# Upper bounds (seconds) of the histogram buckets
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+CYCLE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 900, 3600)
+
+# name -> (type, help, buckets)
+METRICS = {
+    "scan_cycle_seconds": ("histogram", "Wall time of a full scan cycle", CYCLE_BUCKETS),
+    "scan_stage_seconds": ("histogram", "Wall time per scan stage", STAGE_BUCKETS),
+    "symbol_fetch_seconds": ("histogram", "Scan start until a symbol's entry bars arrived", STAGE_BUCKETS),
+    "symbol_eval_seconds": ("histogram", "Indicators + voting time per symbol", STAGE_BUCKETS),
+    "bar_close_to_submit_seconds": (
+        "histogram",
+        "Close of the newest closed bar until its order was accepted",
+        LATENCY_BUCKETS,
+    ),
+    "scan_overruns_total": ("counter", "Cycles that took longer than --interval", None),
+    "fetches_total": ("counter", "Bar series fetched", None),
+    "cache_hits_total": ("counter", "Inputs served without a refetch", None),
+    "cache_misses_total": ("counter", "Inputs that had to be fetched", None),
+    "signals_total": ("counter", "Entry signals produced", None),
+    "skipped_signals_total": ("counter", "Signals skipped: position or order already open", None),
+    "orders_total": ("counter", "Orders submitted, by result", None),
+    "errors_total": ("counter", "Errors, by where they happened", None),
+    "active_symbols": ("gauge", "Symbols in the entry scan after rotation", None),
+    "last_cycle_timestamp_seconds": ("gauge", "Unix time the last cycle finished", None),
+}
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(v):
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Metrics:
+    """
+    In-process counters, gauges and histograms for the live loop, named in
+    METRICS. render() gives the Prometheus text format; export() writes it
+    to `path` (atomically, for node_exporter's textfile collector) and
+    serve() exposes it on a local HTTP endpoint.
+    """
+
+    def __init__(self, path=None, prefix=PREFIX):
+        self.path = path
+        self.prefix = prefix
+        self._values = {}  # (name, labels) -> float, or [bucket counts, sum, count]
+        self._lock = threading.Lock()
+        self.server = None
+
+    def inc(self, name, n=1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[(name, _labels(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        buckets = METRICS[name][2]
+        key = (name, _labels(labels))
+        with self._lock:
+            h = self._values.get(key)
+            if h is None:
+                h = self._values[key] = [[0] * len(buckets), 0.0, 0]
+            i = bisect.bisect_left(buckets, seconds)
+            if i < len(buckets):
+                h[0][i] += 1
+            h[1] += seconds
+            h[2] += 1
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Observe the wall time of the with-block."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def value(self, name, **labels):
+        """Counter/gauge value, or a histogram's observation count."""
+        v = self._values.get((name, _labels(labels)), 0)
+        return v[2] if isinstance(v, list) else v
+
+    # ---------------- export ----------------
+    def render(self):
+        with self._lock:
+            items = sorted(
+                (k, [list(v[0]), v[1], v[2]] if isinstance(v, list) else v)
+                for k, v in self._values.items()
+            )
+        lines, seen = [], set()
+        for (name, labels), v in items:
+            kind, help_text, buckets = METRICS[name]
+            full = f"{self.prefix}_{name}"
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+            if kind != "histogram":
+                lines.append(f"{full}{_fmt_labels(labels)} {_fmt_value(v)}")
+                continue
+            counts, total, count = v
+            cumulative = 0
+            for le, c in zip(buckets, counts):
+                cumulative += c
+                lines.append(f"{full}_bucket{_fmt_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{full}_bucket{_fmt_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{full}_sum{_fmt_labels(labels)} {total!r}")
+            lines.append(f"{full}_count{_fmt_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Write render() to `path` (no-op without one)."""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Metrics export failed: {e}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve render() at http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                data = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, fmt, *args):
+                logging.debug(fmt % args)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logging.info(f"📊 Metrics on http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
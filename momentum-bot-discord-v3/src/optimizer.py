@@ -0,0 +1,261 @@
+# === src/optimizer.py (Grid Search over config/optimizer.yml) ===
+import argparse, copy, datetime as dt, itertools, logging, math, os, traceback
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.utils import setup_logging, load_env
+from src.config import load_all
+from src.feed import Feed
+from src.indicators import FEATURE_COLUMNS, ema, rsi, shared_indicators, assemble_indicators
+from src.backtest_multi import simulate, feature_columns
+
+INITIAL_EQUITY = 100000
+GRID_KEYS = ["rsi_period", "ema_short", "ema_long", "adx_min", "vol_mult"]
+
+
+def max_drawdown(trades, initial_equity=INITIAL_EQUITY):
+    """Peak-to-trough drop (USD) of the realized equity curve (a TradeLog)."""
+    if not len(trades):
+        return 0.0
+    curve = np.r_[float(initial_equity), trades["equity"]]
+    return float((np.maximum.accumulate(curve) - curve).max())
+
+
+def netprofit_over_dd(net_pnl, max_dd):
+    if max_dd > 0:
+        return net_pnl / max_dd
+    return 0.0 if net_pnl == 0 else math.copysign(math.inf, net_pnl)
+
+
+OBJECTIVES = {"netprofit_over_dd": netprofit_over_dd}
+
+
+class IndicatorMemo:
+    """
+    Indicator series for one symbol's bars, each computed once per distinct
+    parameter: RSI once per rsi_period, EMA once per span, and the period-free
+    indicators (BB, Z-score, MACD, ADX, ATR, VWAP, ...) exactly once.
+    Only `columns` (and what they depend on) are computed.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns=FEATURE_COLUMNS):
+        self.df = df
+        self.columns = tuple(columns)
+        self._ema = {}
+        self._rsi = {}
+        self._shared = None
+
+    def ema(self, span):
+        if span not in self._ema:
+            self._ema[span] = ema(self.df["Close"], span)
+        return self._ema[span]
+
+    def rsi(self, period):
+        if period not in self._rsi:
+            self._rsi[period] = rsi(self.df["Close"], period)
+        return self._rsi[period]
+
+    def shared(self):
+        if self._shared is None:
+            self._shared = shared_indicators(self.df, self.columns)
+        return self._shared
+
+    def warm(self, grids):
+        """Precompute every series the grids need (e.g. before handing to workers)."""
+        for p in grids["rsi_period"]:
+            self.rsi(p)
+        for span in set(grids["ema_short"]) | set(grids["ema_long"]):
+            self.ema(span)
+        self.shared()
+        return self
+
+    def frame(self, rsi_period, ema_short, ema_long, rows=None):
+        """
+        Same frame as add_indicators(df, rsi_period, ema_short, ema_long, columns).
+        `rows` (a slice) restricts it to a window of the full-history series.
+        """
+        cut = (lambda s: s) if rows is None else (lambda s: s.iloc[rows])
+        return assemble_indicators(
+            cut(self.df),
+            cut(self.ema(ema_short)),
+            cut(self.ema(ema_long)),
+            cut(self.rsi(rsi_period)),
+            {k: cut(v) for k, v in self.shared().items()},
+            self.columns,
+        )
+
+
+def grid_points(grids):
+    """Every combination of the optimizer grids, as dicts keyed by GRID_KEYS."""
+    values = [grids[k] for k in GRID_KEYS]
+    return [dict(zip(GRID_KEYS, combo)) for combo in itertools.product(*values)]
+
+
+def apply_point(rules_cfg, point):
+    """rules_cfg copy with a grid point's strategy thresholds applied."""
+    rules = copy.deepcopy(rules_cfg)
+    rules["mean_revert_pullback"]["adx_min"] = point["adx_min"]
+    rules["mean_revert_pullback"]["vol_mult_min"] = point["vol_mult"]
+    return rules
+
+
+def evaluate_point(feats, symbol, point, global_cfg, rules_cfg, trigger, mode, objective):
+    """Backtest one grid point on a prepared feature frame."""
+    rules = apply_point(rules_cfg, point)
+    trades, _, _ = simulate(feats, symbol, global_cfg, rules, trigger, mode)
+    pnl = trades["pnl"]
+    net_pnl = float(pnl.sum())
+    dd = max_drawdown(trades)
+    return {
+        "symbol": symbol,
+        **point,
+        "trades": len(trades),
+        "win_pct": 100.0 * int((pnl > 0).sum()) / len(pnl) if len(pnl) else 0.0,
+        "net_pnl": net_pnl,
+        "max_dd": dd,
+        "objective": OBJECTIVES[objective](net_pnl, dd),
+    }
+
+
+def optimize_symbol(df, symbol, opt_cfg, global_cfg, rules_cfg, trigger=1, mode="crypto", memo=None, rows=None):
+    """
+    Sweep the full grid for one symbol. Grid points sharing an indicator
+    parameter reuse the same memoized series. Returns a ranked DataFrame.
+    `rows` limits the sweep to a slice of the memo's history.
+    """
+    memo = memo or IndicatorMemo(df, feature_columns(mode))
+    grids = opt_cfg["grids"]
+    objective = opt_cfg.get("objective", "netprofit_over_dd")
+
+    results = []
+    for rsi_p, ema_s, ema_l in itertools.product(
+        grids["rsi_period"], grids["ema_short"], grids["ema_long"]
+    ):
+        if ema_s >= ema_l:
+            continue
+        feats = memo.frame(rsi_p, ema_s, ema_l, rows)
+        for adx_min, vol_mult in itertools.product(grids["adx_min"], grids["vol_mult"]):
+            point = dict(
+                rsi_period=rsi_p,
+                ema_short=ema_s,
+                ema_long=ema_l,
+                adx_min=adx_min,
+                vol_mult=vol_mult,
+            )
+            results.append(
+                evaluate_point(
+                    feats, symbol, point, global_cfg, rules_cfg, trigger, mode, objective
+                )
+            )
+    return rank_results(pd.DataFrame(results))
+
+
+def rank_results(results: pd.DataFrame):
+    """Sort best-first by objective (net PnL breaks ties) and add a rank column."""
+    if results.empty:
+        return results
+    results = results.sort_values(
+        ["objective", "net_pnl"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    return results
+
+
+def _optimize_job(symbol, df, start_date, end_date, opt_cfg, global_cfg, rules_cfg, trigger):
+    """Worker entry point; never raises so one symbol can't sink the sweep."""
+    try:
+        if df is None or df.empty:
+            return symbol, pd.DataFrame(), "no data"
+        df = df.copy()
+        df["time"] = pd.to_datetime(df["time"], errors="coerce")
+        df = df[(df["time"] >= start_date) & (df["time"] <= end_date)].reset_index(
+            drop=True
+        )
+        if len(df) < 60:
+            return symbol, pd.DataFrame(), "not enough bars"
+        return symbol, optimize_symbol(df, symbol, opt_cfg, global_cfg, rules_cfg, trigger), None
+    except Exception:
+        return symbol, pd.DataFrame(), traceback.format_exc()
+
+
+def run_optimizations(jobs, workers=1):
+    """Yield (symbol, ranked_table, error) for {symbol: job_args} as each finishes."""
+    if workers <= 1:
+        for symbol, job in jobs.items():
+            yield _optimize_job(symbol, *job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_optimize_job, symbol, *job): symbol
+            for symbol, job in jobs.items()
+        }
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception:
+                yield futures[fut], pd.DataFrame(), traceback.format_exc()
+
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tf", default="5m", help="Low Timeframe (LTF) for entry")
+    ap.add_argument("--years", type=int, default=1)
+    ap.add_argument("--symbols", nargs="*", help="Defaults to the crypto universe")
+    ap.add_argument("--trigger", type=float, default=1.0)
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--top", type=int, default=10, help="Rows to print per symbol")
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    env = load_env()
+    global_cfg, rules_cfg, uni_cfg, opt_cfg = load_all()
+
+    feed = Feed(
+        env["APCA_API_KEY_ID"],
+        env["APCA_API_SECRET_KEY"],
+        env["APCA_API_BASE_URL"],
+    )
+
+    end_date = dt.datetime.now()
+    start_date = end_date - dt.timedelta(days=365 * args.years)
+    symbols = args.symbols or uni_cfg["universe"]["crypto"]
+    n_points = len(grid_points(opt_cfg["grids"]))
+    logging.info(f"🔎 Optimizing {len(symbols)} symbols x {n_points} grid points")
+
+    frames = feed.bars_many(symbols, args.tf, since=start_date)
+    jobs = {
+        s: (frames.get(s), start_date, end_date, opt_cfg, global_cfg, rules_cfg, args.trigger)
+        for s in symbols
+    }
+
+    tables = {}
+    for symbol, table, err in run_optimizations(jobs, args.workers):
+        if err:
+            logging.warning(f"❌ Optimization failed for {symbol}: {err}")
+            continue
+        tables[symbol] = table
+        logging.info(f"{symbol} done | best objective={table['objective'].iloc[0]:.3f}")
+
+    ranked = [tables[s] for s in symbols if s in tables]
+    if not ranked:
+        logging.warning("No optimizer results")
+        return
+
+    os.makedirs("logs", exist_ok=True)
+    out_file = "logs/optimizer_results.csv"
+    pd.concat(ranked, ignore_index=True).to_csv(out_file, index=False)
+    logging.info(f"✅ Optimization complete | saved to {out_file}")
+
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        for symbol in symbols:
+            if symbol in tables:
+                print(f"\n=== {symbol} TOP {args.top} ===")
+                print(tables[symbol].head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,24 @@
-import pandas as pd
 import os
+from src.journal import JournalReader, TRADE_LOG
 
-LOG_FILE = "logs/trades.csv"
+LOG_FILE = TRADE_LOG
 
+# Kept across calls so a long-running process only loads segments it hasn't seen
+_reader = None
 
-def performance_summary():
-    if not os.path.exists(LOG_FILE):
+
+def performance_summary(reader=None):
+    global _reader
+    if reader is None:
+        if _reader is None:
+            _reader = JournalReader(LOG_FILE)
+        reader = _reader
+
+    df = reader.read()
+    if df.empty and not _reader_has_history(reader):
         print("No trades.csv found yet. Run the bot and generate some trades first.")
         return
 
-    df = pd.read_csv(LOG_FILE)
-
     if df.empty:
         print("No trades logged yet.")
         return
@@ -41,5 +49,9 @@ def performance_summary():
     print("===========================")
 
 
+def _reader_has_history(reader):
+    return os.path.exists(reader.path) or os.path.isdir(reader.segment_dir)
+
+
 if __name__ == "__main__":
     performance_summary()
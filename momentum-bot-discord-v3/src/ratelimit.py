@@ -0,0 +1,34 @@
+# === src/ratelimit.py (Shared Request Budgets) ===
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Every thread that talks to the same venue shares
+    one bucket, so concurrent fetches together never exceed `rate` calls/sec.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available. Returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+            # Reserve the tokens even if we go negative, then sleep outside the
+            # lock so other threads can queue up behind us without spinning.
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
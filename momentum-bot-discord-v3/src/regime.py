@@ -1,6 +1,104 @@
+import logging
+import numpy as np
+import pandas as pd
+from src.indicators import ema, requires
+
+DAY = np.timedelta64(1, "D")
+REGIME_TTL = 3600  # seconds between checks for a new daily close
+REGIME_RETRY = 60  # seconds before retrying after a failed/empty SPY/VIX fetch
+EMA_S, EMA_L = 20, 50  # add_indicators defaults used by classify()
+
+
+@requires("EMA_S", "EMA_L")
 def classify(spy_row, vix_row, bull_vix_lt=18, bear_vix_gt=22):
     bull = (spy_row['EMA_S'] > spy_row['EMA_L']) and (vix_row['Close'] < bull_vix_lt)
     bear = (spy_row['EMA_S'] < spy_row['EMA_L']) and (vix_row['Close'] > bear_vix_gt)
     if bull: return +1
     if bear: return -1
     return 0
+
+
+def regime_series(spy, vix, bull_vix_lt=18, bear_vix_gt=22):
+    """
+    classify() for every daily SPY bar at once: a +1/0/-1 Series indexed by
+    bar time. VIX is matched to each SPY bar as of that date; bars before the
+    SPY EMAs have warmed up are neutral.
+    """
+    s = pd.DataFrame(
+        {
+            "time": pd.to_datetime(spy["time"]).to_numpy(),
+            "EMA_S": ema(spy["Close"], EMA_S).to_numpy(),
+            "EMA_L": ema(spy["Close"], EMA_L).to_numpy(),
+        }
+    )
+    v = pd.DataFrame(
+        {"time": pd.to_datetime(vix["time"]).to_numpy(), "VIX": vix["Close"].to_numpy()}
+    )
+    m = pd.merge_asof(s.sort_values("time"), v.sort_values("time"), on="time")
+    bull = (m["EMA_S"] > m["EMA_L"]) & (m["VIX"] < bull_vix_lt)
+    bear = (m["EMA_S"] < m["EMA_L"]) & (m["VIX"] > bear_vix_gt)
+    return pd.Series(
+        np.where(bull, 1, np.where(bear, -1, 0)), index=pd.DatetimeIndex(m["time"])
+    )
+
+
+def regime_at(series, times):
+    """
+    Regime in force at each bar time: that of the newest daily bar that had
+    closed by then (no lookahead). One searchsorted over the whole array.
+    """
+    times = np.asarray(pd.to_datetime(times), dtype="datetime64[ns]")
+    closes = series.index.to_numpy().astype("datetime64[ns]") + DAY
+    idx = np.searchsorted(closes, times, side="right") - 1
+    values = series.to_numpy()
+    return np.where(idx >= 0, values[np.clip(idx, 0, None)], 0)
+
+
+def closed_daily(df, now):
+    """Daily bars that have finished by `now` (datetime64)."""
+    times = pd.to_datetime(df["time"]).to_numpy()
+    return df[times + DAY <= now]
+
+
+class RegimeService:
+    """
+    Live regime from daily SPY/VIX. The answer only changes at a daily close,
+    so SPY/VIX are rechecked at most every `ttl` seconds and the regime is
+    recomputed only when that check brings a new closed daily bar. A fetch
+    that fails or comes back empty is retried after `retry` seconds instead.
+    """
+
+    def __init__(self, ttl=REGIME_TTL, retry=REGIME_RETRY):
+        self.ttl = ttl
+        self.retry = retry
+        self.regime = 0
+        self.series = None
+        self.last_bar = None
+        self.checked_at = None  # last successful check (ms)
+        self.next_check = None  # ms
+
+    def due(self, now_ms):
+        return self.next_check is None or now_ms >= self.next_check
+
+    def update(self, spy, vix, now_ms, bull_vix_lt=18, bear_vix_gt=22):
+        """Fold in freshly fetched SPY/VIX daily bars; returns the current regime."""
+        if spy is None or vix is None or spy.empty or vix.empty:
+            logging.warning("SPY/VIX missing — keeping last regime")
+            self.next_check = now_ms + self.retry * 1000
+            return self.regime
+
+        now = np.datetime64(int(now_ms), "ms")
+        spy, vix = closed_daily(spy, now), closed_daily(vix, now)
+        if spy.empty or vix.empty:
+            self.next_check = now_ms + self.retry * 1000
+            return self.regime
+
+        self.checked_at = now_ms
+        self.next_check = now_ms + self.ttl * 1000
+        key = (spy["time"].iloc[-1], vix["time"].iloc[-1])
+        if key != self.last_bar:
+            self.series = regime_series(spy, vix, bull_vix_lt, bear_vix_gt)
+            self.regime = int(self.series.iloc[-1])
+            self.last_bar = key
+            logging.info(f"🧭 Regime {self.regime:+d} as of {pd.Timestamp(key[0]):%Y-%m-%d}")
+        return self.regime
@@ -0,0 +1,261 @@
+# === src/replay.py (Offline Replay of the Live Loop) ===
+import argparse, itertools, logging, os, time
+from collections import deque
+from concurrent.futures import Future
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from src.utils import setup_logging
+from src.config import load_all, SCAN_DEFAULTS, with_defaults
+from src.barstore import BarStore, BAR_CACHE_DIR, frame_to_records, records_to_frame
+from src.feed import TF_MAP, TF_MS, _to_ms
+from src.live_indicators import IndicatorEngine
+from src.journal import TradeJournal
+from src import run
+
+
+class ReplayFinished(Exception):
+    """Raised by SimClock.sleep once the replay window is exhausted."""
+
+
+class SimClock:
+    """
+    Simulated wall clock with the time()/sleep()/strftime() subset run.py uses.
+    sleep() advances instantly; past `end` it raises ReplayFinished.
+    """
+
+    def __init__(self, start, end=None):
+        self.now = _to_ms(start) / 1000.0
+        self.end = _to_ms(end) / 1000.0 if end is not None else None
+        self.ticks = 0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+        self.ticks += 1
+        if self.end is not None and self.now > self.end:
+            raise ReplayFinished()
+
+    def strftime(self, fmt):
+        return time.strftime(fmt, time.gmtime(self.now))
+
+
+class ReplayFeed:
+    """
+    Feed.bars() over local bar files (BarStore layout, e.g. data/bars/), cut
+    at the simulated clock: only candles that have closed by clock.time()
+    are visible, so a replay never sees the future.
+    """
+
+    def __init__(self, clock, root=BAR_CACHE_DIR):
+        self.clock = clock
+        self.store = BarStore(root)
+        self._series = {}
+
+    def load(self, symbol, timeframe, df):
+        """Serve an in-memory frame instead of (or in addition to) the files."""
+        rec = frame_to_records(df)
+        self._series[(symbol, self._tf(timeframe))] = (rec["time"], records_to_frame(rec))
+
+    @staticmethod
+    def _tf(timeframe):
+        return TF_MAP.get(timeframe, TF_MAP.get(timeframe.lower(), "1h"))
+
+    def _series_for(self, symbol, tf):
+        """(epoch-ms times, full frame), loaded from disk once per replay."""
+        key = (symbol, tf)
+        if key not in self._series:
+            rec = self.store.read(symbol, tf)
+            self._series[key] = (
+                None if rec is None else (np.array(rec["time"]), records_to_frame(rec))
+            )
+        return self._series[key]
+
+    def bars(self, symbol: str, timeframe: str = "1h", limit: int = 1000, since=None):
+        tf = self._tf(timeframe)
+        if not symbol.endswith("USD"):
+            limit = 5000  # same as Feed.bars
+
+        series = self._series_for(symbol, tf)
+        if series is None:
+            return pd.DataFrame()
+        times, frame = series
+        end = self._visible(times, tf)
+        if since is not None:
+            start = int(np.searchsorted(times, _to_ms(since)))
+        else:
+            start = max(0, end - limit)
+        if start >= end:
+            return pd.DataFrame()
+        # Callers add columns to what they get back, so hand out a copy
+        return frame.iloc[start:end].reset_index(drop=True).copy()
+
+    def last_close(self, symbol, timeframe):
+        """Close of the newest bar closed by the clock (None if there is none yet)."""
+        tf = self._tf(timeframe)
+        series = self._series_for(symbol, tf)
+        if series is None:
+            return None
+        times, frame = series
+        end = self._visible(times, tf)
+        return float(frame["Close"].iat[end - 1]) if end else None
+
+    def _visible(self, times, tf):
+        """Number of bars that have closed by clock.time()."""
+        now_ms = int(self.clock.time() * 1000)
+        return int(np.searchsorted(times, now_ms - TF_MS[tf], side="right"))
+
+    def bars_many(self, symbols, timeframe: str = "1h", limit: int = 1000, since=None):
+        return {s: self.bars(s, timeframe, limit, since) for s in symbols}
+
+    def bars_as_completed(self, requests, since=None):
+        for req in requests:
+            yield req, self.bars(*req, since=since)
+
+
+class FakeBroker:
+    """
+    Broker stand-in that fills every order immediately at its limit price
+    (or the last close for market orders) and keeps cash/positions locally.
+    Open positions are marked at the latest `tf` close visible on the clock.
+    """
+
+    def __init__(self, feed, clock, equity=100000.0, tf="5m"):
+        self.feed = feed
+        self.clock = clock
+        self.tf = tf
+        self.cash = float(equity)
+        self.positions = {}  # symbol -> qty (negative = short)
+        self.marks = {}  # symbol -> last fill price
+        self.orders = []
+        self._ids = itertools.count(1)
+
+    def account(self):
+        equity = self.cash + sum(q * self._last_close(s) for s, q in self.positions.items())
+        return SimpleNamespace(equity=equity, cash=self.cash, buying_power=self.cash)
+
+    def get_position_qty(self, symbol):
+        return float(self.positions.get(symbol, 0.0))
+
+    def has_exposure(self, symbol, side=None):
+        qty = self.get_position_qty(symbol)
+        if side is None:
+            return qty != 0
+        return qty > 0 if side == "buy" else qty < 0
+
+    def _last_close(self, symbol):
+        close = self.feed.last_close(symbol, self.tf)
+        return close if close is not None else self.marks.get(symbol, 0.0)
+
+    def place_order(self, symbol, qty, side, type="limit", limit_price=None, time_in_force="day"):
+        logging.info(f"ORDER {side} {qty} {symbol} @ {limit_price} ({type})")
+        price = float(limit_price) if limit_price is not None else self._last_close(symbol)
+        signed = float(qty) if side == "buy" else -float(qty)
+        self.cash -= signed * price
+        self.positions[symbol] = self.positions.get(symbol, 0.0) + signed
+        self.marks[symbol] = price
+        if self.positions[symbol] == 0:
+            del self.positions[symbol]
+        order = SimpleNamespace(
+            id=str(next(self._ids)),
+            symbol=symbol,
+            qty=qty,
+            side=side,
+            type=type,
+            limit_price=limit_price,
+            filled_avg_price=price,
+            status="filled",
+            submitted_at=self.clock.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        self.orders.append(order)
+        return order
+
+    def submit_order_async(self, *args, **kwargs):
+        """Fills inline (replay stays deterministic); returns a finished Future."""
+        fut = Future()
+        try:
+            fut.set_result(self.place_order(*args, **kwargs))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def close_position(self, symbol):
+        qty = self.positions.get(symbol)
+        if not qty:
+            return
+        side = "sell" if qty > 0 else "buy"
+        self.place_order(symbol, abs(qty), side, type="market")
+        logging.info(f"Closed position {symbol}")
+
+
+class ReplayAlerts:
+    """Keeps alerts in memory instead of posting them to Discord."""
+
+    def __init__(self, keep=100):
+        self.sent = 0
+        self.recent = deque(maxlen=keep)
+
+    def send(self, msg: str):
+        self.sent += 1
+        self.recent.append(msg)
+
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--data", default=BAR_CACHE_DIR, help="BarStore directory to replay")
+    ap.add_argument("--start", required=True, help="first simulated scan (UTC)")
+    ap.add_argument("--days", type=float, default=30)
+    ap.add_argument("--tf", default="5m")
+    ap.add_argument("--interval", type=int, default=300, help="simulated seconds between scans")
+    ap.add_argument("--equity", type=float, default=100000.0)
+    ap.add_argument("--trade-log", default=os.path.join("logs", "replay_trades.csv"))
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    global_cfg, rules_cfg, uni_cfg, _ = load_all()
+    global_cfg = with_defaults(global_cfg, SCAN_DEFAULTS)
+
+    start = pd.Timestamp(args.start)
+    clock = SimClock(start, start + pd.Timedelta(days=args.days))
+    feed = ReplayFeed(clock, args.data)
+    broker = FakeBroker(feed, clock, args.equity, args.tf)
+    alerts = ReplayAlerts()
+
+    ctx = run.ScanContext(
+        feed=feed,
+        broker=broker,
+        alerts=alerts,
+        engine=IndicatorEngine(vwap_window=run.SCAN_LIMIT),
+        global_cfg=global_cfg,
+        rules_cfg=rules_cfg,
+        uni_cfg=uni_cfg,
+        tf=args.tf,
+        mode="paper",
+        clock=clock,
+        journal=TradeJournal(args.trade_log),
+    )
+
+    logging.info(f"⏪ Replaying {args.days:g} days of {args.tf} scans from {start}")
+    t0 = time.perf_counter()
+    try:
+        run.live_loop(ctx, args.interval)
+    except ReplayFinished:
+        pass
+    ctx.journal.close()
+    wall = time.perf_counter() - t0
+
+    cycles = clock.ticks
+    logging.info(
+        f"✅ Replay complete | cycles={cycles} | wall={wall:.1f}s | "
+        f"{cycles / wall if wall else 0:.1f} cycles/s | orders={len(broker.orders)} | "
+        f"equity={broker.account().equity:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,222 +1,372 @@
 # === run.py — unified stock + crypto bot ===
-import argparse, logging, time, os, csv
+import argparse, logging, time
 import pandas as pd
+from dataclasses import dataclass, field
 from src.utils import setup_logging, load_env
-from src.config import load_all
+from src.config import load_all, SCAN_DEFAULTS, with_defaults
 from src.alerts import Alerts
 from src.feed import Feed
 from src.broker import Broker
-from src.indicators import add_indicators, last_row
-from src.strategy import (
+from src.live_indicators import IndicatorEngine
+from src.liquidity import LiquidityIndex, LIQ_LIMIT, tf_ms
+from src.metrics import Metrics, METRICS_FILE
+from src.journal import TradeJournal
+from src.strategy_stock import (
     trend_follow,
     breakout_volexp,
     mean_revert_pullback,
     momentum_continuation,
 )
-from src.regime import classify
+from src.regime import RegimeService
 from src.risk import position_size, calc_exits
 
+SCAN_LIMIT = 300  # bars fetched per symbol for the entry scan
+
 
 def parse_args():
     ap = argparse.ArgumentParser()
     ap.add_argument("--tf", default="15m")
     ap.add_argument("--interval", type=int, default=300, help="seconds between scans")
+    ap.add_argument(
+        "--metrics-file",
+        default=METRICS_FILE,
+        help="Prometheus text file rewritten after every cycle ('' = off)",
+    )
+    ap.add_argument(
+        "--metrics-port", type=int, default=0, help="serve /metrics on this local port (0 = off)"
+    )
     return ap.parse_args()
 
 
-def filter_by_dollar_volume(feed, symbols, min_vol, timeframe):
-    """Return only symbols with avg dollar volume above threshold."""
-    active = []
-    for s in symbols:
-        df = feed.bars(s, timeframe=timeframe, limit=60)
-        if df.empty or len(df) < 5:
-            continue
-        df["DollarVol"] = df["Close"] * df["Volume"]
-        avg_vol = df["DollarVol"].tail(30).mean()
-        if avg_vol >= min_vol:
-            active.append(s)
-    return active
+@dataclass
+class ScanContext:
+    """Everything one scan cycle needs, built once in main()."""
 
+    feed: Feed
+    broker: Broker
+    alerts: Alerts
+    engine: IndicatorEngine
+    global_cfg: dict
+    rules_cfg: dict
+    uni_cfg: dict
+    tf: str
+    mode: str
+    clock: object = time  # anything with time()/sleep()/strftime(), e.g. a SimClock
+    journal: TradeJournal = field(default_factory=TradeJournal)
+    liquidity: LiquidityIndex = field(default_factory=LiquidityIndex)
+    regime: RegimeService = field(default_factory=RegimeService)
+    metrics: Metrics = field(default_factory=Metrics)
 
-def main():
-    args = parse_args()
-    setup_logging()
-    env = load_env()
-    global_cfg, rules_cfg, uni_cfg, opt_cfg = load_all()
 
-    alerts = Alerts(env.get("DISCORD_WEBHOOK_URL"))
-    feed = Feed(
-        env["APCA_API_KEY_ID"], env["APCA_API_SECRET_KEY"], env["APCA_API_BASE_URL"]
+def last_bar_close_ms(df, timeframe, now_ms):
+    """Close time (epoch ms) of the newest bar in `df` that had closed by `now_ms`."""
+    step = tf_ms(timeframe)
+    t = pd.Timestamp(df["time"].iloc[-1]).value // 1_000_000
+    return t + step if t + step <= now_ms else t
+
+
+def evaluate_symbol(ctx: ScanContext, symbol, df, is_crypto, regime, equity):
+    """Run the strategy vote on the newest bar. Returns a signal dict or None."""
+    global_cfg, rules_cfg = ctx.global_cfg, ctx.rules_cfg
+    if df.empty or len(df) < 60:
+        return None
+
+    # Only bars closed since the last cycle are folded into the state
+    with ctx.metrics.time("scan_stage_seconds", stage="indicators"):
+        r = ctx.engine.update(symbol, df)
+    if not r:
+        return None
+
+    with ctx.metrics.time("scan_stage_seconds", stage="votes"):
+        votes, reasons = 0, []
+        v1 = trend_follow(r, rules_cfg["trend_follow"])
+        votes += v1.score
+        reasons.append(v1.reason)
+        v2 = breakout_volexp(r, rules_cfg["breakout_volexp"])
+        votes += v2.score
+        reasons.append(v2.reason)
+        v3 = mean_revert_pullback(r, rules_cfg["mean_revert_pullback"], regime)
+        votes += v3.score
+        reasons.append(v3.reason)
+        v4 = momentum_continuation(r, rules_cfg["momentum_continuation"])
+        votes += v4.score
+        reasons.append(v4.reason)
+
+    if abs(votes) < global_cfg["strategy_trigger"]:
+        return None
+
+    side = "buy" if votes > 0 else "sell"
+    atr, price = r["ATR"], r["Close"]
+
+    # === Risk block ===
+    risk_block = (
+        global_cfg["risk"]["crypto"] if is_crypto else global_cfg["risk"]["stock"]
     )
-    broker = Broker(
-        env["APCA_API_KEY_ID"],
-        env["APCA_API_SECRET_KEY"],
-        env["APCA_API_BASE_URL"],
-        env["MODE"],
+    stop, tp, trail = calc_exits(
+        price,
+        atr,
+        risk_block["stop_atr_mult"],
+        risk_block["tp_atr_mult"],
+        risk_block["trail_atr_mult"],
+        +1 if votes > 0 else -1,
+    )
+
+    shares = position_size(
+        equity,
+        atr,
+        risk_block["stop_atr_mult"],
+        global_cfg["risk"]["risk_per_trade_pct"],
+        price,
+        1.0,
     )
+    if shares <= 0:
+        return None
+
+    bps = global_cfg["exec"]["limit_slip_bps"]
+    limit_px = price * (1 - bps / 10000) if side == "buy" else price * (1 + bps / 10000)
+
+    return {
+        "symbol": symbol,
+        "is_crypto": is_crypto,
+        "side": side,
+        "shares": shares,
+        "price": price,
+        "limit_px": limit_px,
+        "stop": stop,
+        "tp": tp,
+        "votes": votes,
+        "reasons": reasons,
+        "bar_close_ms": last_bar_close_ms(df, ctx.tf, ctx.clock.time() * 1000),
+    }
+
+
+def execute_signal(ctx: ScanContext, sig):
+    """
+    Submit the order (paper mode), alert Discord and log the trade. The order
+    goes out on the broker's pool; returns its Future (None when alert-only).
+    """
+    symbol, side, shares = sig["symbol"], sig["side"], sig["shares"]
+    limit_px, is_crypto = sig["limit_px"], sig["is_crypto"]
+
+    # === Execute or alert only ===
+    order = None
+    if ctx.mode.lower() == "paper":
+        with ctx.metrics.time("scan_stage_seconds", stage="submit"):
+            order = ctx.broker.submit_order_async(
+                symbol,
+                shares,
+                side,
+                type=ctx.global_cfg["exec"]["order_type"],
+                limit_price=round(limit_px, 2),
+            )
+        order.add_done_callback(lambda fut: order_done(ctx, sig, fut))
+
+    # === Discord alert ===
+    emoji = "🪙" if is_crypto else "📈"
+    with ctx.metrics.time("scan_stage_seconds", stage="alerts"):
+        ctx.alerts.send(
+            f"{emoji} {symbol} {side.upper()} {shares} @~{round(limit_px,2)} | "
+            f"votes={sig['votes']} reasons={','.join(sig['reasons'])} "
+            f"stop={round(sig['stop'],2)} tp={round(sig['tp'],2)}"
+        )
+
+    # === Log trade (buffered; flushed once per cycle) ===
+    with ctx.metrics.time("scan_stage_seconds", stage="journal"):
+        ctx.journal.append(
+            [
+                ctx.clock.strftime("%Y-%m-%d %H:%M:%S"),
+                symbol,
+                "CRYPTO" if is_crypto else "STOCK",
+                side,
+                shares,
+                round(sig["price"], 2),
+                round(sig["stop"], 2),
+                round(sig["tp"], 2),
+                sig["votes"],
+                ",".join(sig["reasons"]),
+            ]
+        )
+    return order
+
+
+def order_done(ctx: ScanContext, sig, fut):
+    """Order future callback: count the result and time bar close -> order accepted."""
+    kind = "crypto" if sig["is_crypto"] else "stock"
+    if fut.exception() is not None:
+        ctx.metrics.inc("orders_total", result="failed", kind=kind)
+        return
+    ctx.metrics.inc("orders_total", result="ok", kind=kind)
+    latency = ctx.clock.time() - sig["bar_close_ms"] / 1000
+    ctx.metrics.observe("bar_close_to_submit_seconds", max(latency, 0.0), kind=kind)
+
+
+def await_orders(ctx: ScanContext, orders):
+    """Wait for this cycle's submissions; a rejected order is logged, not raised."""
+    for symbol, fut in orders:
+        try:
+            fut.result()
+        except Exception as e:
+            ctx.metrics.inc("errors_total", stage="order")
+            logging.error(f"Order error {symbol}: {e}")
+            ctx.alerts.send(f"❌ Order failed {symbol}: {e}")
 
-    tf = args.tf
+
+def scan_cycle(ctx: ScanContext):
+    """
+    One full scan. SPY/VIX (when the regime's TTL has lapsed) and any
+    liquidity series with a newly closed bar are fetched as a single
+    concurrent batch, then every active symbol's entry bars are fetched
+    concurrently and evaluated as soon as each one arrives. Orders are
+    submitted concurrently as signals appear and awaited at the end.
+    """
+    feed, uni_cfg, liquidity, metrics = ctx.feed, ctx.uni_cfg, ctx.liquidity, ctx.metrics
     stocks = uni_cfg["universe"]["stocks"]
     crypto = uni_cfg["universe"]["crypto"]
     keep_top = uni_cfg["rotation"]["keep_top"]
-    min_dollar_vol_stock = uni_cfg["rotation"]["min_dollar_vol_stock"]
-    min_dollar_vol_crypto = uni_cfg["rotation"]["min_dollar_vol_crypto"]
+    liq_tf = {**{s: "1D" for s in stocks}, **{c: "1h" for c in crypto}}
+    now_ms = int(ctx.clock.time() * 1000)
 
-    while True:
-        try:
-            # === Regime detection for stocks ===
-            spy = feed.bars("SPY", timeframe="1D", limit=300)
-            vix = feed.bars("VIX", timeframe="1D", limit=300)
-            if not spy.empty and not vix.empty:
-                regime = classify(
-                    add_indicators(spy).iloc[-1],
-                    add_indicators(vix).iloc[-1],
-                    global_cfg["regime"]["bull_vix_lt"],
-                    global_cfg["regime"]["bear_vix_gt"],
-                )
-            else:
-                logging.warning("SPY/VIX missing — skipping regime check")
-                regime = 0
+    # === Stale regime + liquidity inputs (one concurrent batch) ===
+    regime_due = ctx.regime.due(now_ms)
+    requests = [("SPY", "1D", 300), ("VIX", "1D", 300)] if regime_due else []
+    requests += [
+        (s, tf, LIQ_LIMIT) for s, tf in liq_tf.items() if liquidity.due(s, tf, now_ms)
+    ]
+    stale = len(requests) - (2 if regime_due else 0)
+    metrics.inc("cache_misses_total", stale, cache="liquidity")
+    metrics.inc("cache_hits_total", len(liq_tf) - stale, cache="liquidity")
+    metrics.inc("cache_misses_total" if regime_due else "cache_hits_total", cache="regime")
+    metrics.inc("fetches_total", len(requests), kind="inputs")
 
-            acct = broker.account()
-            equity = float(acct.equity)
+    frames = {}
+    with metrics.time("scan_stage_seconds", stage="fetch_inputs"):
+        for (symbol, tf, _), df in feed.bars_as_completed(requests):
+            if symbol in liq_tf:
+                liquidity.update(symbol, tf, df, now_ms)
+            else:
+                frames[symbol] = df
 
-            # === Liquidity rotation ===
-            active_stocks = filter_by_dollar_volume(
-                feed, stocks, min_dollar_vol_stock, "1D"
-            )
-            active_crypto = filter_by_dollar_volume(
-                feed, crypto, min_dollar_vol_crypto, "1h"
+    if regime_due:
+        with metrics.time("scan_stage_seconds", stage="regime"):
+            ctx.regime.update(
+                frames.get("SPY"),
+                frames.get("VIX"),
+                now_ms,
+                ctx.global_cfg["regime"]["bull_vix_lt"],
+                ctx.global_cfg["regime"]["bear_vix_gt"],
             )
+    regime = ctx.regime.regime
 
-            active_stocks = active_stocks[:keep_top]
-            active_crypto = active_crypto[:keep_top]
-
-            # === Combined scan ===
-            for symbol in active_stocks + active_crypto:
-                is_crypto = symbol in active_crypto
-                df = feed.bars(symbol, timeframe=tf, limit=300)
-                if df.empty or len(df) < 60:
-                    continue
-
-                feats = add_indicators(df)
-                if feats.empty:
-                    continue
-                r = last_row(feats)
-
-                votes, reasons = 0, []
-                v1 = trend_follow(r, rules_cfg["trend_follow"])
-                votes += v1.score
-                reasons.append(v1.reason)
-                v2 = breakout_volexp(r, rules_cfg["breakout_volexp"])
-                votes += v2.score
-                reasons.append(v2.reason)
-                v3 = mean_revert_pullback(r, rules_cfg["mean_revert_pullback"], regime)
-                votes += v3.score
-                reasons.append(v3.reason)
-                v4 = momentum_continuation(r, rules_cfg["momentum_continuation"])
-                votes += v4.score
-                reasons.append(v4.reason)
-
-                if abs(votes) < global_cfg["strategy_trigger"]:
-                    continue
-
-                side = "buy" if votes > 0 else "sell"
-                atr, price = r["ATR"], r["Close"]
-
-                # === Risk block ===
-                risk_block = (
-                    global_cfg["risk"]["crypto"]
-                    if is_crypto
-                    else global_cfg["risk"]["stock"]
-                )
-                stop, tp, trail = calc_exits(
-                    price,
-                    atr,
-                    risk_block["stop_atr_mult"],
-                    risk_block["tp_atr_mult"],
-                    risk_block["trail_atr_mult"],
-                    +1 if votes > 0 else -1,
-                )
+    with metrics.time("scan_stage_seconds", stage="account"):
+        acct = ctx.broker.account()
+    equity = float(acct.equity)
 
-                shares = position_size(
-                    equity,
-                    atr,
-                    risk_block["stop_atr_mult"],
-                    global_cfg["risk"]["risk_per_trade_pct"],
-                    price,
-                    1.0,
-                )
-                if shares <= 0:
-                    continue
-
-                bps = global_cfg["exec"]["limit_slip_bps"]
-                limit_px = (
-                    price * (1 - bps / 10000)
-                    if side == "buy"
-                    else price * (1 + bps / 10000)
-                )
+    # === Liquidity rotation (ranked from the in-memory index) ===
+    with metrics.time("scan_stage_seconds", stage="rotation"):
+        active_stocks = liquidity.top(
+            stocks, uni_cfg["rotation"]["min_dollar_vol_stock"], keep_top
+        )
+        active_crypto = liquidity.top(
+            crypto, uni_cfg["rotation"]["min_dollar_vol_crypto"], keep_top
+        )
+    metrics.set("active_symbols", len(active_stocks), kind="stock")
+    metrics.set("active_symbols", len(active_crypto), kind="crypto")
 
-                # === Execute or alert only ===
-                if env["MODE"].lower() == "paper":
-                    broker.place_order(
-                        symbol,
-                        shares,
-                        side,
-                        type=global_cfg["exec"]["order_type"],
-                        limit_price=round(limit_px, 2),
-                    )
-
-                # === Discord alert ===
-                emoji = "🪙" if is_crypto else "📈"
-                alerts.send(
-                    f"{emoji} {symbol} {side.upper()} {shares} @~{round(limit_px,2)} | "
-                    f"votes={votes} reasons={','.join(reasons)} stop={round(stop,2)} tp={round(tp,2)}"
+    # === Combined scan: evaluate each symbol as its bars land ===
+    scan = [(s, ctx.tf, SCAN_LIMIT) for s in active_stocks + active_crypto]
+    metrics.inc("fetches_total", len(scan), kind="entry")
+    orders = []
+    with metrics.time("scan_stage_seconds", stage="scan"):
+        t0 = time.perf_counter()
+        for (symbol, _, _), df in feed.bars_as_completed(scan):
+            metrics.observe("symbol_fetch_seconds", time.perf_counter() - t0, symbol=symbol)
+            with metrics.time("symbol_eval_seconds", symbol=symbol):
+                sig = evaluate_symbol(
+                    ctx, symbol, df, symbol in active_crypto, regime, equity
                 )
+            if not sig:
+                continue
+            kind = "crypto" if sig["is_crypto"] else "stock"
+            metrics.inc("signals_total", kind=kind, side=sig["side"])
+            # Already holding (or working an order for) this side: don't re-order
+            if ctx.broker.has_exposure(symbol, sig["side"]):
+                metrics.inc("skipped_signals_total", kind=kind)
+                logging.info(f"⏭️ {symbol} {sig['side']} skipped — position/order already open")
+                continue
+            order = execute_signal(ctx, sig)
+            if order is not None:
+                orders.append((symbol, order))
+    with metrics.time("scan_stage_seconds", stage="orders"):
+        await_orders(ctx, orders)
+
+    # Bar cache counters are cumulative on the feed; mirror them
+    for name, attr in (("cache_hits_total", "cache_hits"), ("cache_misses_total", "cache_misses")):
+        metrics.set(name, getattr(feed, attr, 0), cache="bars")
+
 
-                # === Log trade ===
-                os.makedirs("logs", exist_ok=True)
-                log_file = "logs/trades.csv"
-                write_header = not os.path.exists(log_file)
-                with open(log_file, "a", newline="") as f:
-                    writer = csv.writer(f)
-                    if write_header:
-                        writer.writerow(
-                            [
-                                "time",
-                                "symbol",
-                                "type",
-                                "side",
-                                "shares",
-                                "price",
-                                "stop",
-                                "tp",
-                                "votes",
-                                "reasons",
-                            ]
-                        )
-                    writer.writerow(
-                        [
-                            time.strftime("%Y-%m-%d %H:%M:%S"),
-                            symbol,
-                            "CRYPTO" if is_crypto else "STOCK",
-                            side,
-                            shares,
-                            round(price, 2),
-                            round(stop, 2),
-                            round(tp, 2),
-                            votes,
-                            ",".join(reasons),
-                        ]
-                    )
-
-            alerts.send("✅ Heartbeat OK")
+def live_loop(ctx: ScanContext, interval):
+    """Scan, heartbeat, sleep — forever (or until ctx.clock.sleep raises)."""
+    while True:
+        t0 = time.perf_counter()
+        try:
+            scan_cycle(ctx)
+            ctx.alerts.send("✅ Heartbeat OK")
 
         except Exception as e:
+            ctx.metrics.inc("errors_total", stage="cycle")
             logging.exception(e)
-            alerts.send(f"❌ Bot error: {e}")
+            ctx.alerts.send(f"❌ Bot error: {e}")
+
+        elapsed = time.perf_counter() - t0
+        ctx.metrics.observe("scan_cycle_seconds", elapsed)
+        if elapsed > interval:
+            ctx.metrics.inc("scan_overruns_total")
+            logging.warning(f"⏱️ Scan took {elapsed:.1f}s — longer than the {interval}s interval")
+        ctx.metrics.set("last_cycle_timestamp_seconds", round(ctx.clock.time(), 3))
+
+        ctx.journal.flush()
+        ctx.metrics.export()
+        ctx.clock.sleep(interval)
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    env = load_env()
+    global_cfg, rules_cfg, uni_cfg, opt_cfg = load_all()
+    # Same fallbacks as replay/bench, so live runs the config they test
+    global_cfg = with_defaults(global_cfg, SCAN_DEFAULTS)
+
+    alerts = Alerts(env.get("DISCORD_WEBHOOK_URL"))
+    feed = Feed(
+        env["APCA_API_KEY_ID"], env["APCA_API_SECRET_KEY"], env["APCA_API_BASE_URL"]
+    )
+    broker = Broker(
+        env["APCA_API_KEY_ID"],
+        env["APCA_API_SECRET_KEY"],
+        env["APCA_API_BASE_URL"],
+        env["MODE"],
+    )
+
+    metrics = Metrics(args.metrics_file or None)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    ctx = ScanContext(
+        feed=feed,
+        broker=broker,
+        alerts=alerts,
+        # Indicator state persists across cycles; VWAP spans the same window we fetch
+        engine=IndicatorEngine(vwap_window=SCAN_LIMIT),
+        global_cfg=global_cfg,
+        rules_cfg=rules_cfg,
+        uni_cfg=uni_cfg,
+        tf=args.tf,
+        mode=env["MODE"],
+        metrics=metrics,
+    )
 
-        time.sleep(args.interval)
+    live_loop(ctx, args.interval)
 
 
 if __name__ == "__main__":
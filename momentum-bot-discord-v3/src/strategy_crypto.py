@@ -1,7 +1,9 @@
 # === src/strategy_crypto.py (PURE MEAN REVERSION SCALPER LOGIC) ===
 from dataclasses import dataclass
 import math
+import numpy as np
 import pandas as pd
+from src.indicators import requires
 
 
 @dataclass
@@ -11,9 +13,19 @@ class Vote:
     confidence: float = 1.0
 
 
+@dataclass
+class VoteArray:
+    """Whole-series counterpart of Vote: one element per feature row."""
+
+    score: np.ndarray
+    reason: np.ndarray
+    confidence: np.ndarray
+
+
 # --- UTILITY/FILTER FUNCTIONS (Copied for dependency) ---
 
 
+@requires("ATR")
 def volatility_ok(r, params):
     """Checks for minimum volatility (ATR/Close) to ensure market is tradable."""
     ratio = r["ATR"] / r["Close"]
@@ -21,6 +33,7 @@ def volatility_ok(r, params):
     return ratio > min_ratio
 
 
+@requires("VolMA20")
 def volume_ok(r, params):
     """Checks for volume spike relative to 20-bar average."""
     vol_mult_min = params.get("vol_mult_min", 1.5)
@@ -28,6 +41,7 @@ def volume_ok(r, params):
     return vol_ratio >= vol_mult_min
 
 
+@requires("ADX")
 def adx_strength(r, params):
     """Confidence filter: High confidence when ADX is LOW (raging market)."""
     adx_min = params.get("adx_min", 15)
@@ -43,6 +57,7 @@ def adx_strength(r, params):
 # ==================================
 
 
+@requires("RSI", "RSI_PREV", "BB_UPPER", "BB_LOWER", "PRICE_Z_SCORE", "ADX", "VolMA20")
 def check_mr_setup(r, params, trend_dir):
     """
     Checks for the overextended conditions required for a Mean Reversion setup.
@@ -108,16 +123,76 @@ def check_mr_setup(r, params, trend_dir):
     return Vote(0, reason, 0.0)
 
 
+@requires("RSI", "RSI_PREV", "BB_UPPER", "BB_LOWER", "PRICE_Z_SCORE", "ADX", "VolMA20")
+def check_mr_setup_vec(feats: pd.DataFrame, params, trend_dir=None):
+    """
+    Vectorized check_mr_setup over a whole feature frame. Evaluates the same
+    conditions as whole-column boolean/score arrays, so element i is exactly
+    the Vote that check_mr_setup(feats.iloc[i], ...) would return.
+    """
+    rsi_os = params.get("rsi_oversold", 25)
+    rsi_ob = params.get("rsi_overbought", 75)
+    vol_mult_min = params.get("vol_mult_min", 1.5)
+    adx_min = params.get("adx_min", 15)
+    adx_max = params.get("adx_max", 30)
+
+    col = lambda name: feats[name].to_numpy(dtype="float64")
+    close, low, high = col("Close"), col("Low"), col("High")
+    rsi, adx, z = col("RSI"), col("ADX"), col("PRICE_Z_SCORE")
+
+    volume_surge = col("Volume") / np.maximum(col("VolMA20"), 1) >= vol_mult_min
+
+    bullish_setup = (rsi < rsi_os) & (close < col("BB_LOWER")) & (z < -1.8) & (adx < 30)
+    bearish_setup = (rsi > rsi_ob) & (close > col("BB_UPPER")) & (z > 1.8) & (adx < 30)
+    bearish_setup &= ~bullish_setup  # elif: bullish wins when both fire
+
+    # Missing *_PREV columns fall back to the current bar, as r.get() does
+    prev = lambda name, cur: col(name) if name in feats else cur
+    rsi_prev = prev("RSI_PREV", rsi)
+    bullish_div = (low < prev("Low_PREV", low)) & (rsi > rsi_prev)
+    bearish_div = (high > prev("High_PREV", high)) & (rsi < rsi_prev)
+
+    mag = 3 + volume_surge.astype(int)
+    score = np.where(
+        bullish_setup,
+        mag + bullish_div,
+        np.where(bearish_setup, -(mag + bearish_div), 0),
+    )
+
+    # adx_min == adx_max divides by zero exactly like the scalar path (+/-inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = np.minimum(np.maximum((adx_max - adx) / (adx_max - adx_min), 0), 1)
+    confidence = strength * np.abs(score) / 5.0
+
+    fire = np.abs(score) >= 4
+    reason = np.full(len(feats), "SCALPER_NONE", dtype=object)
+    reason[bullish_setup] = "MR_LONG_SETUP"
+    reason[bearish_setup] = "MR_SHORT_SETUP"
+    return VoteArray(
+        score=np.where(fire, np.sign(score), 0).astype("float64"),
+        reason=reason,
+        confidence=np.where(fire, confidence, 0.0),
+    )
+
+
 # 🚨 Strategy functions must match the expected imports in backtest_multi.py 🚨
 
 
 # Pure Mean Reversion Logic is consolidated into check_mr_setup
+@requires("RSI", "RSI_PREV", "BB_UPPER", "BB_LOWER", "PRICE_Z_SCORE", "ADX", "VolMA20")
 def crypto_pullback_mr(r, params, trend_dir):
     """MTFA entry point for Mean Reversion Scalper."""
     return check_mr_setup(r, params, trend_dir)
 
 
+@requires("RSI", "RSI_PREV", "BB_UPPER", "BB_LOWER", "PRICE_Z_SCORE", "ADX", "VolMA20")
+def crypto_pullback_mr_vec(feats, params, trend_dir=None):
+    """Whole-series entry point for the Mean Reversion Scalper (backtests)."""
+    return check_mr_setup_vec(feats, params, trend_dir)
+
+
 # The crypto_momentum_trend function is unused but must exist for compliance
+@requires()
 def crypto_momentum_trend(r, params):
     """Disabled: We are focusing only on Mean Reversion."""
     return Vote(0, "SCALPER_MOMO_DISC", 0.0)
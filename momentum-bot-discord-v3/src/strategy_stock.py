@@ -1,7 +1,9 @@
 # === src/strategy_stock.py (MEAN REVERSION SCALPER - Simplified Compliance) ===
 from dataclasses import dataclass
 import math
+import numpy as np
 import pandas as pd
+from src.indicators import requires
 
 
 @dataclass
@@ -11,20 +13,32 @@ class Vote:
     confidence: float = 1.0
 
 
+@dataclass
+class VoteArray:
+    """Whole-series counterpart of Vote: one element per feature row."""
+
+    score: np.ndarray
+    reason: np.ndarray
+    confidence: np.ndarray
+
+
 # --- UTILITY/FILTER FUNCTIONS (REQUIRED FOR SCALPING LOGIC) ---
 # NOTE: These functions must be IDENTICAL to those in strategy_crypto.py
+@requires("ATR")
 def volatility_ok(r, params):
     ratio = r["ATR"] / r["Close"]
     min_ratio = params.get("atr_min_ratio", 0.003)
     return ratio > min_ratio
 
 
+@requires("VolMA20")
 def volume_ok(r, params):
     vol_mult_min = params.get("vol_mult_min", 1.5)
     vol_ratio = r["Volume"] / max(r["VolMA20"], 1)
     return vol_ratio >= vol_mult_min
 
 
+@requires("ADX")
 def adx_strength(r, params):
     adx_min = params.get("adx_min", 15)
     adx_max = params.get("adx_max", 30)
@@ -34,6 +48,7 @@ def adx_strength(r, params):
 
 
 # --- SCALPING LOGIC (Matches Crypto Logic Structure) ---
+@requires("RSI", "RSI_PREV", "ADX")
 def check_mr_setup(r, params, trend_dir):
     """
     Checks for the overextended conditions required for a Mean Reversion setup.
@@ -60,23 +75,61 @@ def check_mr_setup(r, params, trend_dir):
     return Vote(0, reason, 0.0)
 
 
+@requires("RSI", "RSI_PREV", "ADX")
+def check_mr_setup_vec(feats, params, trend_dir=None):
+    """check_mr_setup over every row of a feature frame at once."""
+    rsi_os = params.get("rsi_oversold", 25)
+    rsi_ob = params.get("rsi_overbought", 75)
+    adx_min = params.get("adx_min", 15)
+    adx_max = params.get("adx_max", 30)
+
+    rsi = feats["RSI"].to_numpy()
+    rsi_prev = feats["RSI_PREV"].to_numpy()
+    bull = (rsi < rsi_os) & (rsi_prev >= rsi_os)
+    bear = ~bull & (rsi > rsi_ob) & (rsi_prev <= rsi_ob)
+    fire = bull | bear
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strength = np.clip(
+            (adx_max - feats["ADX"].to_numpy()) / (adx_max - adx_min), 0, 1
+        )
+
+    reason = np.full(len(feats), "SCALPER_NONE", dtype=object)
+    reason[fire] = "MR_STOCK_ENTRY"
+    return VoteArray(
+        score=np.where(bull, 1.0, np.where(bear, -1.0, 0.0)),
+        reason=reason,
+        confidence=np.where(fire, strength * 4 / 5.0, 0.0),
+    )
+
+
 # === EXPORTED FUNCTIONS (Must match backtest_multi.py imports) ===
 
 
 # The core strategy function for stocks is replaced with the MR scalper logic:
+@requires("RSI", "RSI_PREV", "ADX")
 def mean_revert_pullback(r, params, trend_dir):
     """Stock MTFA entry point for Mean Reversion Scalper."""
     return check_mr_setup(r, params, trend_dir)
 
 
+@requires("RSI", "RSI_PREV", "ADX")
+def mean_revert_pullback_vec(feats, params, trend_dir=None):
+    """Whole-series mean_revert_pullback for vectorized backtests."""
+    return check_mr_setup_vec(feats, params, trend_dir)
+
+
 # Other stock functions are disabled but must exist for compliance:
+@requires()
 def trend_follow(r, params):
     return Vote(0, "STOCK_DISC_TREND", 0.0)
 
 
+@requires()
 def breakout_volexp(r, params):
     return Vote(0, "STOCK_DISC_BREAK", 0.0)
 
 
+@requires()
 def momentum_continuation(r, params):
     return Vote(0, "STOCK_DISC_MOMO", 0.0)
@@ -0,0 +1,289 @@
+# === src/walkforward.py (Walk-Forward Optimization) ===
+import argparse, datetime as dt, logging, os, traceback
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.utils import setup_logging, load_env
+from src.config import load_all
+from src.feed import Feed
+from src.backtest_multi import simulate, feature_columns, TradeLog
+from src.optimizer import (
+    GRID_KEYS,
+    INITIAL_EQUITY,
+    IndicatorMemo,
+    apply_point,
+    evaluate_point,
+    optimize_symbol,
+)
+
+# Periods must stay whole numbers after the change cap is applied
+INT_PARAMS = {"rsi_period", "ema_short", "ema_long"}
+
+
+def build_windows(times, opt_window_days, rebalance_days, oos_check_days):
+    """
+    Rolling in-sample / out-of-sample windows over a sorted datetime64 array.
+    Each in-sample window spans opt_window_days and is followed by a
+    rebalance_days out-of-sample segment; windows advance by rebalance_days.
+    The last oos_check_days of each in-sample window form its check span.
+    """
+    opt_w = np.timedelta64(opt_window_days, "D")
+    step = np.timedelta64(rebalance_days, "D")
+    check = np.timedelta64(oos_check_days, "D")
+
+    windows = []
+    is_start = times[0]
+    while is_start + opt_w <= times[-1]:
+        oos_start = is_start + opt_w
+        oos_end = oos_start + step
+        a, b, c, chk = np.searchsorted(
+            times, [is_start, oos_start, oos_end, oos_start - check]
+        )
+        if c > b:
+            windows.append(
+                {
+                    "window": len(windows),
+                    "is_rows": slice(a, b),
+                    "check_rows": slice(chk, b),
+                    "oos_rows": slice(b, c),
+                    "is_start": pd.Timestamp(is_start),
+                    "oos_start": pd.Timestamp(oos_start),
+                    "oos_end": pd.Timestamp(times[c - 1]),
+                }
+            )
+        is_start = is_start + step
+    return windows
+
+
+def cap_params(target, prev, cap_pct):
+    """
+    Move from `prev` toward `target`, with every parameter limited to a
+    cap_pct% change. Integer periods are rounded inside the cap.
+    """
+    if prev is None:
+        return dict(target)
+    capped = {}
+    for k in GRID_KEYS:
+        lo, hi = prev[k] * (1 - cap_pct / 100), prev[k] * (1 + cap_pct / 100)
+        v = min(max(target[k], lo), hi)
+        if k in INT_PARAMS:
+            v = int(np.clip(round(v), np.ceil(lo), np.floor(hi)))
+        capped[k] = v
+    if capped["ema_short"] >= capped["ema_long"]:
+        capped["ema_short"], capped["ema_long"] = prev["ema_short"], prev["ema_long"]
+    return capped
+
+
+# -------------------- Parallel in-sample optimization --------------------
+
+_MEMO = None
+
+
+def _init_worker(memo):
+    global _MEMO
+    _MEMO = memo
+
+
+def _optimize_window(window, symbol, opt_cfg, global_cfg, rules_cfg, trigger):
+    """Rank the whole grid on one in-sample window (runs in a worker)."""
+    try:
+        table = optimize_symbol(
+            _MEMO.df,
+            symbol,
+            opt_cfg,
+            global_cfg,
+            rules_cfg,
+            trigger,
+            memo=_MEMO,
+            rows=window["is_rows"],
+        )
+        return window["window"], table, None
+    except Exception:
+        return window["window"], pd.DataFrame(), traceback.format_exc()
+
+
+def rank_windows(memo, windows, symbol, opt_cfg, global_cfg, rules_cfg, trigger, workers=1):
+    """
+    {window_index: ranked grid table}. Windows are independent, so they run
+    across a process pool; every worker receives the bars and the precomputed
+    indicator series once and slices them per window.
+    """
+    args = (symbol, opt_cfg, global_cfg, rules_cfg, trigger)
+    tables = {}
+    if workers <= 1:
+        _init_worker(memo)
+        outcomes = (_optimize_window(w, *args) for w in windows)
+        for idx, table, err in outcomes:
+            tables[idx] = (table, err)
+        return tables
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(memo,)
+    ) as pool:
+        futures = {pool.submit(_optimize_window, w, *args): w["window"] for w in windows}
+        for fut in as_completed(futures):
+            try:
+                idx, table, err = fut.result()
+            except Exception:
+                # A dead worker (BrokenProcessPool, OOM kill) skips its window
+                idx, table, err = futures[fut], pd.DataFrame(), traceback.format_exc()
+            tables[idx] = (table, err)
+    return tables
+
+
+# -------------------- Sequential stitching --------------------
+
+
+def walk_forward(df, symbol, opt_cfg, global_cfg, rules_cfg, trigger=1, mode="crypto", workers=1):
+    """
+    Run the walk-forward for one symbol. Returns (params_table, oos_trades)
+    with the OOS trades as one TradeLog.
+
+    In-sample windows are optimized in parallel. The chosen parameters then
+    advance window by window: the in-sample winner is capped to
+    param_change_cap_pct of the previous parameters, kept only if it beats the
+    incumbent over the check span, and traded on the out-of-sample segment.
+    Out-of-sample equity carries over, giving one stitched curve.
+    """
+    memo = IndicatorMemo(df, feature_columns(mode)).warm(opt_cfg["grids"])
+    times = df["time"].to_numpy()
+    windows = build_windows(
+        times,
+        opt_cfg["opt_window_days"],
+        opt_cfg["rebalance_days"],
+        opt_cfg["oos_check_days"],
+    )
+    if not windows:
+        logging.warning(f"Not enough history for a walk-forward on {symbol}")
+        return pd.DataFrame(), TradeLog()
+
+    tables = rank_windows(
+        memo, windows, symbol, opt_cfg, global_cfg, rules_cfg, trigger, workers
+    )
+
+    objective = opt_cfg.get("objective", "netprofit_over_dd")
+    cap_pct = opt_cfg.get("param_change_cap_pct", 100)
+    score_on = lambda params, rows: evaluate_point(
+        memo.frame(params["rsi_period"], params["ema_short"], params["ema_long"], rows),
+        symbol,
+        params,
+        global_cfg,
+        rules_cfg,
+        trigger,
+        mode,
+        objective,
+    )["objective"]
+
+    equity = INITIAL_EQUITY
+    params, rows, trades = None, [], []
+    for w in windows:
+        table, err = tables[w["window"]]
+        if err or table.empty:
+            logging.warning(f"⚠️ {symbol} window {w['window']} not optimized: {err}")
+        else:
+            best = {k: table.iloc[0][k].item() for k in GRID_KEYS}
+            candidate = cap_params(best, params, cap_pct)
+            if params is None or score_on(candidate, w["check_rows"]) >= score_on(
+                params, w["check_rows"]
+            ):
+                params = candidate
+        if params is None:
+            continue
+
+        feats = memo.frame(
+            params["rsi_period"], params["ema_short"], params["ema_long"], w["oos_rows"]
+        )
+        oos, _, _ = simulate(
+            feats,
+            symbol,
+            global_cfg,
+            apply_point(rules_cfg, params),
+            trigger,
+            mode,
+            initial_equity=equity,
+            warmup=0,
+        )
+        start_equity = equity
+        if len(oos):
+            equity = float(oos["equity"][-1])
+        trades.append(oos)
+        rows.append(
+            {
+                "symbol": symbol,
+                "window": w["window"],
+                "is_start": w["is_start"],
+                "oos_start": w["oos_start"],
+                "oos_end": w["oos_end"],
+                **params,
+                "oos_trades": len(oos),
+                "oos_pnl": equity - start_equity,
+                "equity": equity,
+            }
+        )
+    return pd.DataFrame(rows), TradeLog.concat(trades)
+
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tf", default="5m", help="Low Timeframe (LTF) for entry")
+    ap.add_argument("--years", type=int, default=2)
+    ap.add_argument("--symbols", nargs="*", help="Defaults to the crypto universe")
+    ap.add_argument("--trigger", type=float, default=1.0)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    return ap.parse_args()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+    env = load_env()
+    global_cfg, rules_cfg, uni_cfg, opt_cfg = load_all()
+
+    feed = Feed(
+        env["APCA_API_KEY_ID"],
+        env["APCA_API_SECRET_KEY"],
+        env["APCA_API_BASE_URL"],
+    )
+
+    end_date = dt.datetime.now()
+    start_date = end_date - dt.timedelta(days=365 * args.years)
+    symbols = args.symbols or uni_cfg["universe"]["crypto"]
+
+    # Bars are fetched once per symbol and shared by every window
+    frames = feed.bars_many(symbols, args.tf, since=start_date)
+
+    all_params, all_trades = [], []
+    for symbol in symbols:
+        df = frames.get(symbol)
+        if df is None or len(df) < 60:
+            logging.warning(f"No data for {symbol}")
+            continue
+        df = df[df["time"] >= start_date].reset_index(drop=True)
+        logging.info(f"Walk-forward {symbol} ({len(df)} bars) ...")
+        params, trades = walk_forward(
+            df, symbol, opt_cfg, global_cfg, rules_cfg, args.trigger, workers=args.workers
+        )
+        if not params.empty:
+            all_params.append(params)
+            all_trades.append(trades)
+            logging.info(
+                f"{symbol} done | windows={len(params)} | OOS trades={len(trades)} "
+                f"| final equity={params['equity'].iloc[-1]:.2f}"
+            )
+
+    os.makedirs("logs", exist_ok=True)
+    if all_params:
+        pd.concat(all_params, ignore_index=True).to_csv(
+            "logs/walkforward_params.csv", index=False
+        )
+    TradeLog.concat(all_trades).to_frame().to_csv(
+        "logs/walkforward_trades.csv", index=False
+    )
+    logging.info(
+        "✅ Walk-forward complete | saved to logs/walkforward_params.csv, "
+        "logs/walkforward_trades.csv"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,274 @@
-import subprocess
+# === src/yfeed.py (Persistent Yahoo Finance Worker) ===
+import atexit
+import datetime as dt
 import json
-import sys
+import logging
 import os
+import struct
+import subprocess
+import sys
+import threading
+import numpy as np
 import pandas as pd
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wire format of one frame: each column sent as its own contiguous buffer
+COLUMNS = [
+    ("time", "<i8"),  # epoch ms (UTC)
+    ("Open", "<f8"),
+    ("High", "<f8"),
+    ("Low", "<f8"),
+    ("Close", "<f8"),
+    ("Volume", "<f8"),
+]
+_LEN = struct.Struct("<Q")
+
+
+def empty_frame():
+    return pd.DataFrame(columns=[name for name, _ in COLUMNS])
+
+
+def yahoo_python():
+    """
+    Interpreter for the worker: $YAHOO_PYTHON, else the isolated .yahoo_env
+    (Windows or POSIX layout) when present, else this interpreter.
+    """
+    env = os.getenv("YAHOO_PYTHON")
+    if env:
+        return env
+    venv = os.path.join(os.getcwd(), ".yahoo_env")
+    for rel in (("Scripts", "python.exe"), ("bin", "python")):
+        path = os.path.join(venv, *rel)
+        if os.path.exists(path):
+            return path
+    return sys.executable
+
+
+# ---------------- framing ----------------
+def _send(stream, header, payload=b""):
+    """One message: length-prefixed JSON header, then a length-prefixed binary body."""
+    head = json.dumps(header).encode()
+    stream.write(_LEN.pack(len(head)) + head + _LEN.pack(len(payload)))
+    if payload:
+        stream.write(payload)
+    stream.flush()
+
+
+def _read_exact(stream, n):
+    buf = bytearray(n)
+    view, got = memoryview(buf), 0
+    while got < n:
+        k = stream.readinto(view[got:])
+        if not k:
+            raise EOFError("Yahoo worker pipe closed")
+        got += k
+    return buf
+
+
+def _recv(stream):
+    """Inverse of _send: (header, body bytearray). Raises EOFError on a closed pipe."""
+    head = _read_exact(stream, _LEN.size)
+    header = json.loads(bytes(_read_exact(stream, _LEN.unpack(head)[0])))
+    size = _LEN.unpack(_read_exact(stream, _LEN.size))[0]
+    return header, _read_exact(stream, size) if size else bytearray()
+
+
+def encode_frame(df):
+    """Column buffers (COLUMNS order) of a cleaned OHLCV frame."""
+    times = pd.to_datetime(df["time"])
+    if getattr(times.dt, "tz", None) is not None:
+        times = times.dt.tz_convert("UTC").dt.tz_localize(None)
+    cols = [times.to_numpy().astype("datetime64[ms]").astype("<i8")]
+    cols += [df[name].to_numpy(dtype=dtype) for name, dtype in COLUMNS[1:]]
+    return b"".join(np.ascontiguousarray(c).tobytes() for c in cols)
+
+
+def decode_frame(body, offset, rows):
+    """Frame of `rows` bars starting at `offset` in a response body (columns are views)."""
+    data = {}
+    for name, dtype in COLUMNS:
+        data[name] = np.frombuffer(body, dtype=dtype, count=rows, offset=offset)
+        offset += rows * np.dtype(dtype).itemsize
+    data["time"] = data["time"].astype("datetime64[ms]")
+    return pd.DataFrame(data), offset
+
+
+def clean_download(data):
+    """yf.download output for one symbol -> time/Open/High/Low/Close/Volume frame."""
+    if data is None or data.empty:
+        return empty_frame()
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = [col[0] for col in data.columns]
+    data = data.reset_index().rename(columns={"Date": "time", "Datetime": "time"})
+    return data[[name for name, _ in COLUMNS]].dropna(subset=["Close"])
+
+
+def split_download(data, symbols):
+    """
+    {symbol: frame} from one multi-ticker yf.download(..., group_by="ticker").
+    xs() picks out each ticker's column block and clean_download then builds
+    that symbol's frame from it (reset_index, column selection and dropna all
+    copy), so each symbol's bars are copied once. Rows a ticker has no bar for
+    (the index is the union across tickers) are dropped.
+    """
+    if data is None or data.empty:
+        return {symbol: empty_frame() for symbol in symbols}
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {symbols[0]: clean_download(data)}
+    level = 0 if set(symbols) & set(data.columns.get_level_values(0)) else 1
+    tickers = set(data.columns.get_level_values(level))
+    return {
+        symbol: clean_download(data.xs(symbol, axis=1, level=level))
+        if symbol in tickers
+        else empty_frame()
+        for symbol in symbols
+    }
+
+
+# ---------------- worker side ----------------
+def serve(stdin=None, stdout=None):
+    """
+    Worker loop: read batched requests from the pipe, answer each with every
+    symbol's bars as column buffers. Runs until the parent closes stdin.
+    """
+    import yfinance as yf
+
+    stdin = stdin or sys.stdin.buffer
+    if stdout is None:
+        # yfinance may print; keep the protocol on a private copy of stdout
+        stdout = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    while True:
+        try:
+            req, _ = _recv(stdin)
+        except EOFError:
+            return
+        window = {k: req[k] for k in ("start", "end", "period") if req.get(k)}
+        symbols = req["symbols"]
+        try:
+            # The whole batch is one multi-ticker request
+            data = yf.download(
+                symbols, interval=req["interval"], progress=False, group_by="ticker", **window
+            )
+            split, error = split_download(data, symbols), None
+        except Exception as e:
+            split, error = {}, str(e)
+
+        frames, chunks = [], []
+        for symbol in symbols:
+            df = split.get(symbol, empty_frame())
+            chunks.append(encode_frame(df))
+            frames.append({"symbol": symbol, "rows": len(df), "error": error})
+        _send(stdout, {"frames": frames}, b"".join(chunks))
+
+
+# ---------------- parent side ----------------
+class YahooWorker:
+    """
+    One long-lived Python process running yfinance (`python -m src.yfeed`),
+    fed batched symbol requests over its stdin and answering with binary
+    column buffers on stdout. Started on first use and restarted (and the
+    request retried once) if it has died.
+    """
+
+    def __init__(self, python=None):
+        self.python = python or yahoo_python()
+        self.proc = None
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._registered = False
+
+    @property
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        if self.proc is not None:
+            self.restarts += 1
+            logging.warning(f"♻️ Restarting Yahoo worker (exit code {self.proc.poll()})")
+            self.stop()
+        self.proc = subprocess.Popen(
+            [self.python, "-m", "src.yfeed"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=ROOT,
+        )
+        if not self._registered:
+            atexit.register(self.stop)
+            self._registered = True
+
+    def stop(self):
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()  # EOF ends serve()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+        finally:
+            proc.stdout.close()
+
+    def fetch(self, symbols, interval="1h", start=None, end=None, period=None):
+        """{symbol: frame} for every symbol, in one round trip to the worker."""
+        req = {
+            "symbols": list(symbols),
+            "interval": interval,
+            "start": start.isoformat() if start is not None else None,
+            "end": end.isoformat() if end is not None else None,
+            "period": period,
+        }
+        with self._lock:
+            for attempt in range(2):
+                if not self.alive:
+                    self.start()
+                try:
+                    _send(self.proc.stdin, req)
+                    header, body = _recv(self.proc.stdout)
+                    break
+                except (EOFError, OSError) as e:
+                    self.proc.kill()
+                    self.proc.wait()
+                    if attempt:
+                        raise
+                    logging.warning(f"⚠️ Yahoo worker lost mid-request: {e}")
+
+        out, offset = {}, 0
+        for f in header["frames"]:
+            if f.get("error"):
+                logging.warning(f"❌ Yahoo fetch failed for {f['symbol']}: {f['error']}")
+            df, offset = decode_frame(body, offset, f["rows"])
+            out[f["symbol"]] = df
+        return out
+
+
+_worker = None
+
+
+def default_worker():
+    global _worker
+    if _worker is None:
+        _worker = YahooWorker()
+    return _worker
+
+
+def fetch_yahoo_many(symbols, timeframe="1h", years=3):
+    """fetch_yahoo for several symbols in one request to the worker."""
+    end = dt.datetime.now()
+    start = end - dt.timedelta(days=years * 365)
+    try:
+        return default_worker().fetch(symbols, timeframe, start=start, end=end)
+    except (EOFError, OSError) as e:
+        logging.error(f"❌ Yahoo worker unavailable ({e}) — is yfinance installed for it?")
+        return {symbol: empty_frame() for symbol in symbols}
+
 
 def fetch_yahoo(symbol, timeframe="1h", years=3):
-    """Run yfinance in isolated env and return DataFrame."""
-    script = f"""
-import yfinance as yf, datetime as dt, pandas as pd, json
-start = dt.datetime.now() - dt.timedelta(days={years}*365)
-end = dt.datetime.now()
-data = yf.download("{symbol}", start=start, end=end, interval="{timeframe}", progress=False)
-if data.empty:
-    print("{{}}")
-else:
-    data.reset_index(inplace=True)
-    print(data.to_json(orient='records', date_format='iso'))
-"""
-    result = subprocess.run(
-        [
-            os.path.join(os.getcwd(), ".yahoo_env", "Scripts", "python.exe"),
-            "-c",
-            script,
-        ],
-        capture_output=True,
-        text=True,
-    )
-    out = result.stdout.strip()
-    if not out or out == "{}":
-        return pd.DataFrame(columns=["time", "Open", "High", "Low", "Close", "Volume"])
-    df = pd.read_json(out)
-    df.rename(columns={"Datetime": "time"}, inplace=True)
-    return df[["time", "Open", "High", "Low", "Close", "Volume"]]
+    """Run yfinance in the Yahoo worker process and return DataFrame."""
+    return fetch_yahoo_many([symbol], timeframe, years).get(symbol, empty_frame())
+
+
+if __name__ == "__main__":
+    serve()
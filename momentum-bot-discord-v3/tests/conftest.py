@@ -0,0 +1,33 @@
+# === tests/conftest.py (Shared Fixtures: Configs & Seeded Bars) ===
+import copy
+import numpy as np
+import pytest
+from src.bench import synthetic_bars
+from src.config import load_all, with_defaults
+from src.regime import regime_series
+
+
+@pytest.fixture(scope="session")
+def configs():
+    """(global_cfg, rules_cfg) with stock risk and mean-reversion thresholds loose enough to trade."""
+    global_cfg, rules_cfg, _, _ = load_all()
+    global_cfg = with_defaults(global_cfg, {})
+    rules_cfg = copy.deepcopy(rules_cfg)
+    rules_cfg["mean_revert_pullback"].update(
+        rsi_oversold=35, rsi_overbought=65, adx_min=5, adx_max=60, rsi_buy_max=45, rsi_sell_min=55
+    )
+    return global_cfg, rules_cfg
+
+
+@pytest.fixture(scope="session")
+def bars():
+    """8000 seeded 15m bars; copy before handing to code that mutates frames."""
+    return synthetic_bars(8000, seed=3, tf="15m", start="2021-01-01")
+
+
+@pytest.fixture(scope="session")
+def regime_daily():
+    spy = synthetic_bars(800, seed=1, tf="1D", start="2020-06-01", price=400)
+    vix = synthetic_bars(800, seed=2, tf="1D", start="2020-06-01", price=20)
+    vix["Close"] = 10 + 20 * np.abs(np.sin(np.arange(800) / 15))
+    return regime_series(spy, vix)
@@ -0,0 +1,84 @@
+# === tests/test_alerts.py (Alerts Against a Local Webhook Stand-in) ===
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.alerts import Alerts, DISCORD_MAX_LEN
+
+
+class Webhook:
+    """Local stand-in for a Discord webhook: records posts, can 429 or stall."""
+
+    def __init__(self):
+        self.posts = []
+        self.responses = []  # queued (status, body) to answer with before 204s
+        self.delay = 0.0
+        hook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                time.sleep(hook.delay)
+                status, payload = hook.responses.pop(0) if hook.responses else (204, None)
+                if status < 300:
+                    hook.posts.append((time.monotonic(), body["content"]))
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def webhook():
+    hook = Webhook()
+    yield hook
+    hook.server.shutdown()
+    hook.server.server_close()
+
+
+def test_send_does_not_wait_on_the_webhook(webhook):
+    webhook.delay = 0.5
+    alerts = Alerts(webhook.url, batch_window=0.01)
+    t0 = time.perf_counter()
+    alerts.send("📈 NVDA BUY 10 @~100.0")
+    assert time.perf_counter() - t0 < 0.1
+    assert alerts.flush(timeout=5)
+    alerts.close()
+    assert [content for _, content in webhook.posts] == ["📈 NVDA BUY 10 @~100.0"]
+
+
+def test_burst_is_coalesced_within_length_limit(webhook):
+    alerts = Alerts(webhook.url, batch_window=0.2)
+    messages = [f"🪙 SYM{i}/USD BUY {i} @~{i}.0 | " + "x" * 150 for i in range(40)]
+    for msg in messages:
+        alerts.send(msg)
+    assert alerts.flush(timeout=5)
+    alerts.close()
+
+    posts = [content for _, content in webhook.posts]
+    assert 1 < len(posts) < len(messages)
+    assert all(len(p) <= DISCORD_MAX_LEN for p in posts)
+    assert "\n".join(posts).split("\n") == messages
+
+
+def test_429_waits_for_retry_after(webhook):
+    webhook.responses = [(429, {"retry_after": 0.3, "global": False})]
+    alerts = Alerts(webhook.url, batch_window=0.01)
+    t0 = time.monotonic()
+    alerts.send("✅ Heartbeat OK")
+    assert alerts.flush(timeout=5)
+    alerts.close()
+
+    assert [content for _, content in webhook.posts] == ["✅ Heartbeat OK"]
+    assert webhook.posts[0][0] - t0 >= 0.3
+    assert alerts.sent == 1
@@ -0,0 +1,120 @@
+# === tests/test_backtest_multi.py (Backtester Parity Checks) ===
+import datetime as dt
+import pickle
+import pandas as pd
+import pytest
+import src.backtest_multi as bm
+from src.barstore import frame_to_records
+
+START, END = dt.datetime(2021, 1, 1), dt.datetime(2030, 1, 1)
+
+MODES = [(mode, exit_mode) for mode in ("crypto", "stock") for exit_mode in ("close", "intrabar")]
+
+
+def run(bars, configs, mode, regime_daily=None, **kwargs):
+    global_cfg, rules_cfg = configs
+    return bm.backtest_symbol(
+        None, "NVDA", "15m", START, END, global_cfg, rules_cfg, 0.3, mode,
+        df=bars.copy(), regime_daily=regime_daily if mode == "stock" else None, **kwargs,
+    )
+
+
+@pytest.mark.parametrize("mode,exit_mode", MODES)
+def test_vectorized_matches_scalar(bars, configs, regime_daily, mode, exit_mode):
+    """Vectorized entry signals give the same trades as the per-bar (--scalar-signals) loop."""
+    vec = run(bars, configs, mode, regime_daily, exit_mode=exit_mode, vectorized=True)
+    scalar = run(bars, configs, mode, regime_daily, exit_mode=exit_mode, vectorized=False)
+
+    assert len(vec[0]) > 0
+    pd.testing.assert_frame_equal(vec[0].to_frame(), scalar[0].to_frame())
+    assert vec[1:] == scalar[1:]
+
+
+@pytest.mark.parametrize("mode,exit_mode", MODES)
+def test_single_symbol_portfolio_matches_backtest_symbol(bars, configs, regime_daily, mode, exit_mode):
+    """With one symbol, the shared-pool portfolio run is the per-symbol run."""
+    global_cfg, rules_cfg = configs
+    crypto = {"NVDA"} if mode == "crypto" else set()
+    portfolio = bm.run_portfolio(
+        {"NVDA": bars.copy()}, ["NVDA"], crypto, START, END, global_cfg, rules_cfg, 0.3, exit_mode,
+        regime_daily=regime_daily,
+    )
+    single = run(bars, configs, mode, regime_daily, exit_mode=exit_mode)
+
+    assert len(single[0]) > 0
+    pd.testing.assert_frame_equal(portfolio[0].to_frame(), single[0].to_frame())
+    assert portfolio[1:] == single[1:]
+
+
+@pytest.mark.parametrize("mode,exit_mode", MODES)
+@pytest.mark.parametrize("chunk_bars", [1500, 3000])
+def test_chunked_matches_whole_series(bars, configs, regime_daily, mode, exit_mode, chunk_bars):
+    """Slices with indicator warm-up overlap trade exactly like one pass over the whole series."""
+    whole = run(bars, configs, mode, regime_daily, exit_mode=exit_mode)
+    chunked = run(bars, configs, mode, regime_daily, exit_mode=exit_mode, chunk_bars=chunk_bars)
+
+    assert len(whole[0]) > 0
+    pd.testing.assert_frame_equal(chunked[0].to_frame(), whole[0].to_frame())
+    assert chunked[1:] == whole[1:]
+
+
+def test_chunked_reads_bar_records(bars, configs):
+    """BarStore records (what --from-cache passes) give the same result as a frame."""
+    global_cfg, rules_cfg = configs
+    args = ("NVDA", "15m", START, END, global_cfg, rules_cfg, 0.3, "crypto")
+    from_frame = bm.backtest_symbol(None, *args, df=bars.copy(), chunk_bars=2000)
+    from_records = bm.backtest_symbol(None, *args, df=frame_to_records(bars), chunk_bars=2000)
+    pd.testing.assert_frame_equal(from_records[0].to_frame(), from_frame[0].to_frame())
+
+
+def legacy_row(trade, exit_time, exit_price, pnl, equity, reason):
+    """A closed trade as the old dict-per-trade backtester logged it."""
+    exit_time, entry_time = pd.Timestamp(exit_time), pd.Timestamp(trade.entry_time)
+    return {
+        "time": exit_time,
+        "symbol": trade.symbol,
+        "side": "BUY" if trade.side > 0 else "SELL",
+        "entry": trade.entry_price,
+        "exit": exit_price,
+        "pnl": pnl,
+        "equity": equity,
+        "units": trade.units,
+        "entry_time": entry_time,
+        "entry_equity": trade.entry_equity,
+        "duration_min": (exit_time - entry_time).total_seconds() / 60,
+        "return_pct": pnl / trade.entry_equity,
+        "reasons": trade.reasons + f" | EXIT_{reason}",
+    }
+
+
+def test_trade_log_csv_matches_dict_rows(tmp_path):
+    """TradeLog.to_frame() writes the same backtest_results.csv as the dict-per-trade log did."""
+    log, rows, equity = bm.TradeLog(capacity=2), [], 100000.0
+    t0 = pd.Timestamp("2024-03-01 09:30").value
+    for i, reason in enumerate(bm.EXIT_REASONS * 3):
+        trade = bm.ActiveTrade(
+            entry_price=100.0 + i * 0.37,
+            units=10 + i,
+            side=1 if i % 2 else -1,
+            stop_loss=95.0,
+            take_profit=110.0,
+            trail_stop=1.5,
+            entry_time=t0 + i * 3_600_000_000_000,
+            entry_bar=i,
+            symbol=("BTC/USD", "ETH/USD", "NVDA")[i % 3],
+            reasons=("MR_LONG", "MR_SHORT|DIV")[i % 2],
+            entry_equity=equity,
+        )
+        exit_time = trade.entry_time + (i + 1) * 900_000_000_000
+        pnl = (i - 5) * 12.345
+        equity += pnl
+        log.append(trade, exit_time, 101.5 + i, pnl, equity, reason)
+        rows.append(legacy_row(trade, exit_time, 101.5 + i, pnl, equity, reason))
+
+    # Worker processes ship logs pickled; run_portfolio / chunked runs concat them
+    log = bm.TradeLog.concat([pickle.loads(pickle.dumps(log))])
+
+    new, old = tmp_path / "new.csv", tmp_path / "old.csv"
+    log.to_frame().to_csv(new, index=False)
+    pd.DataFrame(rows).to_csv(old, index=False)
+    assert new.read_text() == old.read_text()
@@ -0,0 +1,60 @@
+# === tests/test_broker.py (Broker Against the Fake Alpaca API) ===
+import time
+import pytest
+from src.broker import Broker
+from src.fake_alpaca import FakeAlpaca
+
+
+@pytest.fixture
+def fake():
+    server = FakeAlpaca(rate_per_min=0).start()
+    yield server
+    server.stop()
+
+
+def broker(fake, rate=100.0, **kwargs):
+    return Broker("key", "secret", fake.url, rate=rate, **kwargs)
+
+
+def test_account_is_cached_between_reconciles(fake):
+    b = broker(fake)
+    assert float(b.account().equity) == 100000.0
+    seen = fake.requests
+    b.account()
+    assert b.get_position_qty("NVDA") == 0.0
+    assert fake.requests == seen
+
+
+def test_orders_submit_concurrently_and_update_the_cache(fake):
+    fake.latency = 0.1
+    b = broker(fake)
+    b.account()
+    orders = [
+        {"symbol": f"SYM{i}", "qty": i + 1, "side": "buy", "limit_price": 10.0} for i in range(8)
+    ]
+    results = b.submit_orders(orders)
+
+    assert [r.symbol for r in results] == [o["symbol"] for o in orders]
+    assert all(r.status == "filled" for r in results)
+    assert fake.max_in_flight > 1
+    seen = fake.requests
+    assert b.get_position_qty("SYM3") == 4.0
+    assert b.has_exposure("SYM3", "buy") and not b.has_exposure("SYM3", "sell")
+    assert fake.requests == seen
+
+
+def test_orders_respect_the_client_rate_limit(fake):
+    b = broker(fake, rate=10.0)
+    t0 = time.monotonic()
+    b.submit_orders([{"symbol": "SPY", "qty": 1, "side": "buy", "limit_price": 400.0}] * 6)
+    # One token on hand, then one every 0.1 s
+    assert time.monotonic() - t0 >= 0.45
+    assert fake.throttled == 0
+
+
+def test_reconcile_picks_up_outside_changes(fake):
+    b = broker(fake, reconcile_secs=0)
+    b.account()
+    fake._apply_fill("AAPL", 5.0, "sell", 150.0)
+    assert b.get_position_qty("AAPL") == -5.0
+    assert b.has_exposure("AAPL", "sell")
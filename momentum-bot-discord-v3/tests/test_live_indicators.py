@@ -0,0 +1,35 @@
+# === tests/test_live_indicators.py (Incremental vs Batch Indicators) ===
+import math
+import pytest
+from src.indicators import FEATURE_COLUMNS, add_indicators, last_row
+from src.live_indicators import IndicatorEngine
+
+
+@pytest.mark.parametrize("params", [{}, {"rsi_period": 10, "ema_s": 12, "ema_l": 40}])
+def test_engine_matches_add_indicators(bars, params):
+    """Bar by bar, the engine's newest row equals last_row(add_indicators(...)) within tolerance."""
+    df = bars.iloc[:400]
+    engine = IndicatorEngine(**params)
+    checked = 0
+    for n in range(60, len(df) + 1):
+        window = df.iloc[:n]
+        row = engine.update("BTC/USD", window)
+        expected = last_row(add_indicators(window.copy(), **params))
+        if not expected:
+            assert row == {}
+            continue
+        for col in FEATURE_COLUMNS:
+            assert math.isclose(row[col], expected[col], rel_tol=1e-6, abs_tol=1e-9), (n, col)
+        checked += 1
+    assert checked > 300
+
+
+def test_engine_restarts_on_gap(bars):
+    """History that no longer overlaps the folded-in state is recomputed from scratch."""
+    engine = IndicatorEngine()
+    engine.update("BTC/USD", bars.iloc[:300])
+    later = bars.iloc[1000:1300]
+    row = engine.update("BTC/USD", later)
+    expected = last_row(add_indicators(later.copy()))
+    for col in FEATURE_COLUMNS:
+        assert math.isclose(row[col], expected[col], rel_tol=1e-6, abs_tol=1e-9), col